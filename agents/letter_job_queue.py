@@ -0,0 +1,136 @@
+# agents/letter_job_queue.py
+import os
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Add the project root to the Python path to import our other agents
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.sanction_letter_generator import SanctionLetterGenerator
+from agents.letter_templates import DEFAULT_TEMPLATE
+from utils.log import get_logger
+
+logger = get_logger("letter_job_queue")
+
+# Worker pool settings for background letter rendering
+LETTER_WORKERS = int(os.environ.get("LETTER_WORKERS", 2))
+LETTER_WORKER_MODE = os.environ.get("LETTER_WORKER_MODE", "thread")  # "thread" or "process"
+MAX_TRACKED_JOBS = int(os.environ.get("LETTER_MAX_TRACKED_JOBS", 10000))
+
+
+# The generator used by each worker process (process mode), created on its first job
+_process_generator = None
+
+
+def _generate_in_worker(storage, customer_details, loan_details, template_name):
+    """
+    Renders one letter in a worker process. Submitted instead of the bound method
+    because a generator (with its letter store and locks) cannot be pickled.
+    """
+    global _process_generator
+    if _process_generator is None or _process_generator.storage != storage:
+        _process_generator = SanctionLetterGenerator(storage)
+    return _process_generator.generate_letter(customer_details, loan_details, template_name)
+
+
+class LetterJobQueue:
+    """
+    Renders sanction letters on a background worker pool.
+
+    `submit` returns a job id immediately, so the chat response does not wait for
+    PDF layout and the disk write; the frontend polls `status` until the letter is ready.
+    """
+    def __init__(self, generator=None, max_workers=LETTER_WORKERS, mode=LETTER_WORKER_MODE,
+                 max_tracked_jobs=MAX_TRACKED_JOBS):
+        self.generator = generator or SanctionLetterGenerator()
+        if mode == "process" and self.generator.storage == "memory":
+            # Letters rendered in a child process would land in that process's memory, not ours
+            logger.warning("In-memory letter storage needs thread workers; using threads.")
+            mode = "thread"
+        self.mode = mode
+        if mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="letter-worker")
+        self.max_tracked_jobs = max_tracked_jobs
+        self._jobs = OrderedDict()  # job_id -> Future
+        self._lock = threading.Lock()
+
+    def submit(self, customer_details, loan_details, template_name=DEFAULT_TEMPLATE):
+        """
+        Queues a sanction letter for rendering.
+
+        Returns:
+            str: The job id to poll with `status`.
+        """
+        job_id = uuid.uuid4().hex
+        if self.mode == "process":
+            future = self._executor.submit(
+                _generate_in_worker, self.generator.storage, dict(customer_details), dict(loan_details), template_name
+            )
+        else:
+            future = self._executor.submit(
+                self.generator.generate_letter, dict(customer_details), dict(loan_details), template_name
+            )
+        with self._lock:
+            self._jobs[job_id] = future
+            # Forget the oldest jobs once we track too many
+            while len(self._jobs) > self.max_tracked_jobs:
+                self._jobs.popitem(last=False)
+        return job_id
+
+    def status(self, job_id):
+        """
+        Reports the state of a job.
+
+        Returns:
+            dict: {"status": "pending" | "completed" | "failed" | "expired" | "unknown", ...}.
+                  Completed jobs include the letter's filename. With in-memory storage, a
+                  letter evicted from the bounded store since it was rendered is "expired".
+        """
+        with self._lock:
+            future = self._jobs.get(job_id)
+        if future is None:
+            return {"status": "unknown"}
+        if not future.done():
+            return {"status": "pending"}
+
+        error = future.exception()
+        if error is not None:
+            logger.error("Job %s failed: %s", job_id, error)
+            return {"status": "failed"}
+        result = future.result()
+        if result['status'] != 'success':
+            return {"status": "failed"}
+        if self.generator.storage == "memory" and result['filename'] not in self.generator.letter_store:
+            return {"status": "expired"}
+        return {"status": "completed", "filename": result['filename']}
+
+    def shutdown(self, wait=True):
+        """Stops the worker pool."""
+        self._executor.shutdown(wait=wait)
+
+
+# --- Self-test for the job queue ---
+if __name__ == '__main__':
+    import time
+
+    queue = LetterJobQueue()
+    mock_customer = {
+        "customer_id": "CUST001",
+        "name": "Rajesh Kumar",
+        "phone": "9876543210",
+        "email": "rajesh.kumar@email.com",
+        "address": "123, Bandra West, Mumbai - 400050"
+    }
+    mock_loan = {"approved_amount": 500000, "interest_rate": "10.99%", "tenure": 60}
+
+    print("--- Testing Background Letter Generation ---")
+    job_id = queue.submit(mock_customer, mock_loan)
+    print(f"Submitted job: {job_id} -> {queue.status(job_id)}")
+    while queue.status(job_id)['status'] == 'pending':
+        time.sleep(0.05)
+    print(f"Result: {queue.status(job_id)}")
+    queue.shutdown()
@@ -0,0 +1,133 @@
+# agents/letter_templates.py
+import datetime
+import threading
+from xml.sax.saxutils import escape
+
+from reportlab.platypus import Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+
+_styles = None
+_styles_lock = threading.Lock()
+
+
+def get_styles():
+    """Returns the shared sample stylesheet, building it only once per process."""
+    global _styles
+    if _styles is None:
+        with _styles_lock:
+            if _styles is None:
+                _styles = getSampleStyleSheet()
+    return _styles
+
+
+class LetterTemplate:
+    """
+    A sanction letter layout.
+
+    The static parts of the letter (header, salutation block, subject line and
+    closing) are parsed into flowables once and reused for every letter; only the
+    per-customer fields are turned into new Paragraphs. ReportLab caches layout
+    data on a Paragraph while building, so each thread keeps its own compiled copy.
+    """
+    def __init__(self, name, title, subject, closing, intro=None):
+        self.name = name
+        self.title = title
+        self.subject = subject
+        self.closing = closing
+        self.intro = intro
+        self._compiled = threading.local()
+
+    def _static_flowables(self):
+        compiled = getattr(self._compiled, 'flowables', None)
+        if compiled is None:
+            styles = get_styles()
+            compiled = {
+                "header": [Paragraph(f"<b>{self.title}</b>", styles['h1']), Spacer(1, 0.2 * inch)],
+                "to": Paragraph("<b>To,</b>", styles['Normal']),
+                "subject": [Spacer(1, 0.3 * inch), Paragraph(f"<b>Subject: {self.subject}</b>", styles['h2']),
+                            Spacer(1, 0.2 * inch)],
+                "closing": Paragraph(self.closing, styles['Normal']),
+            }
+            self._compiled.flowables = compiled
+        return compiled
+
+    def build_story(self, customer_details, loan_details, issue_date=None):
+        """
+        Lays out one letter.
+
+        Args:
+            customer_details (dict): Customer's KYC information.
+            loan_details (dict): Approved loan details (amount, tenure, etc.).
+            issue_date (datetime.date, optional): Defaults to today.
+
+        Returns:
+            list: ReportLab flowables ready for SimpleDocTemplate.build.
+        """
+        static = self._static_flowables()
+        normal = get_styles()['Normal']
+        issue_date = issue_date or datetime.date.today()
+        name = escape(str(customer_details['name']))
+
+        story = list(static["header"])
+        story.append(Paragraph(f"Date: {issue_date.strftime('%d-%B-%Y')}", normal))
+        story.append(Spacer(1, 0.3 * inch))
+
+        # Customer Details
+        story.append(static["to"])
+        story.append(Paragraph(name, normal))
+        story.append(Paragraph(escape(str(customer_details['address'])), normal))
+        story.append(Paragraph(f"Phone: {escape(str(customer_details['phone']))}", normal))
+        story.append(Paragraph(f"Email: {escape(str(customer_details['email']))}", normal))
+        story.extend(static["subject"])
+
+        # Per-customer body, followed by the precompiled closing
+        intro = f"{self.intro}<br/><br/>" if self.intro else ""
+        body_text = f"""
+        Dear {name},<br/><br/>
+        {intro}We are pleased to inform you that your personal loan application has been approved.
+        The sanction details are as follows:<br/><br/>
+        <b>Sanctioned Loan Amount:</b> ₹{loan_details['approved_amount']:,}<br/>
+        <b>Interest Rate:</b> {escape(str(loan_details.get('interest_rate', '10.99%')))}<br/>
+        <b>Tenure:</b> {escape(str(loan_details.get('tenure', 'Not Specified')))} months<br/>
+        <b>Customer ID:</b> {escape(str(customer_details['customer_id']))}<br/><br/>
+        """
+        story.append(Paragraph(body_text, normal))
+        story.append(static["closing"])
+        return story
+
+
+_STANDARD_CLOSING = """
+This sanction letter is valid for 30 days from the date of issue.
+Please contact our branch to proceed with the disbursement process.<br/><br/>
+Congratulations on your loan approval!<br/><br/>
+Sincerely,<br/>
+Tata Capital Loan Team
+"""
+
+# Registry of available letter templates
+LETTER_TEMPLATES = {
+    "standard": LetterTemplate(
+        name="standard",
+        title="Tata Capital Loan Sanction Letter",
+        subject="Personal Loan Sanction",
+        closing=_STANDARD_CLOSING,
+    ),
+    "document_verified": LetterTemplate(
+        name="document_verified",
+        title="Tata Capital Loan Sanction Letter",
+        subject="Personal Loan Sanction (Post Document Verification)",
+        closing=_STANDARD_CLOSING,
+        intro="Thank you for submitting your salary slip. Your documents have been verified successfully.",
+    ),
+}
+
+DEFAULT_TEMPLATE = "standard"
+
+
+def get_template(name=DEFAULT_TEMPLATE):
+    """Looks up a letter template by name."""
+    try:
+        return LETTER_TEMPLATES[name]
+    except KeyError:
+        raise ValueError(f"Unknown sanction letter template: {name}")
@@ -9,6 +9,10 @@ from agents.verification_agent import VerificationAgent
 from agents.sales_agent import SalesAgent
 from agents.underwriting_agent import UnderwritingAgent
 from agents.sanction_letter_generator import SanctionLetterGenerator
+from utils.metrics import metrics
+from utils.log import get_logger
+
+logger = get_logger("master_agent")
 
 class MasterAgent:
     """
@@ -44,8 +48,10 @@ class MasterAgent:
 
     def handle_verification(self, phone):
         """Handles the customer verification step."""
-        print("\n[Master Agent] Verifying customer...")
-        verification_result = self.verification_agent.verify_customer(phone)
+        logger.info("Verifying customer...")
+        with metrics.track("verification") as stage:
+            verification_result = self.verification_agent.verify_customer(phone)
+            stage.outcome = verification_result['status']
         
         if verification_result['status'] == 'success':
             self.customer_details = verification_result
@@ -75,15 +81,21 @@ class MasterAgent:
 
     def handle_sales_discussion(self):
         """Discusses the loan options with the sales agent."""
-        print("\n[Master Agent] Discussing loan options...")
-        sales_result = self.sales_agent.discuss_loan(
-            self.customer_details['phone'], 
-            self.loan_details['requested_amount'],
-            self.loan_details['tenure']
-        )
+        logger.info("Discussing loan options...")
+        with metrics.track("sales") as stage:
+            sales_result = self.sales_agent.discuss_loan(
+                self.customer_details['phone'], 
+                self.loan_details['requested_amount'],
+                self.loan_details['tenure']
+            )
+            stage.outcome = sales_result['status']
         
         print(f"Chatbot: {sales_result['message']}")
         
+        if sales_result['status'] == 'error':
+            # e.g. a tenure we cannot quote; ask for the loan details again
+            self.handle_loan_request()
+            return
         if sales_result['status'] == 'suggestion':
             # In a real app, this would be a button click. Here we simulate with text.
             choice = input("Type 'yes' to accept the suggested amount, or 'no' to continue with your original request: ").lower()
@@ -99,11 +111,14 @@ class MasterAgent:
 
     def handle_underwriting(self):
         """Handles the underwriting and approval process."""
-        print("\n[Master Agent] Sending your application for evaluation...")
-        underwriting_result = self.underwriting_agent.evaluate_loan(
-            self.customer_details['phone'], 
-            self.loan_details['final_amount']
-        )
+        logger.info("Sending the application for evaluation...")
+        with metrics.track("underwriting") as stage:
+            underwriting_result = self.underwriting_agent.evaluate_loan(
+                self.customer_details['phone'], 
+                self.loan_details['final_amount'],
+                self.loan_details['final_tenure']
+            )
+            stage.outcome = underwriting_result['status']
         
         status = underwriting_result['status']
         print(f"Chatbot: {underwriting_result['reason']}")
@@ -125,11 +140,11 @@ class MasterAgent:
         
         # In a real product, we would parse the PDF/image here.
         # For the prototype, we assume the upload is successful and the salary is sufficient.
-        print("\n[Master Agent] Verifying uploaded document... (Simulated)")
-        print("[Master Agent] ✅ Document verified. EMI is within the 50% salary limit.")
+        logger.info("Verifying uploaded document... (Simulated)")
+        logger.info("Document verified. EMI is within the 50% salary limit.")
         
         # Re-run underwriting with a flag to indicate documents are verified
-        print("[Master Agent] Re-evaluating loan request...")
+        logger.info("Re-evaluating loan request...")
         # We'll just assume approval now for simplicity.
         # A more complex agent might call the underwriting agent with a new parameter.
         approval_result = {
@@ -144,8 +159,10 @@ class MasterAgent:
         self.loan_details['approved_amount'] = approval_result['approved_amount']
         self.loan_details['interest_rate'] = "10.99%" # Get from offer mart API in a real product
         
-        print("\n[Master Agent] Generating your sanction letter...")
-        letter_result = self.sanction_generator.generate_letter(self.customer_details, self.loan_details)
+        logger.info("Generating the sanction letter...")
+        with metrics.track("sanction_letter") as stage:
+            letter_result = self.sanction_generator.generate_letter(self.customer_details, self.loan_details)
+            stage.outcome = letter_result['status']
         
         if letter_result['status'] == 'success':
             print(f"Chatbot: 🎉 Congratulations! Your loan of ₹{self.loan_details['approved_amount']:,} has been approved.")
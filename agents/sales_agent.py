@@ -5,6 +5,11 @@ import os
 # Add the project root to the Python path to import our database utility
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.database import customer_db
+from utils.log import get_logger
+from utils.emi import calculate_emi, max_affordable_amount, is_valid_tenure, MIN_TENURE_MONTHS, MAX_TENURE_MONTHS
+from agents.underwriting_engine import MAX_EMI_PERCENT
+
+logger = get_logger("sales_agent")
 
 class SalesAgent:
     """
@@ -26,7 +31,7 @@ class SalesAgent:
         Returns:
             dict: A dictionary with the recommended amount, tenure, and a message.
         """
-        print(f"[Sales Agent] Discussing loan options for phone: {phone_number}")
+        logger.info("Discussing loan options for phone: %s", phone_number)
         
         customer = customer_db.get_customer_by_phone(phone_number)
         
@@ -36,30 +41,43 @@ class SalesAgent:
         pre_approved_limit = customer['pre_approved_limit']
         
         # Default tenure logic if not provided
-        if not desired_tenure:
+        if desired_tenure is None:
             # A simple heuristic: longer tenure for larger amounts
             if requested_amount > 500000:
                 desired_tenure = 72
             else:
                 desired_tenure = 60
+        elif not is_valid_tenure(desired_tenure):
+            logger.info("Rejected tenure of %s months.", desired_tenure)
+            return {"status": "error", "message": f"Please choose a tenure between {MIN_TENURE_MONTHS} and {MAX_TENURE_MONTHS} months."}
         
         # Logic to confirm or suggest the amount
         if requested_amount <= pre_approved_limit:
-            print(f"[Sales Agent] ✅ Requested amount ₹{requested_amount:,} is within the pre-approved limit of ₹{pre_approved_limit:,}.")
+            logger.info("Requested amount ₹%s is within the pre-approved limit of ₹%s.", requested_amount, pre_approved_limit)
+            emi = calculate_emi(requested_amount, desired_tenure)
             return {
                 "status": "confirmed",
-                "message": f"That's a great choice! An amount of ₹{requested_amount:,} is well within your pre-approved limit. Let's proceed with this for a tenure of {desired_tenure} months.",
+                "message": f"That's a great choice! An amount of ₹{requested_amount:,} is well within your pre-approved limit. Let's proceed with this for a tenure of {desired_tenure} months, at an EMI of about ₹{emi:,} per month.",
                 "final_amount": requested_amount,
-                "final_tenure": desired_tenure
+                "final_tenure": desired_tenure,
+                "emi": emi
             }
         else:
-            print(f"[Sales Agent] ⚠️ Requested amount ₹{requested_amount:,} exceeds the pre-approved limit of ₹{pre_approved_limit:,}.")
-            return {
+            logger.info("Requested amount ₹%s exceeds the pre-approved limit of ₹%s.", requested_amount, pre_approved_limit)
+            message = f"I see you've requested ₹{requested_amount:,}. Based on your profile, your instant approval limit is ₹{pre_approved_limit:,}."
+            result = {
                 "status": "suggestion",
-                "message": f"I see you've requested ₹{requested_amount:,}. Based on your profile, your instant approval limit is ₹{pre_approved_limit:,}. We can certainly try for a higher amount, but it would require additional verification. For an instant approval, would you like to proceed with ₹{pre_approved_limit:,}?",
                 "suggested_amount": pre_approved_limit,
-                "final_tenure": desired_tenure
+                "final_tenure": desired_tenure,
+                "emi": calculate_emi(pre_approved_limit, desired_tenure)
             }
+            if customer.get('salary'):
+                affordable = max_affordable_amount(customer['salary'], desired_tenure, max_emi_percent=MAX_EMI_PERCENT)
+                result["max_affordable_amount"] = affordable
+                message += f" Your salary comfortably supports EMIs on up to about ₹{affordable:,} over {desired_tenure} months."
+            message += f" We can certainly try for a higher amount, but it would require additional verification. For an instant approval, would you like to proceed with ₹{pre_approved_limit:,}?"
+            result["message"] = message
+            return result
 
 # --- Self-test for the agent ---
 if __name__ == '__main__':
@@ -75,4 +93,10 @@ if __name__ == '__main__':
     print("--- TEST 2: Amount exceeds pre-approved limit ---")
     # Rajesh has a limit of 500,000. Requesting 800,000 should trigger a suggestion.
     result = agent.discuss_loan("9876543210", 800000)
+    print(f"Result: {result}\n")
+
+    # --- Test Case 3: Invalid tenure (Rajesh Kumar) ---
+    print("--- TEST 3: Invalid tenure ---")
+    # A negative tenure is refused with a message instead of raising.
+    result = agent.discuss_loan("9876543210", 400000, -12)
     print(f"Result: {result}\n")
\ No newline at end of file
@@ -1,103 +1,142 @@
 # agents/sanction_letter_generator.py
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate
+import hashlib
+import io
+import json
 import os
+import sys
 import datetime
+import tempfile
+import time
+
+# Add the project root to the Python path to import our letter templates
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.letter_templates import get_template, DEFAULT_TEMPLATE
+from utils.letter_store import LetterStore, prune_letter_directory
+from utils.metrics import metrics
+from utils.log import get_logger
+
+logger = get_logger("sanction_letter_generator")
+
+# Where generated letters live: "disk" (written to generated_letters/ and cached in memory)
+# or "memory" (served only from the bounded in-memory store)
+LETTER_STORAGE = os.environ.get("LETTER_STORAGE", "disk")
+# Minimum number of seconds between retention sweeps of the output directory
+LETTER_PRUNE_INTERVAL = float(os.environ.get("LETTER_PRUNE_INTERVAL", 3600))
+
+# Recently generated letters, shared by every generator in this process
+letter_store = LetterStore()
+
+
+def letter_content_key(customer_details, loan_details, template_name, issue_date):
+    """
+    Hashes everything that appears in a letter. Two requests with the same key
+    would produce identical PDFs, so the second one can reuse the first.
+    """
+    content = {
+        "template": template_name,
+        "issue_date": issue_date.isoformat(),
+        "customer": {field: customer_details.get(field) for field in ("customer_id", "name", "address", "phone", "email")},
+        "loan": {field: loan_details.get(field) for field in ("approved_amount", "interest_rate", "tenure")},
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
 
 class SanctionLetterGenerator:
     """
     Generates a PDF sanction letter for an approved loan.
     """
-    def __init__(self):
+    def __init__(self, storage=LETTER_STORAGE, store=None):
         # Ensure the directory for generated letters exists
         self.output_dir = "generated_letters"
         os.makedirs(self.output_dir, exist_ok=True)
+        self.storage = storage
+        self.letter_store = store if store is not None else letter_store
+        self._last_prune = float('-inf')  # The first write always sweeps
 
-    def generate_letter(self, customer_details, loan_details):
+    def generate_letter(self, customer_details, loan_details, template_name=DEFAULT_TEMPLATE):
         """
         Creates a PDF sanction letter.
         
         Args:
             customer_details (dict): Customer's KYC information.
             loan_details (dict): Approved loan details (amount, tenure, etc.).
+            template_name (str, optional): Which letter template to use (see agents/letter_templates.py).
             
         Returns:
             dict: A dictionary containing the status and the path to the generated PDF.
         """
-        print("[Sanction Letter Generator] Generating sanction letter...")
+        logger.info("Generating sanction letter...")
         
-        # Create a unique filename for the PDF
+        # Name the PDF after a hash of its contents so identical letters are only rendered once
+        issue_date = datetime.date.today()
+        content_key = letter_content_key(customer_details, loan_details, template_name, issue_date)
         customer_name = customer_details['name'].replace(" ", "_")
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"Sanction_Letter_{customer_name}_{timestamp}.pdf"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        # Create the PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # --- Add content to the PDF ---
-        
-        # Header
-        p = Paragraph("<b>Tata Capital Loan Sanction Letter</b>", styles['h1'])
-        story.append(p)
-        story.append(Spacer(1, 0.2 * inch))
-        
-        # Date
-        p = Paragraph(f"Date: {datetime.datetime.now().strftime('%d-%B-%Y')}", styles['Normal'])
-        story.append(p)
-        story.append(Spacer(1, 0.3 * inch))
-
-        # Customer Details
-        p = Paragraph("<b>To,</b>", styles['Normal'])
-        story.append(p)
-        p = Paragraph(f"{customer_details['name']}", styles['Normal'])
-        story.append(p)
-        p = Paragraph(f"{customer_details['address']}", styles['Normal'])
-        story.append(p)
-        p = Paragraph(f"Phone: {customer_details['phone']}", styles['Normal'])
-        story.append(p)
-        p = Paragraph(f"Email: {customer_details['email']}", styles['Normal'])
-        story.append(p)
-        story.append(Spacer(1, 0.3 * inch))
-
-        # Loan Sanction Details
-        p = Paragraph("<b>Subject: Personal Loan Sanction</b>", styles['h2'])
-        story.append(p)
-        story.append(Spacer(1, 0.2 * inch))
-        
-        # Main body text
-        body_text = f"""
-        Dear {customer_details['name']},<br/><br/>
-        We are pleased to inform you that your personal loan application has been approved. 
-        The sanction details are as follows:<br/><br/>
-        <b>Sanctioned Loan Amount:</b> ₹{loan_details['approved_amount']:,}<br/>
-        <b>Interest Rate:</b> {loan_details.get('interest_rate', '10.99%')}<br/>
-        <b>Tenure:</b> {loan_details.get('tenure', 'Not Specified')} months<br/>
-        <b>Customer ID:</b> {customer_details['customer_id']}<br/><br/>
-        This sanction letter is valid for 30 days from the date of issue. 
-        Please contact our branch to proceed with the disbursement process.<br/><br/>
-        Congratulations on your loan approval!<br/><br/>
-        Sincerely,<br/>
-        Tata Capital Loan Team
-        """
-        p = Paragraph(body_text, styles['Normal'])
-        story.append(p)
-        
-        # Build the PDF
-        doc.build(story)
-        
-        print(f"[Sanction Letter Generator] ✅ Successfully generated PDF at: {filepath}")
-        return {
+        filename = f"Sanction_Letter_{customer_name}_{issue_date.strftime('%Y%m%d')}_{content_key[:12]}.pdf"
+        filepath = os.path.join(self.output_dir, filename) if self.storage == "disk" else None
+        result = {
             "status": "success",
             "message": "Sanction letter generated successfully.",
             "filepath": filepath,
             "filename": filename
         }
 
+        if filename in self.letter_store or (filepath and os.path.exists(filepath)):
+            logger.info("Reusing identical letter: %s", filename)
+            return result
+        
+        # Create the PDF document in memory
+        with metrics.track("letter_render"):
+            pdf_bytes = self.render_bytes(customer_details, loan_details, template_name, issue_date)
+        self.letter_store.put(filename, pdf_bytes)
+
+        if filepath:
+            # A uniquely named temporary file, so concurrent renders of the same letter don't collide
+            with tempfile.NamedTemporaryFile(dir=self.output_dir, prefix=f".{filename}.", suffix=".tmp",
+                                             delete=False) as f:
+                f.write(pdf_bytes)
+            os.replace(f.name, filepath)
+            self._maybe_prune()
+        
+        logger.info("Successfully generated PDF: %s", filepath or filename)
+        return result
+
+    def get_letter_bytes(self, filename):
+        """Returns a generated letter's bytes from memory, or None if it is only on disk (or gone)."""
+        return self.letter_store.get(filename)
+
+    def _maybe_prune(self):
+        """Runs the on-disk retention policy at most once every LETTER_PRUNE_INTERVAL seconds."""
+        now = time.monotonic()
+        if now - self._last_prune < LETTER_PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        deleted = prune_letter_directory(self.output_dir)
+        if deleted:
+            logger.info("Removed %d letters past the retention policy.", deleted)
+
+    def build_pdf(self, output, customer_details, loan_details, template_name=DEFAULT_TEMPLATE, issue_date=None):
+        """
+        Lays out a sanction letter and writes the PDF to `output`.
+
+        Args:
+            output (str or file-like): A file path or a binary buffer such as io.BytesIO.
+            customer_details (dict): Customer's KYC information.
+            loan_details (dict): Approved loan details (amount, tenure, etc.).
+            template_name (str, optional): Which letter template to use.
+            issue_date (datetime.date, optional): The date printed on the letter. Defaults to today.
+        """
+        template = get_template(template_name)
+        # invariant=1 keeps the output byte-for-byte reproducible for the same inputs
+        doc = SimpleDocTemplate(output, pagesize=A4, invariant=1)
+        doc.build(template.build_story(customer_details, loan_details, issue_date))
+
+    def render_bytes(self, customer_details, loan_details, template_name=DEFAULT_TEMPLATE, issue_date=None):
+        """Renders a sanction letter in memory and returns the PDF bytes."""
+        buffer = io.BytesIO()
+        self.build_pdf(buffer, customer_details, loan_details, template_name, issue_date)
+        return buffer.getvalue()
+
 # --- Self-test for the agent ---
 if __name__ == '__main__':
     agent = SanctionLetterGenerator()
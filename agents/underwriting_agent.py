@@ -6,59 +6,161 @@ import os
 # Add the project root to the Python path to import our database utility
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.database import customer_db
+from utils.log import get_logger
+from utils.api_client import CustomerNotFoundError
+from utils.data_sources import create_data_source
+from utils.emi import calculate_emi, max_affordable_amount, DEFAULT_TENURE_MONTHS
+from agents.underwriting_engine import MIN_CREDIT_SCORE, SALARY_SLIP_LIMIT_MULTIPLIER, MAX_EMI_PERCENT
 
-# Base URL for our mock APIs
-API_BASE_URL = "http://127.0.0.1:5001"
+logger = get_logger("underwriting_agent")
 
 class UnderwritingAgent:
     """
     Evaluates loan applications based on credit score and pre-approved limits.
-    This agent calls external mock APIs to fetch necessary data.
+    Credit scores and offers come from a data source: the mock APIs over HTTP, or
+    the customer database directly when both run in the same process.
     """
-    def __init__(self):
-        pass
+    def __init__(self, data_source=None):
+        # Use the configured data source (UNDERWRITING_DATA_SOURCE) unless one is provided
+        self.data_source = data_source or create_data_source()
 
-    def evaluate_loan(self, phone_number, requested_amount):
+    def evaluate_loan(self, phone_number, requested_amount, tenure=None):
         """
         Evaluates a loan request against business rules.
         
         Args:
             phone_number (str): The customer's phone number.
             requested_amount (int): The loan amount requested by the customer.
+            tenure (int, optional): The tenure in months, used for the EMI check.
             
         Returns:
             dict: A dictionary with the decision, reason, and details.
         """
-        print(f"[Underwriting Agent] Evaluating loan request for ₹{requested_amount:,} for phone: {phone_number}")
+        logger.info("Evaluating loan request for ₹%s for phone: %s", requested_amount, phone_number)
         
-        # --- Step 1: Fetch data from Mock APIs ---
+        # --- Step 1: Fetch the credit score and offer (concurrently when over HTTP) ---
         try:
-            # Get credit score from the mock Credit Bureau API
-            credit_response = requests.get(f"{API_BASE_URL}/api/credit-bureau/score?phone={phone_number}")
-            credit_response.raise_for_status() # Raises an exception for bad status codes (4xx or 5xx)
-            credit_data = credit_response.json()
-            credit_score = credit_data['credit_score']
-            print(f"[Underwriting Agent] Fetched Credit Score: {credit_score}")
-
-            # Get pre-approved limit from the mock Offer Mart API
-            offer_response = requests.get(f"{API_BASE_URL}/api/offer-mart/pre-approved?phone={phone_number}")
-            offer_response.raise_for_status()
-            offer_data = offer_response.json()
-            pre_approved_limit = offer_data['pre_approved_limit']
-            print(f"[Underwriting Agent] Fetched Pre-Approved Limit: ₹{pre_approved_limit:,}")
-
+            credit_data, offer_data = self.data_source.get_underwriting_data(phone_number)
+            credit_score, pre_approved_limit = self._parse_underwriting_data(credit_data, offer_data)
+        except CustomerNotFoundError:
+            logger.warning("No bureau or offer record found for phone: %s", phone_number)
+            return {"status": "error", "message": "Customer not found."}
         except requests.exceptions.RequestException as e:
-            print(f"[Underwriting Agent] ❌ Error connecting to APIs: {e}")
+            logger.error("Error connecting to APIs: %s", e)
             return {"status": "error", "message": "Could not connect to verification services."}
         except KeyError:
-            print("[Underwriting Agent] ❌ Error: Unexpected response format from APIs.")
+            logger.error("Unexpected response format from APIs.")
             return {"status": "error", "message": "A system error occurred."}
 
         # --- Step 2: Apply Business Rules ---
-        
+        return self.apply_rules(requested_amount, credit_score, pre_approved_limit,
+                                self._monthly_salary(phone_number), tenure)
+
+    async def evaluate_loan_async(self, phone_number, requested_amount, tenure=None):
+        """
+        Asyncio variant of evaluate_loan. The two API lookups are awaited
+        concurrently so the event loop stays free while they are in flight.
+        """
+        logger.info("Evaluating loan request for ₹%s for phone: %s", requested_amount, phone_number)
+
+        try:
+            credit_data, offer_data = await self.data_source.get_underwriting_data_async(phone_number)
+            credit_score, pre_approved_limit = self._parse_underwriting_data(credit_data, offer_data)
+        except CustomerNotFoundError:
+            logger.warning("No bureau or offer record found for phone: %s", phone_number)
+            return {"status": "error", "message": "Customer not found."}
+        except requests.exceptions.RequestException as e:
+            logger.error("Error connecting to APIs: %s", e)
+            return {"status": "error", "message": "Could not connect to verification services."}
+        except KeyError:
+            logger.error("Unexpected response format from APIs.")
+            return {"status": "error", "message": "A system error occurred."}
+
+        return self.apply_rules(requested_amount, credit_score, pre_approved_limit,
+                                self._monthly_salary(phone_number), tenure)
+
+    def fetch_credit_scores(self, phone_numbers):
+        """
+        Fetches credit scores for many customers in bulk.
+
+        Returns:
+            dict: Maps each phone number to its credit score, or None if the customer was not found.
+        """
+        results = self.data_source.get_credit_scores_batch(phone_numbers)
+        return {item['phone']: item.get('credit_score') for item in results}
+
+    def fetch_pre_approved_limits(self, phone_numbers):
+        """
+        Fetches pre-approved limits for many customers in bulk.
+
+        Returns:
+            dict: Maps each phone number to its pre-approved limit, or None if the customer was not found.
+        """
+        results = self.data_source.get_pre_approved_offers_batch(phone_numbers)
+        return {item['phone']: item.get('pre_approved_limit') for item in results}
+
+    def evaluate_loans_batch(self, applications):
+        """
+        Evaluates many loan requests using one combined bulk lookup per batch of phones
+        instead of two HTTP calls per application.
+
+        Args:
+            applications (list): (phone_number, requested_amount) pairs.
+
+        Returns:
+            list: One decision dictionary per application, in the same order.
+        """
+        applications = list(applications)
+        logger.info("Evaluating %d loan requests in bulk", len(applications))
+
+        try:
+            results = self.data_source.get_underwriting_data_batch(phone for phone, _ in applications)
+        except requests.exceptions.RequestException as e:
+            logger.error("Error connecting to APIs: %s", e)
+            error = {"status": "error", "message": "Could not connect to verification services."}
+            return [dict(error) for _ in applications]
+
+        decisions = []
+        for (phone_number, requested_amount), item in zip(applications, results):
+            if 'error' in item:
+                decisions.append({"status": "error", "message": "Customer not found."})
+                continue
+            decisions.append(self.apply_rules(
+                requested_amount, item['credit']['credit_score'], item['offer']['pre_approved_limit'],
+                self._monthly_salary(phone_number)
+            ))
+        return decisions
+
+    def _parse_underwriting_data(self, credit_data, offer_data):
+        """Extracts the credit score and pre-approved limit from the API responses."""
+        credit_score = credit_data['credit_score']
+        logger.debug("Fetched Credit Score: %s", credit_score)
+        pre_approved_limit = offer_data['pre_approved_limit']
+        logger.debug("Fetched Pre-Approved Limit: ₹%s", pre_approved_limit)
+        return credit_score, pre_approved_limit
+
+    def _monthly_salary(self, phone_number):
+        """Looks up the customer's monthly salary on file, or None if it is unknown."""
+        customer = customer_db.get_customer_by_phone(phone_number)
+        return customer.get('salary') if customer else None
+
+    def apply_rules(self, requested_amount, credit_score, pre_approved_limit, monthly_salary=None, tenure=None):
+        """
+        Applies the underwriting business rules to already-fetched data.
+
+        Args:
+            requested_amount (int): The loan amount requested by the customer.
+            credit_score (int): The customer's credit score.
+            pre_approved_limit (int): The customer's pre-approved limit.
+            monthly_salary (int, optional): The customer's monthly salary, for the EMI check.
+            tenure (int, optional): The tenure in months (defaults to DEFAULT_TENURE_MONTHS).
+
+        Returns:
+            dict: A dictionary with the decision, reason, and details.
+        """
         # Rule 1: Check minimum credit score
-        if credit_score < 700:
-            print(f"[Underwriting Agent] ❌ REJECTED: Credit score {credit_score} is below the minimum threshold of 700.")
+        if credit_score < MIN_CREDIT_SCORE:
+            logger.info("REJECTED: Credit score %s is below the minimum threshold of %s.", credit_score, MIN_CREDIT_SCORE)
             return {
                 "status": "rejected",
                 "reason": f"Unfortunately, your application could not be approved as your credit score ({credit_score}) is below our minimum requirement.",
@@ -67,7 +169,7 @@ class UnderwritingAgent:
 
         # Rule 2: Check loan amount against pre-approved limit
         if requested_amount <= pre_approved_limit:
-            print("[Underwriting Agent] ✅ APPROVED (Instant): Loan amount is within pre-approved limit.")
+            logger.info("APPROVED (Instant): Loan amount is within pre-approved limit.")
             return {
                 "status": "approved_instant",
                 "reason": "Congratulations! Your loan has been instantly approved based on your pre-approved offer.",
@@ -76,21 +178,34 @@ class UnderwritingAgent:
             }
         
         # Rule 3: Check if amount is between 1x and 2x the limit
-        elif requested_amount <= (2 * pre_approved_limit):
-            print("[Underwriting Agent] ⏳ PENDING: Requires salary slip verification.")
-            return {
+        elif requested_amount <= (SALARY_SLIP_LIMIT_MULTIPLIER * pre_approved_limit):
+            logger.info("PENDING: Requires salary slip verification.")
+            result = {
                 "status": "pending_salary_slip",
                 "reason": "Your request is being processed. To proceed, please upload your latest salary slip for verification.",
-                "max_emi_percent": 50, # EMI must be <= 50% of salary
+                "max_emi_percent": MAX_EMI_PERCENT,
                 "credit_score": credit_score
             }
+            if monthly_salary:
+                tenure = tenure or DEFAULT_TENURE_MONTHS
+                emi = calculate_emi(requested_amount, tenure)
+                result.update({
+                    "tenure": tenure,
+                    "emi": emi,
+                    "max_affordable_amount": max_affordable_amount(monthly_salary, tenure, max_emi_percent=MAX_EMI_PERCENT),
+                    "emi_within_limit": emi <= monthly_salary * MAX_EMI_PERCENT / 100,
+                })
+                logger.debug("EMI ₹%s/month over %s months (limit: %s%% of ₹%s salary)",
+                             emi, tenure, MAX_EMI_PERCENT, monthly_salary)
+            return result
         
         # Rule 4: Reject if amount is too high
-        else: # requested_amount > 2 * pre_approved_limit
-            print(f"[Underwriting Agent] ❌ REJECTED: Loan amount ₹{requested_amount:,} exceeds 2x the pre-approved limit (₹{2 * pre_approved_limit:,}).")
+        else: # requested_amount > SALARY_SLIP_LIMIT_MULTIPLIER * pre_approved_limit
+            logger.info("REJECTED: Loan amount ₹%s exceeds %sx the pre-approved limit (₹%s).",
+                        requested_amount, SALARY_SLIP_LIMIT_MULTIPLIER, SALARY_SLIP_LIMIT_MULTIPLIER * pre_approved_limit)
             return {
                 "status": "rejected",
-                "reason": f"Unfortunately, we cannot approve the requested amount. The maximum amount we can offer is ₹{2 * pre_approved_limit:,}.",
+                "reason": f"Unfortunately, we cannot approve the requested amount. The maximum amount we can offer is ₹{SALARY_SLIP_LIMIT_MULTIPLIER * pre_approved_limit:,}.",
                 "credit_score": credit_score
             }
 
@@ -107,7 +222,7 @@ if __name__ == '__main__':
     # --- Test Case 2: Requires Salary Slip (Neha Singh) ---
     print("--- TEST 2: Requires Salary Slip ---")
     # Neha has a limit of 600,000. Requesting 1,000,000 (<= 2x limit) should require a slip.
-    result = agent.evaluate_loan("9876543213", 1000000)
+    result = agent.evaluate_loan("9876543213", 1000000, 48)
     print(f"Result: {result}\n")
 
     # --- Test Case 3: Rejection (Amit Patel) ---
@@ -120,4 +235,10 @@ if __name__ == '__main__':
     print("--- TEST 4: Rejection due to High Amount ---")
     # Rajesh has a limit of 500,000. Requesting 1,200,000 (> 2x limit) should be rejected.
     result = agent.evaluate_loan("9876543210", 1200000)
-    print(f"Result: {result}\n")
\ No newline at end of file
+    print(f"Result: {result}\n")
+
+    # --- Test Case 5: Bulk evaluation, including an unknown customer ---
+    print("--- TEST 5: Bulk Evaluation ---")
+    results = agent.evaluate_loans_batch([("9876543211", 600000), ("9876543212", 100000), ("1234567890", 100000)])
+    for result in results:
+        print(f"Result: {result}")
\ No newline at end of file
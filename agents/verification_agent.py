@@ -5,6 +5,9 @@ import os
 # Add the project root to the Python path to import our database utility
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.database import customer_db
+from utils.log import get_logger
+
+logger = get_logger("verification_agent")
 
 class VerificationAgent:
     """
@@ -24,7 +27,7 @@ class VerificationAgent:
         Returns:
             dict: A dictionary containing customer details if found, otherwise an error.
         """
-        print(f"[Verification Agent] Attempting to verify customer with phone: {phone_number}")
+        logger.info("Attempting to verify customer with phone: %s", phone_number)
         
         if not phone_number:
             return {"status": "error", "message": "Phone number cannot be empty."}
@@ -32,7 +35,7 @@ class VerificationAgent:
         customer = customer_db.get_customer_by_phone(phone_number)
         
         if customer:
-            print(f"[Verification Agent] ✅ Successfully verified customer: {customer['name']}")
+            logger.info("Successfully verified customer: %s", customer['name'])
             # Return only the necessary KYC details, INCLUDING the pre-approved limit
             return {
                 "status": "success",
@@ -44,7 +47,7 @@ class VerificationAgent:
                 "pre_approved_limit": customer['pre_approved_limit'] # <-- THIS IS THE FIX
             }
         else:
-            print(f"[Verification Agent] ❌ Verification failed. No customer found with phone: {phone_number}")
+            logger.warning("Verification failed. No customer found with phone: %s", phone_number)
             return {"status": "error", "message": "Customer not found."}
 
 # Example of how we would test this agent directly
@@ -0,0 +1,93 @@
+# benchmarks/bench_entities.py
+"""
+Benchmark for chat entity extraction.
+
+Compares the original CompleteConversationFlow.extract_entities (four separate
+regex scans plus substring checks) with the single-pass extractor in
+utils/entity_extractor.py, on a synthetic corpus of chat messages.
+
+Usage:
+    python benchmarks/bench_entities.py [--messages 200000] [--workers 4]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Add the project root to the Python path to import our utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.entity_extractor import extract_entities, extract_batch
+
+SAMPLE_MESSAGES = [
+    "9876543210",
+    "My number is 9876543211",
+    "I need a loan of 500000",
+    "loan amount 3,00,000",
+    "5 lakh",
+    "₹7,50,000 for 60 months",
+    "I want to borrow 1.2 crore",
+    "tenure 48",
+    "for 36",
+    "3 years",
+    "yes",
+    "no, try for a higher amount",
+    "I don't know yet",
+    "Can you help me with a personal loan?",
+]
+
+
+def legacy_extract_entities(text):
+    """The extractor exactly as CompleteConversationFlow implemented it originally."""
+    entities = {}
+    text = text.lower().strip()
+    mobile_match = re.search(r'(\d{10})', text)
+    if mobile_match:
+        entities["mobile"] = mobile_match.group(1)
+    loan_match = re.search(r'(?:loan|amount|borrow|request|need)\s*(?:of|for)?\s*(?:rs\.?|rupees?|₹)?\s*([0-9,]+)', text)
+    if loan_match:
+        try:
+            entities["loan_amount"] = int(loan_match.group(1).replace(",", ""))
+        except ValueError:
+            pass
+    tenure_match = re.search(r'(?:tenure|months?|for)\s*([0-9]+)', text)
+    if tenure_match:
+        try:
+            entities["tenure"] = int(tenure_match.group(1))
+        except ValueError:
+            pass
+    if "yes" in text:
+        entities["response"] = "yes"
+    elif "no" in text:
+        entities["response"] = "no"
+    return entities
+
+
+def rate(label, func, messages):
+    start = time.perf_counter()
+    func(messages)
+    elapsed = time.perf_counter() - start
+    per_second = len(messages) / elapsed
+    print(f"{label:>28}: {per_second:12,.0f} messages/s")
+    return per_second
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chat entity extraction.")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    random.seed(42)
+    messages = [random.choice(SAMPLE_MESSAGES) for _ in range(args.messages)]
+
+    print(f"--- Entity extraction benchmark ({args.messages:,} messages) ---")
+    before = rate("legacy (4 scans)", lambda msgs: [legacy_extract_entities(m) for m in msgs], messages)
+    after = rate("single-pass", lambda msgs: [extract_entities(m) for m in msgs], messages)
+    rate(f"single-pass batch ({args.workers} proc)", lambda msgs: extract_batch(msgs, workers=args.workers), messages)
+    print(f"Single-pass vs legacy: {after / before:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
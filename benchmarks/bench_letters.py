@@ -0,0 +1,103 @@
+# benchmarks/bench_letters.py
+"""
+Micro-benchmark for sanction letter rendering.
+
+Compares the original per-call layout (fresh stylesheet and freshly parsed static
+paragraphs for every letter) with the precompiled templates in agents/letter_templates.py.
+Letters are rendered into memory so disk speed doesn't skew the numbers.
+
+Usage:
+    python benchmarks/bench_letters.py [--letters 200]
+"""
+import argparse
+import datetime
+import io
+import os
+import sys
+import time
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+# Add the project root to the Python path to import our agents
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.letter_templates import get_template
+
+MOCK_CUSTOMER = {
+    "customer_id": "CUST001",
+    "name": "Rajesh Kumar",
+    "phone": "9876543210",
+    "email": "rajesh.kumar@email.com",
+    "address": "123, Bandra West, Mumbai - 400050"
+}
+MOCK_LOAN = {"approved_amount": 500000, "interest_rate": "10.99%", "tenure": 60}
+
+
+def legacy_story(customer_details, loan_details):
+    """The story exactly as SanctionLetterGenerator built it before templates were introduced."""
+    styles = getSampleStyleSheet()
+    story = []
+    story.append(Paragraph("<b>Tata Capital Loan Sanction Letter</b>", styles['h1']))
+    story.append(Spacer(1, 0.2 * inch))
+    story.append(Paragraph(f"Date: {datetime.datetime.now().strftime('%d-%B-%Y')}", styles['Normal']))
+    story.append(Spacer(1, 0.3 * inch))
+    story.append(Paragraph("<b>To,</b>", styles['Normal']))
+    story.append(Paragraph(f"{customer_details['name']}", styles['Normal']))
+    story.append(Paragraph(f"{customer_details['address']}", styles['Normal']))
+    story.append(Paragraph(f"Phone: {customer_details['phone']}", styles['Normal']))
+    story.append(Paragraph(f"Email: {customer_details['email']}", styles['Normal']))
+    story.append(Spacer(1, 0.3 * inch))
+    story.append(Paragraph("<b>Subject: Personal Loan Sanction</b>", styles['h2']))
+    story.append(Spacer(1, 0.2 * inch))
+    body_text = f"""
+    Dear {customer_details['name']},<br/><br/>
+    We are pleased to inform you that your personal loan application has been approved.
+    The sanction details are as follows:<br/><br/>
+    <b>Sanctioned Loan Amount:</b> ₹{loan_details['approved_amount']:,}<br/>
+    <b>Interest Rate:</b> {loan_details.get('interest_rate', '10.99%')}<br/>
+    <b>Tenure:</b> {loan_details.get('tenure', 'Not Specified')} months<br/>
+    <b>Customer ID:</b> {customer_details['customer_id']}<br/><br/>
+    This sanction letter is valid for 30 days from the date of issue.
+    Please contact our branch to proceed with the disbursement process.<br/><br/>
+    Congratulations on your loan approval!<br/><br/>
+    Sincerely,<br/>
+    Tata Capital Loan Team
+    """
+    story.append(Paragraph(body_text, styles['Normal']))
+    return story
+
+
+def template_story(customer_details, loan_details):
+    return get_template("standard").build_story(customer_details, loan_details)
+
+
+def run(build_story, letters, render):
+    """Returns letters/second for `letters` iterations of build_story (+ PDF build if `render`)."""
+    start = time.perf_counter()
+    for _ in range(letters):
+        story = build_story(MOCK_CUSTOMER, MOCK_LOAN)
+        if render:
+            SimpleDocTemplate(io.BytesIO(), pagesize=A4).build(story)
+    return letters / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sanction letter rendering.")
+    parser.add_argument("--letters", type=int, default=200, help="Letters to render per variant")
+    args = parser.parse_args()
+
+    # Warm up both paths (imports, font loading, first template compile)
+    run(legacy_story, 5, True)
+    run(template_story, 5, True)
+
+    print(f"--- Sanction letter benchmark ({args.letters} letters per variant) ---")
+    for label, render in (("story layout only", False), ("full PDF render", True)):
+        before = run(legacy_story, args.letters, render)
+        after = run(template_story, args.letters, render)
+        print(f"{label:>18}: before {before:8.1f} letters/s | after {after:8.1f} letters/s | {after / before:4.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+# benchmarks/bench_suite.py
+"""
+End-to-end benchmark suite.
+
+Runs entirely locally: the mock API server is started in-process on an ephemeral
+port and /chat is driven through Flask's test client, so no other process needs
+to be running. Measures:
+
+    verify_customer      VerificationAgent.verify_customer
+    discuss_loan         SalesAgent.discuss_loan
+    evaluate_loan        UnderwritingAgent.evaluate_loan (HTTP to the in-process mock APIs)
+    evaluate_loan_inprocess  The same, reading customer_db directly (InProcessDataSource)
+    generate_letter      SanctionLetterGenerator.generate_letter (in-memory storage)
+    chat_conversation    A full three-turn /chat conversation (phone, amount, tenure)
+
+For each one it reports throughput and latency percentiles, and writes the results
+as JSON (tagged with the git commit) so runs can be compared across commits.
+
+Usage:
+    python benchmarks/bench_suite.py [--iterations 500] [--output results.json]
+    python benchmarks/bench_suite.py --compare baseline.json [--threshold 10]
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+from werkzeug.serving import make_server, WSGIRequestHandler
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+# Letters rendered by the /chat benchmark must not end up in generated_letters/
+os.environ.setdefault("LETTER_STORAGE", "memory")
+# Measure with production logging (set LOG_LEVEL=INFO to see the agents' activity)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+PHONES = ["9876543210", "9876543211", "9876543212", "9876543213", "9876543214"]
+CONVERSATION = [("9876543211", "600000", "48"), ("9876543210", "400000", "60"), ("9876543214", "200000", "36")]
+BENCHMARKS = ("verify_customer", "discuss_loan", "evaluate_loan", "evaluate_loan_inprocess", "generate_letter",
+              "chat_conversation")
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    """Skips werkzeug's per-request access log."""
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve_in_background(wsgi_app):
+    """Serves a WSGI app from a background thread on a free local port and returns (server, base_url)."""
+    server = make_server("127.0.0.1", 0, wsgi_app, threaded=True, request_handler=_QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def start_mock_api_server():
+    """Starts the mock API server in a background thread on a free port and returns (server, base_url)."""
+    from mock_apis.server import app as mock_app
+    return serve_in_background(mock_app)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def measure(func, iterations, warmup):
+    """Calls func(i) `warmup` + `iterations` times and summarizes the timed calls."""
+    for i in range(warmup):
+        func(i)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    to_ms = 1000.0
+    return {
+        "iterations": iterations,
+        "throughput_per_s": iterations / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * to_ms,
+        "p50_ms": percentile(latencies, 50) * to_ms,
+        "p95_ms": percentile(latencies, 95) * to_ms,
+        "p99_ms": percentile(latencies, 99) * to_ms,
+        "max_ms": latencies[-1] * to_ms,
+    }
+
+
+def build_benchmarks(base_url):
+    """Creates the agents against the in-process mock APIs and returns {name: callable(i)}."""
+    from agents.verification_agent import VerificationAgent
+    from agents.sales_agent import SalesAgent
+    from agents.underwriting_agent import UnderwritingAgent
+    from agents.sanction_letter_generator import SanctionLetterGenerator
+    from utils.api_client import ApiClient
+    from utils.data_sources import InProcessDataSource
+    from utils.letter_store import LetterStore
+    from web_interface.app import app as chat_app
+
+    verification_agent = VerificationAgent()
+    sales_agent = SalesAgent()
+    # An uncached client, so every call really goes over HTTP
+    underwriting_agent = UnderwritingAgent(data_source=ApiClient(base_url=base_url))
+    inprocess_underwriting_agent = UnderwritingAgent(data_source=InProcessDataSource())
+    letter_generator = SanctionLetterGenerator(storage="memory", store=LetterStore())
+    customer = {"customer_id": "CUST001", "name": "Rajesh Kumar", "phone": "9876543210",
+                "email": "rajesh.kumar@email.com", "address": "123, Bandra West, Mumbai - 400050"}
+
+    def chat_conversation(i):
+        phone, amount, tenure = CONVERSATION[i % len(CONVERSATION)]
+        client = chat_app.test_client()
+        for message in (phone, amount, tenure):
+            response = client.post("/chat", json={"message": message})
+            if response.status_code != 200:
+                raise RuntimeError(f"/chat returned {response.status_code}")
+
+    return {
+        "verify_customer": lambda i: verification_agent.verify_customer(PHONES[i % len(PHONES)]),
+        "discuss_loan": lambda i: sales_agent.discuss_loan(PHONES[i % len(PHONES)], 300000 + (i % 7) * 100000),
+        "evaluate_loan": lambda i: underwriting_agent.evaluate_loan(PHONES[i % len(PHONES)], 300000 + (i % 7) * 100000),
+        "evaluate_loan_inprocess": lambda i: inprocess_underwriting_agent.evaluate_loan(
+            PHONES[i % len(PHONES)], 300000 + (i % 7) * 100000),
+        # Vary the amount so the content-hash dedup doesn't turn renders into cache hits
+        "generate_letter": lambda i: letter_generator.generate_letter(
+            customer, {"approved_amount": 100000 + i, "interest_rate": "10.99%", "tenure": 60}),
+        "chat_conversation": chat_conversation,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Prints the change against a baseline run; returns True if any benchmark regressed beyond `threshold` %."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n--- Compared with {baseline_path} (commit {baseline.get('commit')}) ---")
+    regressed = False
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            print(f"{name:>23}: no baseline")
+            continue
+        throughput_change = (current["throughput_per_s"] / previous["throughput_per_s"] - 1) * 100
+        p95_change = (current["p95_ms"] / previous["p95_ms"] - 1) * 100 if previous["p95_ms"] else 0.0
+        flag = ""
+        if throughput_change < -threshold or p95_change > threshold:
+            regressed = True
+            flag = "  <-- REGRESSION"
+        print(f"{name:>23}: throughput {throughput_change:+6.1f}%  p95 {p95_change:+6.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agents, mock APIs and the /chat pipeline.")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", choices=BENCHMARKS, action="append", help="Run only these benchmarks")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="A previous results JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent change in throughput or p95 that counts as a regression (default: 10)")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_api_server()
+    # The web app's shared client must talk to the in-process server too
+    os.environ["API_BASE_URL"] = base_url
+    benchmarks = build_benchmarks(base_url)
+
+    print(f"--- Benchmark suite ({args.iterations} iterations, mock APIs at {base_url}) ---")
+    results = {}
+    try:
+        for name in args.only or BENCHMARKS:
+            stats = measure(benchmarks[name], args.iterations, args.warmup)
+            results[name] = stats
+            print(f"{name:>23}: {stats['throughput_per_s']:9,.1f}/s  p50 {stats['p50_ms']:7.2f} ms  "
+                  f"p95 {stats['p95_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms")
+    finally:
+        # Let queued /chat letters finish quietly before stopping the mock APIs
+        from web_interface.app import letter_jobs
+        letter_jobs.shutdown(wait=True)
+        server.shutdown()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
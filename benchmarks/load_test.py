@@ -0,0 +1,233 @@
+# benchmarks/load_test.py
+"""
+Conversation load generator for the /chat endpoint.
+
+Scripts realistic three-turn conversations (phone -> amount -> tenure) for the
+customers in customers.json, in three flavours:
+
+    instant      asks for 80% of the pre-approved limit
+    salary_slip  asks for 150% of the pre-approved limit
+    rejection    a customer whose credit score is below the minimum
+
+New conversations arrive as a Poisson process at --rate per second for --duration
+seconds, and each one runs on its own HTTP session (cookie jar). By default the web
+app and the mock APIs are started in-process on free ports; pass --url to load an
+already running instance instead.
+
+Reports throughput, p50/p95/p99 latency per turn, error rates and outcomes.
+
+Usage:
+    python benchmarks/load_test.py --rate 20 --duration 30
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --rate 50 --mix instant=0.5,salary_slip=0.3,rejection=0.2
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+# In-process targets keep letters in memory and log only warnings
+os.environ.setdefault("LETTER_STORAGE", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.bench_suite import percentile, serve_in_background, start_mock_api_server
+from agents.underwriting_engine import MIN_CREDIT_SCORE
+from utils.database import customer_db
+
+TURNS = ("phone", "amount", "tenure")
+DEFAULT_MIX = "instant=0.6,salary_slip=0.3,rejection=0.1"
+TENURES = (12, 24, 36, 48, 60)
+
+
+def build_scenarios():
+    """
+    Groups scripted conversations by flavour.
+
+    Returns:
+        dict: {"instant": [(phone, amount), ...], "salary_slip": [...], "rejection": [...]}
+    """
+    scenarios = {"instant": [], "salary_slip": [], "rejection": []}
+    for customer in customer_db.iter_customers():
+        limit = customer['pre_approved_limit']
+        if customer['credit_score'] < MIN_CREDIT_SCORE:
+            scenarios["rejection"].append((customer['phone'], int(limit * 0.8)))
+        else:
+            scenarios["instant"].append((customer['phone'], int(limit * 0.8)))
+            scenarios["salary_slip"].append((customer['phone'], int(limit * 1.5)))
+    return scenarios
+
+
+def parse_mix(text, scenarios):
+    """Parses "instant=0.6,salary_slip=0.3,..." into (names, weights), skipping flavours with no customers."""
+    names, weights = [], []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in scenarios:
+            raise ValueError(f"Unknown scenario {name!r}; choose from {', '.join(scenarios)}")
+        if scenarios[name] and float(weight) > 0:
+            names.append(name)
+            weights.append(float(weight))
+    if not names:
+        raise ValueError("The mix selects no scenario that has matching customers.")
+    return names, weights
+
+
+def classify(message):
+    """Buckets the final bot message into an outcome."""
+    if "Congratulations" in message:
+        return "approved"
+    if "Unfortunately" in message:
+        return "rejected"
+    return "other"
+
+
+class LoadStats:
+    """Thread-safe collection of per-turn latencies, errors and outcomes."""
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.outcomes = Counter()
+        self.conversations = Counter()
+        self._lock = threading.Lock()
+
+    def record_turn(self, turn, seconds, error=None):
+        with self._lock:
+            self.latencies[turn].append(seconds)
+            if error:
+                self.errors[turn] += 1
+
+    def record_conversation(self, scenario, outcome):
+        with self._lock:
+            self.conversations[scenario] += 1
+            self.outcomes[f"{scenario}:{outcome}"] += 1
+
+
+def run_conversation(base_url, scenario, phone, amount, tenure, think_time, timeout, stats):
+    """Plays one scripted conversation on its own session (cookie jar)."""
+    with requests.Session() as session:
+        message = ""
+        for turn, text in zip(TURNS, (phone, str(amount), str(tenure))):
+            start = time.perf_counter()
+            error = None
+            try:
+                response = session.post(f"{base_url}/chat", json={"message": text}, timeout=timeout)
+                if response.status_code != 200:
+                    error = f"HTTP {response.status_code}"
+                else:
+                    message = response.json().get("message", "")
+            except (requests.exceptions.RequestException, ValueError) as e:
+                error = type(e).__name__
+            stats.record_turn(turn, time.perf_counter() - start, error)
+            if error:
+                stats.record_conversation(scenario, "error")
+                return
+            if think_time:
+                time.sleep(random.expovariate(1.0 / think_time))
+        stats.record_conversation(scenario, classify(message))
+
+
+def start_in_process_target():
+    """Starts the mock APIs and the web app on free local ports; returns (servers, web_base_url)."""
+    api_server, api_url = start_mock_api_server()
+    # The web app's shared API client reads its base URL at import time
+    os.environ["API_BASE_URL"] = api_url
+    from web_interface.app import app as chat_app
+    web_server, web_url = serve_in_background(chat_app)
+    return [web_server, api_server], web_url
+
+
+def summarize(stats, elapsed):
+    turns = {}
+    for turn in TURNS:
+        latencies = sorted(stats.latencies[turn])
+        count = len(latencies)
+        turns[turn] = {
+            "requests": count,
+            "errors": stats.errors[turn],
+            "error_rate": stats.errors[turn] / count if count else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+    total_requests = sum(t["requests"] for t in turns.values())
+    return {
+        "elapsed_s": elapsed,
+        "conversations": sum(stats.conversations.values()),
+        "conversations_per_s": sum(stats.conversations.values()) / elapsed if elapsed else 0.0,
+        "requests_per_s": total_requests / elapsed if elapsed else 0.0,
+        "error_rate": sum(stats.errors.values()) / total_requests if total_requests else 0.0,
+        "turns": turns,
+        "outcomes": dict(sorted(stats.outcomes.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent scripted conversations against /chat.")
+    parser.add_argument("--url", help="Base URL of a running web app (default: start one in-process)")
+    parser.add_argument("--rate", type=float, default=10.0, help="New conversations per second (Poisson arrivals)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to keep starting conversations")
+    parser.add_argument("--max-concurrency", type=int, default=200, help="Upper bound on simultaneous conversations")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a customer's turns, in seconds")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    scenarios = build_scenarios()
+    names, weights = parse_mix(args.mix, scenarios)
+
+    servers = []
+    base_url = args.url.rstrip("/") if args.url else None
+    if base_url is None:
+        servers, base_url = start_in_process_target()
+
+    print(f"--- Load test: {args.rate:g} conversations/s for {args.duration:g}s against {base_url} ---")
+    stats = LoadStats()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.max_concurrency, thread_name_prefix="customer") as pool:
+        next_arrival = start
+        while True:
+            next_arrival += random.expovariate(args.rate)
+            if next_arrival - start > args.duration:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            scenario = random.choices(names, weights)[0]
+            phone, amount = random.choice(scenarios[scenario])
+            pool.submit(run_conversation, base_url, scenario, phone, amount, random.choice(TENURES),
+                        args.think_time, args.timeout, stats)
+    elapsed = time.perf_counter() - start
+
+    for server in servers:
+        server.shutdown()
+
+    summary = summarize(stats, elapsed)
+    print(f"Conversations: {summary['conversations']:,} ({summary['conversations_per_s']:,.1f}/s), "
+          f"requests: {summary['requests_per_s']:,.1f}/s, error rate: {summary['error_rate']:.2%}")
+    for turn, numbers in summary["turns"].items():
+        print(f"{turn:>8}: p50 {numbers['p50_ms']:7.2f} ms  p95 {numbers['p95_ms']:7.2f} ms  "
+              f"p99 {numbers['p99_ms']:7.2f} ms  errors {numbers['errors']:,} ({numbers['error_rate']:.2%})")
+    print(f"Outcomes: {summary['outcomes']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "summary": summary}, f, indent=2)
+        print(f"Summary written to {args.output}")
+    return 1 if summary["error_rate"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
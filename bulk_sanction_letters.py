@@ -0,0 +1,261 @@
+# bulk_sanction_letters.py
+"""
+Bulk (re)issue of sanction letters.
+
+Reads approvals from a JSON Lines or CSV file, renders the letters across a pool
+of worker processes and writes them to a directory (default: generated_letters/)
+or to a .zip / .tar archive. Completed letters are recorded in a manifest, so an
+interrupted run can be resumed with --resume.
+
+Letters bound for an archive are first saved as files in <output>.parts/. The
+archive is built from them once the run finishes, written under a temporary name
+and renamed into place, so an interrupted run never leaves a truncated archive and
+a resumed run rebuilds it from every letter generated so far.
+
+Each approval needs `approved_amount` and `tenure`, plus either the customer's
+details (customer_id, name, phone, email, address) or just a `phone` to look them
+up in the customer database. Optional fields: `application_id` (used to name the
+letter and track progress), `interest_rate` and `template`.
+
+Usage:
+    python bulk_sanction_letters.py approvals.jsonl
+    python bulk_sanction_letters.py approvals.csv --output letters.zip --workers 8 --resume
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from agents.sanction_letter_generator import SanctionLetterGenerator
+from agents.letter_templates import DEFAULT_TEMPLATE
+from utils.database import customer_db
+
+CUSTOMER_FIELDS = ("customer_id", "name", "phone", "email", "address")
+PROGRESS_EVERY = 500
+
+_generator = None
+
+
+def _init_worker():
+    global _generator
+    _generator = SanctionLetterGenerator()
+
+
+def _render_record(job):
+    """Worker entry point: renders one letter and returns (key, filename, pdf_bytes)."""
+    key, filename, customer_details, loan_details, template_name = job
+    return key, filename, _generator.render_bytes(customer_details, loan_details, template_name)
+
+
+def read_approvals(path):
+    """Yields approval records from a .jsonl/.json-lines or .csv file."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as f:
+            yield from csv.DictReader(f)
+    else:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def build_job(index, record):
+    """
+    Turns an approval record into a render job.
+
+    Returns:
+        tuple: (key, filename, customer_details, loan_details, template_name)
+
+    Raises:
+        ValueError: If the record is missing required fields or the customer is unknown.
+    """
+    if all(record.get(field) for field in CUSTOMER_FIELDS):
+        customer_details = {field: record[field] for field in CUSTOMER_FIELDS}
+    else:
+        customer = customer_db.get_customer_by_phone(str(record.get("phone", "")))
+        if not customer:
+            raise ValueError(f"unknown customer phone {record.get('phone')!r}")
+        customer_details = {field: customer[field] for field in CUSTOMER_FIELDS}
+
+    try:
+        loan_details = {
+            "approved_amount": int(record["approved_amount"]),
+            "tenure": int(record["tenure"]),
+            "interest_rate": record.get("interest_rate") or "10.99%",
+        }
+    except (KeyError, ValueError) as e:
+        raise ValueError(f"invalid loan details: {e}")
+
+    key = str(record.get("application_id") or f"row{index}")
+    safe_name = re.sub(r"[^A-Za-z0-9]+", "_", customer_details["name"]).strip("_")
+    safe_key = re.sub(r"[^A-Za-z0-9_-]+", "_", key)
+    if safe_key != key:
+        # Keys that only differ in replaced characters ("A/1", "A 1") still get distinct files
+        safe_key += "_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+    filename = f"Sanction_Letter_{safe_name}_{safe_key}.pdf"
+    return key, filename, customer_details, loan_details, record.get("template") or DEFAULT_TEMPLATE
+
+
+class LetterSink:
+    """Writes rendered letters to a directory or an archive and tracks completed keys in a manifest."""
+    def __init__(self, output, resume):
+        self.output = output
+        self.kind = "zip" if output.endswith(".zip") else "tar" if output.endswith(".tar") else "dir"
+        # Where the letter files go: the output directory itself, or the staging directory of an archive
+        self.letters_dir = output if self.kind == "dir" else f"{output}.parts"
+        self.manifest_path = os.path.join(self.letters_dir, ".bulk_manifest.jsonl")
+
+        self.completed = {}  # key -> filename, in completion order
+        if resume and os.path.exists(self.manifest_path):
+            for entry in self._read_manifest():
+                # A letter counts as done only if its file made it to disk
+                if os.path.exists(os.path.join(self.letters_dir, entry["filename"])):
+                    self.completed[entry["key"]] = entry["filename"]
+            # Start the manifest over from what is actually done, so new records never follow a torn line
+            self._rewrite_manifest()
+        elif not resume and self.kind != "dir" and os.path.isdir(self.letters_dir):
+            shutil.rmtree(self.letters_dir)
+        self._owners = {filename: key for key, filename in self.completed.items()}  # filename -> key
+
+        os.makedirs(self.letters_dir, exist_ok=True)
+        self._manifest = open(self.manifest_path, "a" if resume else "w")
+
+    def _read_manifest(self):
+        with open(self.manifest_path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return  # A torn final line from an interrupted run
+
+    def _rewrite_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            for key, filename in self.completed.items():
+                f.write(json.dumps({"key": key, "filename": filename}) + "\n")
+        os.replace(tmp_path, self.manifest_path)
+
+    def claim(self, key, filename):
+        """Reserves `filename` for `key`. Returns False if another key already writes to it."""
+        return self._owners.setdefault(filename, key) == key
+
+    def write(self, key, filename, pdf_bytes):
+        tmp_path = os.path.join(self.letters_dir, f".{filename}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, os.path.join(self.letters_dir, filename))
+
+        # Record completion only after the letter itself has been written
+        self._manifest.write(json.dumps({"key": key, "filename": filename}) + "\n")
+        self._manifest.flush()
+        self.completed[key] = filename
+
+    def close(self, finished=True, keep_letters=False):
+        """
+        Closes the manifest. For a finished run into an archive, builds the archive and,
+        unless `keep_letters` (e.g. so failed letters can be retried with --resume),
+        removes the staged letters.
+        """
+        self._manifest.close()
+        if self.kind == "dir" or not finished:
+            return
+        self._build_archive()
+        if not keep_letters:
+            shutil.rmtree(self.letters_dir)
+
+    def _build_archive(self):
+        """Writes every completed letter to a temporary archive, then renames it over the output."""
+        tmp_path = f"{self.output}.tmp"
+        if self.kind == "zip":
+            with zipfile.ZipFile(tmp_path, "w") as archive:
+                for filename in self.completed.values():
+                    # PDFs are already compressed, so store them as-is
+                    archive.write(os.path.join(self.letters_dir, filename), filename, compress_type=zipfile.ZIP_STORED)
+        else:
+            with tarfile.open(tmp_path, "w") as archive:
+                for filename in self.completed.values():
+                    archive.add(os.path.join(self.letters_dir, filename), arcname=filename)
+        os.replace(tmp_path, self.output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate sanction letters in bulk.")
+    parser.add_argument("input", help="Approvals as JSON Lines (.jsonl) or CSV (.csv)")
+    parser.add_argument("--output", default="generated_letters",
+                        help="Output directory, or a .zip/.tar archive (default: generated_letters)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--resume", action="store_true", help="Skip letters already recorded in the manifest")
+    args = parser.parse_args()
+
+    sink = LetterSink(args.output, args.resume)
+    rendered = skipped = failed = 0
+    max_in_flight = args.workers * 4
+    start = time.perf_counter()
+    finished = False
+
+    print(f"--- Bulk sanction letters: {args.input} -> {args.output} ({args.workers} workers) ---")
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+            in_flight = set()
+
+            def drain(return_when):
+                nonlocal rendered, failed
+                done, pending = wait(in_flight, return_when=return_when)
+                for future in done:
+                    try:
+                        key, filename, pdf_bytes = future.result()
+                    except Exception as e:
+                        failed += 1
+                        print(f"❌ Failed to render letter: {e}")
+                        continue
+                    sink.write(key, filename, pdf_bytes)
+                    rendered += 1
+                    if rendered % PROGRESS_EVERY == 0:
+                        elapsed = time.perf_counter() - start
+                        print(f"   {rendered:,} letters rendered ({rendered / elapsed:,.1f} letters/s)")
+                return pending
+
+            for index, record in enumerate(read_approvals(args.input), start=1):
+                try:
+                    job = build_job(index, record)
+                except ValueError as e:
+                    failed += 1
+                    print(f"❌ Skipping record {index}: {e}")
+                    continue
+                if job[0] in sink.completed:
+                    skipped += 1
+                    continue
+                if not sink.claim(job[0], job[1]):
+                    failed += 1
+                    print(f"❌ Skipping record {index}: {job[1]} is already used by another application")
+                    continue
+                in_flight.add(pool.submit(_render_record, job))
+                if len(in_flight) >= max_in_flight:
+                    in_flight = drain(FIRST_COMPLETED)
+
+            while in_flight:
+                in_flight = drain(FIRST_COMPLETED)
+        finished = True
+    except KeyboardInterrupt:
+        print("\nInterrupted. Re-run with --resume to continue where this run stopped.")
+    finally:
+        sink.close(finished, keep_letters=failed > 0)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Rendered {rendered:,} letters in {elapsed:.1f}s "
+          f"({rendered / elapsed if elapsed else 0:,.1f} letters/s); "
+          f"skipped {skipped:,} already done; {failed:,} failed.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
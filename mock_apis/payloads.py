@@ -0,0 +1,41 @@
+# mock_apis/payloads.py
+"""
+Response bodies of the Credit Bureau and Offer Mart APIs.
+
+Shared by the mock API server and the in-process data source
+(utils/data_sources.py), so both always return identical data.
+"""
+
+
+def credit_score_payload(phone_number, customer):
+    """Builds the Credit Bureau response body for one customer."""
+    return {
+        "phone": phone_number,
+        "credit_score": customer['credit_score'],
+        "bureau": "MockCIBIL"
+    }
+
+
+def offer_payload(phone_number, customer):
+    """Builds the Offer Mart response body for one customer."""
+    return {
+        "phone": phone_number,
+        "customer_name": customer['name'],
+        "pre_approved_limit": customer['pre_approved_limit'],
+        "interest_rate": "10.99%", # Static for the prototype
+        "status": "Offer Available"
+    }
+
+
+def underwriting_payload(phone_number, customer):
+    """Builds the combined Credit Bureau + Offer Mart body for one customer."""
+    return {
+        "phone": phone_number,
+        "credit": credit_score_payload(phone_number, customer),
+        "offer": offer_payload(phone_number, customer)
+    }
+
+
+def not_found_payload(phone_number):
+    """Builds the per-item entry returned for unknown phones in batch responses."""
+    return {"phone": phone_number, "error": "Customer not found"}
@@ -0,0 +1,68 @@
+# mock_apis/response_cache.py
+"""
+Serialized, validated response bodies for the mock API server.
+
+The per-customer lookups return the same bytes until the customer data changes, so
+each body is JSON-encoded once, on the first request for it, and tagged with a
+strong ETag (a hash of the bytes). Later requests are a dict lookup, and a client
+that already holds the current body gets a 304 without one.
+
+Nothing is built up front, so startup time and memory stay independent of the
+number of customers (as with the SQLite backend). The memoized bodies belong to one
+generation of the customer data and are dropped wholesale when it is reloaded.
+"""
+import hashlib
+import json
+import os
+
+from mock_apis.payloads import credit_score_payload, offer_payload, underwriting_payload
+
+# How long clients may reuse a response before revalidating it
+API_CACHE_MAX_AGE = int(os.environ.get("MOCK_API_CACHE_MAX_AGE", 60))
+CACHE_CONTROL = f"public, max-age={API_CACHE_MAX_AGE}"
+# Most encoded bodies kept per data generation; beyond that, bodies are encoded per request
+API_RESPONSE_CACHE_SIZE = int(os.environ.get("MOCK_API_RESPONSE_CACHE_SIZE", 100000))
+
+# Endpoint kind -> payload builder
+PAYLOAD_BUILDERS = {
+    "credit": credit_score_payload,
+    "offer": offer_payload,
+    "underwriting": underwriting_payload,
+}
+
+
+def encode_body(payload):
+    """Serializes a payload and returns (body bytes, ETag value without quotes)."""
+    body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """(body, etag) pairs per customer and endpoint kind, built on first use."""
+    def __init__(self, database, max_entries=API_RESPONSE_CACHE_SIZE):
+        self.database = database
+        self.max_entries = max_entries
+        self._responses = {}  # (kind, phone) -> (body, etag), for the current data generation
+
+    def invalidate(self, database):
+        """Forgets every encoded response. Registered as a reload listener of `database`."""
+        self.database = database
+        # A fresh dict rather than clear(): a lookup that read the old data can only store into the old one
+        self._responses = {}
+
+    def get(self, kind, phone_number):
+        """Returns (body, etag) for a customer, or None if there is no such customer."""
+        responses = self._responses
+        cached = responses.get((kind, phone_number))
+        if cached is not None:
+            return cached
+        customer = self.database.get_customer_by_phone(phone_number)
+        if customer is None:
+            return None
+        cached = encode_body(PAYLOAD_BUILDERS[kind](phone_number, customer))
+        if len(responses) < self.max_entries:
+            responses[kind, phone_number] = cached
+        return cached
+
+    def __len__(self):
+        return len(self._responses)
@@ -1,42 +1,83 @@
 # mock_apis/server.py
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 import sys
 import os
 
 # Add the project root to the Python path to import our database utility
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.database import customer_db
+from utils.admin import is_admin_request
+from utils.metrics import instrument_flask_app
+from mock_apis.payloads import credit_score_payload, offer_payload, underwriting_payload, not_found_payload
+from mock_apis.response_cache import ResponseCache, CACHE_CONTROL
 
 # Create a Flask application instance
 app = Flask(__name__)
+# Per-route request latency plus a Prometheus-format GET /metrics
+instrument_flask_app(app)
 
-# --- API Endpoint 1: Credit Bureau ---
-@app.route('/api/credit-bureau/score', methods=['GET'])
-def get_credit_score():
+# Upper bound on the number of phones accepted by a single batch request
+MAX_BATCH_SIZE = 5000
+
+# Per-customer bodies are serialized on first use and forgotten whenever the customer data is reloaded
+responses = ResponseCache(customer_db)
+customer_db.add_reload_listener(responses.invalidate)
+
+def _lookup_response(kind):
     """
-    Mock Credit Bureau API.
-    In a real product, this would make an authenticated call to an external service like CIBIL.
-    It would require API keys, customer consent, and robust error handling.
+    Serves a memoized per-customer body with a strong ETag and Cache-Control.
+    Answers 304 Not Modified if the client's If-None-Match already names the current body.
     """
-    # Get the phone number from the query parameters (e.g., /api/credit-bureau/score?phone=9876543210)
     phone_number = request.args.get('phone')
-    
+
     if not phone_number:
         return jsonify({"error": "Phone number is required"}), 400
 
-    customer = customer_db.get_customer_by_phone(phone_number)
-    
-    if customer:
-        # Return the credit score from our mock database
-        return jsonify({
-            "phone": phone_number,
-            "credit_score": customer['credit_score'],
-            "bureau": "MockCIBIL"
-        })
-    else:
+    cached = responses.get(kind, phone_number)
+    if cached is None:
         # Return a 404 Not Found if the customer doesn't exist
         return jsonify({"error": "Customer not found"}), 404
 
+    body, etag = cached
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+def _get_batch_phones():
+    """
+    Reads and validates the list of phones from a batch request body ({"phones": [...]}).
+
+    Returns:
+        tuple: (phones, None) on success, or (None, error_response) if the body is invalid.
+    """
+    body = request.get_json(silent=True) or {}
+    phones = body.get('phones')
+    if not isinstance(phones, list) or not all(isinstance(phone, str) for phone in phones):
+        return None, (jsonify({"error": "A JSON body with a list of phone numbers is required"}), 400)
+    if len(phones) > MAX_BATCH_SIZE:
+        return None, (jsonify({"error": f"At most {MAX_BATCH_SIZE} phone numbers are allowed per request"}), 400)
+    return phones, None
+
+def _batch_response(results):
+    """Wraps per-item batch results with summary counts."""
+    not_found = sum(1 for item in results if "error" in item)
+    return jsonify({"results": results, "count": len(results), "not_found": not_found})
+
+# --- API Endpoint 1: Credit Bureau ---
+@app.route('/api/credit-bureau/score', methods=['GET'])
+def get_credit_score():
+    """
+    Mock Credit Bureau API.
+    In a real product, this would make an authenticated call to an external service like CIBIL.
+    It would require API keys, customer consent, and robust error handling.
+    """
+    # The phone number comes from the query parameters (e.g., /api/credit-bureau/score?phone=9876543210)
+    return _lookup_response("credit")
+
 # --- API Endpoint 2: Offer Mart ---
 @app.route('/api/offer-mart/pre-approved', methods=['GET'])
 def get_pre_approved_offer():
@@ -44,24 +85,72 @@ def get_pre_approved_offer():
     Mock Offer Mart API.
     This service would typically contain complex business logic to generate personalized offers.
     """
-    phone_number = request.args.get('phone')
-    
-    if not phone_number:
-        return jsonify({"error": "Phone number is required"}), 400
+    return _lookup_response("offer")
 
-    customer = customer_db.get_customer_by_phone(phone_number)
-    
-    if customer:
-        # Return the pre-approved limit from our mock database
-        return jsonify({
-            "phone": phone_number,
-            "customer_name": customer['name'],
-            "pre_approved_limit": customer['pre_approved_limit'],
-            "interest_rate": "10.99%", # Static for the prototype
-            "status": "Offer Available"
-        })
-    else:
-        return jsonify({"error": "Customer not found"}), 404
+# --- API Endpoint 3: Combined Credit Bureau + Offer Mart lookup ---
+@app.route('/api/underwriting-data', methods=['GET'])
+def get_underwriting_data():
+    """
+    Returns the credit score and the pre-approved offer for one customer in a single response,
+    so underwriting needs one round trip instead of two.
+    """
+    return _lookup_response("underwriting")
+
+# --- Batch endpoints ---
+# Each accepts a JSON body like {"phones": ["9876543210", ...]} and returns one result per phone,
+# in request order. Unknown phones get an {"phone": ..., "error": "Customer not found"} entry.
+
+@app.route('/api/credit-bureau/score/batch', methods=['POST'])
+def get_credit_scores_batch():
+    """Batch variant of the Credit Bureau API."""
+    phones, error = _get_batch_phones()
+    if error:
+        return error
+
+    results = []
+    for phone_number in phones:
+        customer = customer_db.get_customer_by_phone(phone_number)
+        results.append(credit_score_payload(phone_number, customer) if customer else not_found_payload(phone_number))
+    return _batch_response(results)
+
+@app.route('/api/offer-mart/pre-approved/batch', methods=['POST'])
+def get_pre_approved_offers_batch():
+    """Batch variant of the Offer Mart API."""
+    phones, error = _get_batch_phones()
+    if error:
+        return error
+
+    results = []
+    for phone_number in phones:
+        customer = customer_db.get_customer_by_phone(phone_number)
+        results.append(offer_payload(phone_number, customer) if customer else not_found_payload(phone_number))
+    return _batch_response(results)
+
+@app.route('/api/underwriting-data/batch', methods=['POST'])
+def get_underwriting_data_batch():
+    """Batch variant of the combined Credit Bureau + Offer Mart lookup."""
+    phones, error = _get_batch_phones()
+    if error:
+        return error
+
+    results = []
+    for phone_number in phones:
+        customer = customer_db.get_customer_by_phone(phone_number)
+        results.append(underwriting_payload(phone_number, customer) if customer else not_found_payload(phone_number))
+    return _batch_response(results)
+
+# --- Admin: reload customer data without restarting ---
+@app.route('/admin/reload-customers', methods=['POST'])
+def reload_customers():
+    """Reloads data/customers.json (or the configured backend) and swaps it in atomically."""
+    if not is_admin_request(request):
+        return jsonify({"error": "Forbidden"}), 403
+    if not customer_db.reload():
+        return jsonify({"status": "error", "message": "Could not reload customer data; keeping the current data."}), 500
+    return jsonify({"status": "reloaded", "customers": len(customer_db)})
+
+# Pick up edits to the customer data file automatically
+customer_db.start_watching()
 
 # --- Main entry point to run the server ---
 if __name__ == '__main__':
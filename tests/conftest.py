@@ -0,0 +1,11 @@
+# tests/conftest.py
+"""Shared pytest setup: run everything in-process, without the mock API server or letter files on disk."""
+import os
+import sys
+
+os.environ.setdefault("LETTER_STORAGE", "memory")
+os.environ.setdefault("UNDERWRITING_DATA_SOURCE", "inprocess")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Add the project root to the Python path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
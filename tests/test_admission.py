@@ -0,0 +1,96 @@
+# tests/test_admission.py
+import asyncio
+
+import pytest
+
+from utils.admission import AdmissionController, PRIORITY_IN_PROGRESS, PRIORITY_NEW
+from utils.session_store import ConversationSession
+from web_interface.app import chat_priority
+
+
+@pytest.mark.parametrize("state, priority", [
+    ('AWAITING_PHONE', PRIORITY_NEW),
+    ('AWAITING_LOAN_AMOUNT', PRIORITY_IN_PROGRESS),
+    ('AWAITING_TENURE', PRIORITY_IN_PROGRESS),
+    ('CONVERSATION_END', PRIORITY_NEW),
+])
+def test_chat_priority(state, priority):
+    convo = ConversationSession("session-1", 0)
+    convo.state = state
+    assert chat_priority(convo) == priority
+    assert chat_priority(None) == PRIORITY_NEW
+
+
+def test_full_queue_rejects_or_displaces_by_priority():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+        assert await controller.acquire_async(PRIORITY_NEW)
+        new_waiter = asyncio.ensure_future(controller.acquire_async(PRIORITY_NEW))
+        await asyncio.sleep(0.01)
+
+        # Another new conversation does not outrank the queued one
+        assert not await controller.acquire_async(PRIORITY_NEW)
+        # An in-progress one turns the queued new conversation away
+        in_progress = asyncio.ensure_future(controller.acquire_async(PRIORITY_IN_PROGRESS))
+        assert not await asyncio.wait_for(new_waiter, 1)
+
+        controller.release()
+        assert await asyncio.wait_for(in_progress, 1)
+        controller.release()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.in_flight == 0 and controller._queued == 0
+
+
+def test_waiter_is_rejected_after_the_queue_timeout():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+        assert await controller.acquire_async()
+        assert not await controller.acquire_async()
+        # The timed-out waiter no longer holds a queue place, and the next request is served
+        assert controller._queued == 0
+        controller.release()
+        assert await controller.acquire_async()
+        controller.release()
+        return controller
+
+    assert asyncio.run(scenario()).in_flight == 0
+
+
+def test_cancel_while_queued_gives_up_the_place():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+        assert await controller.acquire_async()
+        waiter = asyncio.ensure_future(controller.acquire_async())
+        await asyncio.sleep(0.01)
+        assert controller._queued == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller._queued == 0
+
+        # The released slot is not handed to the cancelled waiter
+        controller.release()
+        assert controller.in_flight == 0
+        assert await controller.acquire_async()
+        controller.release()
+
+    asyncio.run(scenario())
+
+
+def test_cancel_after_admission_hands_the_slot_back():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+        assert await controller.acquire_async()
+        waiter = asyncio.ensure_future(controller.acquire_async())
+        await asyncio.sleep(0.01)
+
+        controller.release()  # Admits the waiter, which is cancelled before it resumes
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return controller
+
+    assert asyncio.run(scenario()).in_flight == 0
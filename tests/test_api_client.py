@@ -0,0 +1,68 @@
+# tests/test_api_client.py
+import asyncio
+import time
+
+from utils import api_client as api_client_module
+from utils.api_client import ApiClient, CachingApiClient
+from utils.database import customer_db
+
+
+def test_reload_drops_cached_lookups_and_validators(monkeypatch):
+    scores = {"9876543210": 780}
+    monkeypatch.setattr(ApiClient, "get_credit_score",
+                        lambda self, phone: {"phone": phone, "credit_score": scores[phone]})
+    monkeypatch.setattr(ApiClient, "get_pre_approved_offer",
+                        lambda self, phone: {"phone": phone, "pre_approved_limit": scores[phone] * 1000})
+    client = CachingApiClient(base_url="http://127.0.0.1:9")
+    client._validators[("/api/credit-bureau/score", (("phone", "9876543210"),))] = ('"etag"', {})
+
+    assert client.get_credit_score("9876543210")["credit_score"] == 780
+    assert client.get_pre_approved_offer("9876543210")["pre_approved_limit"] == 780000
+    scores["9876543210"] = 640
+    assert client.get_credit_score("9876543210")["credit_score"] == 780  # Still cached
+
+    client.invalidate(customer_db)
+
+    assert client.get_credit_score("9876543210")["credit_score"] == 640
+    assert client.get_pre_approved_offer("9876543210")["pre_approved_limit"] == 640000
+    assert not client._validators
+
+
+def test_shared_client_listens_for_customer_data_reloads():
+    assert api_client_module.api_client.invalidate in customer_db._reload_listeners
+
+
+def _slow_lookups(monkeypatch, seconds):
+    monkeypatch.setattr(ApiClient, "get_credit_score",
+                        lambda self, phone: time.sleep(seconds) or {"phone": phone, "credit_score": 780})
+    monkeypatch.setattr(ApiClient, "get_pre_approved_offer",
+                        lambda self, phone: time.sleep(seconds) or {"phone": phone, "pre_approved_limit": 500000})
+
+
+def test_score_and_offer_are_fetched_concurrently(monkeypatch):
+    _slow_lookups(monkeypatch, 0.2)
+    client = ApiClient(base_url="http://127.0.0.1:9")
+
+    start = time.perf_counter()
+    credit, offer = client.get_underwriting_data("9876543210")
+    elapsed = time.perf_counter() - start
+
+    assert credit["credit_score"] == 780 and offer["pre_approved_limit"] == 500000
+    assert elapsed < 0.35  # One lookup's latency, not two
+
+
+def test_score_and_offer_are_awaited_concurrently(monkeypatch):
+    _slow_lookups(monkeypatch, 0.2)
+    client = ApiClient(base_url="http://127.0.0.1:9")
+
+    start = time.perf_counter()
+    credit, offer = asyncio.run(client.get_underwriting_data_async("9876543210"))
+
+    assert credit["credit_score"] == 780 and offer["pre_approved_limit"] == 500000
+    assert time.perf_counter() - start < 0.35
+
+
+def test_every_call_has_a_connect_and_read_timeout():
+    client = ApiClient(base_url="http://127.0.0.1:9/", connect_timeout=1.5, read_timeout=4)
+    assert client.base_url == "http://127.0.0.1:9"
+    assert client.timeout == (1.5, 4)
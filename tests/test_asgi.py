@@ -0,0 +1,79 @@
+# tests/test_asgi.py
+import asyncio
+import json
+import time
+
+from web_interface import app as web_app
+from web_interface import asgi
+
+
+async def _request(method, path, body=b"", headers=()):
+    """Sends one HTTP request through the ASGI app; returns (status, headers, body)."""
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"",
+             "headers": [(b"content-type", b"application/json"), *headers]}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app(scope, receive, send)
+    response_headers = {name.decode(): value.decode() for name, value in sent[0]["headers"]}
+    return sent[0]["status"], response_headers, b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def _chat(payload, cookie=None):
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    status, headers, body = asyncio.run(_request("POST", "/chat", json.dumps(payload).encode(), headers))
+    return status, headers, json.loads(body)
+
+
+def test_conversation_runs_through_the_async_path():
+    status, headers, body = _chat({"message": "9876543210"})
+    assert status == 200
+    cookie = headers["set-cookie"].split(";", 1)[0]
+
+    _chat({"message": "300000"}, cookie)
+    status, _, body = _chat({"message": "36"}, cookie)
+
+    assert status == 200
+    assert "Congratulations" in body["message"] and "letter_job_id" in body
+    assert web_app.session_store.get(body["session_id"]).state == 'CONVERSATION_END'
+
+
+def test_malformed_and_oversized_bodies_are_rejected():
+    assert asyncio.run(_request("POST", "/chat", b"{not json"))[0] == 400
+    assert asyncio.run(_request("POST", "/chat", b'{"message": "x"}' + b" " * asgi.MAX_CHAT_BODY_BYTES))[0] == 413
+
+
+def test_other_routes_are_served_by_the_flask_app():
+    status, headers, body = asyncio.run(_request("GET", "/letter_status/no-such-job"))
+    assert status == 404
+    assert json.loads(body)["status"] == "unknown"
+
+
+def test_slow_underwriting_does_not_block_other_conversations(monkeypatch):
+    async def slow_evaluate(phone, amount, tenure=None):
+        await asyncio.sleep(0.3)
+        return {"status": "rejected", "reason": "Unfortunately, not today."}
+
+    monkeypatch.setattr(web_app.master_agent.underwriting_agent, "evaluate_loan_async", slow_evaluate)
+    convos = []
+    for _ in range(3):
+        convo = web_app.session_store.create()
+        convo.state = 'AWAITING_TENURE'
+        convo.customer_details = {"phone": "9876543210"}
+        convo.loan_details = {"requested_amount": 300000}
+        convos.append(convo)
+
+    async def tenure_turns():
+        return await asyncio.gather(*(_request("POST", "/chat", json.dumps(
+            {"message": "36", "session_id": convo.session_id}).encode()) for convo in convos))
+
+    start = time.perf_counter()
+    results = asyncio.run(tenure_turns())
+
+    assert [status for status, _, _ in results] == [200, 200, 200]
+    assert time.perf_counter() - start < 0.8  # Overlapping waits, not three in a row
@@ -0,0 +1,51 @@
+# tests/test_bench_suite.py
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks import bench_suite
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert bench_suite.percentile(values, 50) == 50.0
+    assert bench_suite.percentile(values, 95) == 95.0
+    assert bench_suite.percentile(values, 100) == 100.0
+    assert bench_suite.percentile([], 95) == 0.0
+
+
+def test_measure_reports_every_statistic():
+    calls = []
+    stats = bench_suite.measure(calls.append, iterations=5, warmup=2)
+
+    assert calls == [0, 1, 0, 1, 2, 3, 4]
+    assert stats["iterations"] == 5
+    assert 0 <= stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+
+def test_compare_flags_regressions(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"commit": "abc123", "results": {
+        "fast": {"throughput_per_s": 100.0, "p95_ms": 10.0},
+        "slow": {"throughput_per_s": 100.0, "p95_ms": 10.0},
+    }}))
+
+    assert not bench_suite.compare({"fast": {"throughput_per_s": 105.0, "p95_ms": 10.5}}, str(baseline), 10)
+    assert bench_suite.compare({"slow": {"throughput_per_s": 80.0, "p95_ms": 10.0}}, str(baseline), 10)
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_suite_runs_end_to_end_and_writes_json(tmp_path):
+    output = tmp_path / "results.json"
+    completed = subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, "benchmarks", "bench_suite.py"), "--iterations", "3",
+         "--warmup", "0", "--only", "evaluate_loan", "--only", "chat_conversation", "--output", str(output)],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120)
+
+    assert completed.returncode == 0, completed.stderr
+    report = json.loads(output.read_text())
+    assert set(report["results"]) == {"evaluate_loan", "chat_conversation"}
+    assert report["results"]["chat_conversation"]["iterations"] == 3
@@ -0,0 +1,81 @@
+# tests/test_bulk_sanction_letters.py
+import os
+import zipfile
+
+from bulk_sanction_letters import LetterSink, build_job
+
+
+def test_interrupted_zip_run_is_rebuilt_on_resume(tmp_path):
+    output = str(tmp_path / "letters.zip")
+
+    sink = LetterSink(output, resume=False)
+    sink.write("app-1", "letter_1.pdf", b"%PDF-1")
+    sink.write("app-2", "letter_2.pdf", b"%PDF-2")
+    sink.close(finished=False)
+    # An interrupted run leaves no (possibly truncated) archive behind
+    assert not os.path.exists(output)
+
+    sink = LetterSink(output, resume=True)
+    assert set(sink.completed) == {"app-1", "app-2"}
+    sink.write("app-3", "letter_3.pdf", b"%PDF-3")
+    sink.close(finished=True)
+
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == ["letter_1.pdf", "letter_2.pdf", "letter_3.pdf"]
+        assert archive.read("letter_2.pdf") == b"%PDF-2"
+    assert not os.path.exists(f"{output}.parts")
+    assert not os.path.exists(f"{output}.tmp")
+
+
+def test_resume_redoes_letters_whose_file_is_missing(tmp_path):
+    output = str(tmp_path / "letters.tar")
+    sink = LetterSink(output, resume=False)
+    sink.write("app-1", "letter_1.pdf", b"%PDF-1")
+    sink.write("app-2", "letter_2.pdf", b"%PDF-2")
+    sink.close(finished=False)
+    os.remove(os.path.join(f"{output}.parts", "letter_2.pdf"))
+    with open(sink.manifest_path, "a") as f:
+        f.write('{"key": "app-3", "filen')  # Torn by a crash
+
+    sink = LetterSink(output, resume=True)
+
+    assert list(sink.completed) == ["app-1"]
+    sink.close(finished=False)
+
+
+def test_two_resumes_after_a_torn_manifest_line_keep_every_completion(tmp_path):
+    output = str(tmp_path / "letters")
+    sink = LetterSink(output, resume=False)
+    sink.write("a", "a.pdf", b"%PDF-a")
+    sink.close(finished=False)
+    with open(sink.manifest_path, "a") as f:
+        f.write('{"key": "b", "filen')  # Torn by a crash
+
+    sink = LetterSink(output, resume=True)
+    sink.write("c", "c.pdf", b"%PDF-c")
+    sink.close(finished=False)
+
+    sink = LetterSink(output, resume=True)
+    sink.write("d", "d.pdf", b"%PDF-d")
+    sink.close(finished=False)
+
+    assert list(LetterSink(output, resume=True).completed) == ["a", "c", "d"]
+
+
+def test_keys_that_sanitize_alike_get_distinct_filenames():
+    customer = {"customer_id": "CUST001", "name": "Rajesh Kumar", "phone": "9876543210",
+                "email": "rajesh.kumar@email.com", "address": "Mumbai"}
+    loan = {"approved_amount": 500000, "tenure": 60}
+    first = build_job(1, dict(customer, application_id="A/1", **loan))
+    second = build_job(2, dict(customer, application_id="A 1", **loan))
+
+    assert first[1] != second[1]
+
+
+def test_claim_detects_a_filename_used_by_another_key(tmp_path):
+    sink = LetterSink(str(tmp_path / "letters"), resume=False)
+
+    assert sink.claim("a", "letter.pdf")
+    assert sink.claim("a", "letter.pdf")
+    assert not sink.claim("b", "letter.pdf")
+    sink.close(finished=False)
@@ -0,0 +1,83 @@
+# tests/test_cache.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.cache import TTLCache
+
+
+def test_hits_expire_after_the_ttl():
+    loads = []
+    cache = TTLCache(ttl_seconds=0.05)
+    loader = lambda key: loads.append(key) or len(loads)
+
+    assert cache.get_or_load("a", loader) == 1
+    assert cache.get_or_load("a", loader) == 1
+    time.sleep(0.06)
+    assert cache.get_or_load("a", loader) == 2
+
+
+def test_concurrent_misses_share_one_load():
+    loads = []
+
+    def slow_loader(key):
+        loads.append(key)
+        time.sleep(0.1)
+        return key.upper()
+
+    cache = TTLCache()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: cache.get_or_load("a", slow_loader), range(8)))
+
+    assert results == ["A"] * 8
+    assert loads == ["a"]
+
+
+def test_negative_results_are_cached_and_other_errors_are_not():
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        raise (KeyError if key == "missing" else ConnectionError)(key)
+
+    cache = TTLCache(negative_ttl_seconds=60, negative_exceptions=(KeyError,))
+    for _ in range(2):
+        with pytest.raises(KeyError):
+            cache.get_or_load("missing", loader)
+        with pytest.raises(ConnectionError):
+            cache.get_or_load("down", loader)
+
+    assert calls == ["missing", "down", "down"]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    for key in ("a", "b"):
+        cache.get_or_load(key, str.upper)
+    cache.get_or_load("a", str.upper)
+    cache.get_or_load("c", str.upper)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_load("a", lambda key: "reloaded") == "A"
+    assert cache.get_or_load("b", lambda key: "reloaded") == "reloaded"
+
+
+def test_a_load_that_began_before_clear_is_not_cached():
+    started, release = threading.Event(), threading.Event()
+
+    def stale_loader(key):
+        started.set()
+        release.wait(5)
+        return "stale"
+
+    cache = TTLCache()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(cache.get_or_load, "a", stale_loader)
+        started.wait(5)
+        cache.clear()
+        release.set()
+        assert pending.result() == "stale"
+
+    assert cache.get_or_load("a", lambda key: "fresh") == "fresh"
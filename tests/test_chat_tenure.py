@@ -0,0 +1,47 @@
+# tests/test_chat_tenure.py
+import asyncio
+
+import pytest
+
+from web_interface import app as web_app
+
+
+def _post(client, message, session_id=None):
+    response = client.post('/chat', json={"message": message, "session_id": session_id})
+    return response.status_code, response.get_json()
+
+
+def _start_application(client):
+    """Walks a new conversation up to the tenure question and returns its session id."""
+    _, body = _post(client, "9876543210")
+    session_id = body["session_id"]
+    _post(client, "300000", session_id)
+    return session_id
+
+
+@pytest.mark.parametrize("tenure", ["0", "-12", "100000"])
+def test_out_of_range_tenure_is_asked_again(tenure):
+    client = web_app.app.test_client()
+    session_id = _start_application(client)
+
+    status, body = _post(client, tenure, session_id)
+
+    assert status == 200
+    assert body["message"] == web_app.INVALID_TENURE_MESSAGE
+    assert web_app.session_store.get(session_id).state == 'AWAITING_TENURE'
+
+    # The conversation carries on once a valid tenure is given
+    status, body = _post(client, "36", session_id)
+    assert status == 200
+    assert web_app.session_store.get(session_id).state == 'CONVERSATION_END'
+
+
+@pytest.mark.parametrize("tenure", ["0", "-12"])
+def test_out_of_range_tenure_is_asked_again_async(tenure):
+    client = web_app.app.test_client()
+    convo = web_app.session_store.get(_start_application(client))
+
+    result = asyncio.run(web_app.process_message_async(convo, tenure))
+
+    assert result == {"message": web_app.INVALID_TENURE_MESSAGE}
+    assert convo.state == 'AWAITING_TENURE'
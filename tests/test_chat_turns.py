@@ -0,0 +1,166 @@
+# tests/test_chat_turns.py
+import asyncio
+import json
+
+import pytest
+
+from utils.admission import AdmissionController
+from utils.session_store import ConversationSession
+from web_interface import app as web_app
+from web_interface import asgi
+
+
+@pytest.fixture
+def no_admission(monkeypatch):
+    """Rejects every request that asks for an admission slot."""
+    controller = AdmissionController(max_concurrent=0, max_queue=0)
+    monkeypatch.setattr(web_app, "admission", controller)
+    monkeypatch.setattr(asgi, "admission", controller)
+
+
+def _post(client, message, session_id, turn_id):
+    return client.post('/chat', json={"message": message, "session_id": session_id, "turn_id": turn_id})
+
+
+async def _asgi_chat(payload):
+    """Posts one /chat request to the ASGI app; returns (status, headers, body)."""
+    body = json.dumps(payload).encode("utf-8")
+    scope = {"type": "http", "method": "POST", "path": "/chat", "headers": [(b"content-type", b"application/json")]}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app(scope, receive, send)
+    headers = {name.decode(): value.decode() for name, value in sent[0]["headers"]}
+    return sent[0]["status"], headers, json.loads(sent[1]["body"])
+
+
+def test_replay_is_answered_without_an_admission_slot(no_admission):
+    convo = web_app.session_store.create()
+    future, _ = convo.claim_turn("turn-1")
+    convo.complete_turn("turn-1", {"message": "first response"}, future)
+
+    response = _post(web_app.app.test_client(), "9876543210", convo.session_id, "turn-1")
+
+    assert response.status_code == 200
+    assert response.get_json() == {"message": "first response"}
+    assert response.headers[web_app.TURN_REPLAYED_HEADER] == '1'
+
+
+def test_replay_of_an_unfinished_turn_gets_503(monkeypatch):
+    monkeypatch.setattr(web_app, "TURN_REPLAY_WAIT_SECONDS", 0.05)
+    convo = web_app.session_store.create()
+    convo.claim_turn("turn-1")  # An owner that never finishes
+
+    response = _post(web_app.app.test_client(), "9876543210", convo.session_id, "turn-1")
+
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_rejected_owner_releases_waiting_replays(no_admission):
+    convo = web_app.session_store.create()
+
+    response = _post(web_app.app.test_client(), "9876543210", convo.session_id, "turn-1")
+
+    assert response.status_code == 503
+    # The turn was forgotten, so a retry runs it rather than waiting on the rejected attempt
+    _, is_owner = convo.claim_turn("turn-1")
+    assert is_owner
+
+
+def test_asgi_replay_of_an_unfinished_turn_gets_503(monkeypatch):
+    monkeypatch.setattr(asgi, "TURN_REPLAY_WAIT_SECONDS", 0.05)
+    convo = web_app.session_store.create()
+    convo.claim_turn("turn-1")
+
+    status, headers, body = asyncio.run(_asgi_chat({"message": "9876543210", "session_id": convo.session_id,
+                                                    "turn_id": "turn-1"}))
+
+    assert status == 503
+    assert body["error"] == "busy"
+    assert int(headers["retry-after"]) >= 1
+
+
+def test_asgi_serializes_turns_of_one_session(monkeypatch):
+    running = 0
+    overlap = 0
+
+    async def slow_process_message(convo, user_message):
+        nonlocal running, overlap
+        running += 1
+        overlap = max(overlap, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return {"message": user_message}
+
+    monkeypatch.setattr(asgi, "process_message_async", slow_process_message)
+    convo = web_app.session_store.create()
+
+    async def two_turns():
+        return await asyncio.gather(*(_asgi_chat({"message": f"turn {n}", "session_id": convo.session_id,
+                                                  "turn_id": f"turn-{n}"}) for n in range(2)))
+
+    results = asyncio.run(two_turns())
+
+    assert [status for status, _, _ in results] == [200, 200]
+    assert overlap == 1
+
+
+def test_a_duplicate_turn_returns_the_stored_response():
+    client = web_app.app.test_client()
+    first = client.post('/chat', json={"message": "hi"})
+    session_id = first.get_json()["session_id"]
+
+    reply = _post(client, "9876543210", session_id, "turn-1")
+    state = web_app.session_store.get(session_id).state
+    replay = _post(client, "9876543210", session_id, "turn-1")
+    assert replay.status_code == 200
+    assert replay.headers.get(web_app.TURN_REPLAYED_HEADER) == '1'
+    assert replay.get_json() == reply.get_json()
+    assert web_app.session_store.get(session_id).state == state
+
+
+def test_claimed_turns_are_replayed_until_they_expire():
+    convo = ConversationSession("s", expires_at=float("inf"))
+    future, is_owner = convo.claim_turn("t1", ttl_seconds=60)
+    assert is_owner
+    duplicate, is_owner = convo.claim_turn("t1", ttl_seconds=60)
+    assert duplicate is future and not is_owner
+
+    convo.complete_turn("t1", {"response": "ok"})
+    assert duplicate.result(timeout=0) == {"response": "ok"}
+
+    expiring = ConversationSession("s2", expires_at=float("inf"))
+    expiring.claim_turn("t2", ttl_seconds=0)
+    _, is_owner = expiring.claim_turn("t2", ttl_seconds=0)
+    assert is_owner
+
+
+def test_the_replay_cache_keeps_only_the_latest_turns():
+    convo = ConversationSession("s", expires_at=float("inf"))
+    for turn_id in ("a", "b", "c"):
+        convo.claim_turn(turn_id, max_turns=2)
+    assert convo.claim_turn("a", max_turns=2)[1]
+    assert not convo.claim_turn("c", max_turns=2)[1]
+
+
+def test_an_abandoned_turn_can_be_retried():
+    convo = ConversationSession("s", expires_at=float("inf"))
+    future, _ = convo.claim_turn("t1")
+    waiting, _ = convo.claim_turn("t1")
+    convo.abandon_turn("t1", RuntimeError("failed"), future)
+    with pytest.raises(RuntimeError):
+        waiting.result(timeout=0)
+    retry, is_owner = convo.claim_turn("t1")
+    assert is_owner and retry is not future
+
+
+def test_invalid_turn_ids_are_rejected():
+    client = web_app.app.test_client()
+    response = client.post('/chat', json={"message": "hi", "turn_id": "x" * (web_app.MAX_TURN_ID_LENGTH + 1)})
+    assert response.status_code == 400
@@ -0,0 +1,126 @@
+# tests/test_conversation_flow.py
+import json
+import random
+
+import pytest
+
+from utils.complete_conversation_flow import (FALLBACK_RESPONSE, INITIAL_STATE, STATES, TRANSITIONS,
+                                              CompleteConversationFlow, FlowSession, advance,
+                                              assess_loan_application)
+
+
+@pytest.fixture(autouse=True)
+def _seeded_random():
+    random.seed(7)
+
+
+def _walk_to_tenure(session):
+    for message in ("9876543210", "ok", "300000", "54 months"):
+        advance(session, message)
+
+
+def test_every_transition_targets_a_known_state():
+    assert INITIAL_STATE in STATES
+    assert set(TRANSITIONS) <= set(STATES)
+    for spec in STATES.values():
+        assert set(spec["next_states"]) <= set(STATES)
+
+
+def test_the_greeting_waits_for_a_mobile_number():
+    session = FlowSession()
+    reply = advance(session, "hello there")
+    assert reply["state"] == "greeting"
+    assert reply["response"] == STATES["greeting"]["entry_message"]
+
+    reply = advance(session, "9876543210")
+    assert reply["state"] == "mobile_verification"
+    assert session.application_data["mobile"] == "9876543210"
+
+
+def test_verification_offers_the_pre_approved_limit():
+    session = FlowSession()
+    advance(session, "9876543210")
+    reply = advance(session, "ok")
+    assert reply["state"] == "loan_offer"
+    assert "₹200,000" in reply["response"]
+    assert session.application_data["pre_approved_limit"] == 200000
+
+
+def test_amount_and_tenure_lead_to_an_assessment():
+    session = FlowSession()
+    _walk_to_tenure(session)
+    assert session.state == "loan_tenure"
+    assert session.application_data["loan_amount"] == 300000
+    assert session.application_data["tenure"] == 54
+
+    reply = advance(session, "go ahead")
+    assert reply["state"] in ("rejection", "offer_exceeding_limit", "offer")
+    assert session.state == reply["state"]
+    assert isinstance(reply["options"], list)
+
+
+def test_assessment_outcomes(monkeypatch):
+    data = {"loan_amount": 300000, "pre_approved_limit": 200000}
+    monkeypatch.setattr(random, "randint", lambda low, high: 800)
+    assert assess_loan_application(dict(data))["state"] == "offer_exceeding_limit"
+    assert assess_loan_application(dict(data, loan_amount=100000))["state"] == "offer"
+
+    monkeypatch.setattr(random, "randint", lambda low, high: 650)
+    result = assess_loan_application(dict(data))
+    assert result["state"] == "rejection"
+    assert "650" in result["response"]
+
+
+def test_accepting_the_instant_limit_moves_to_the_offer():
+    session = FlowSession("offer_exceeding_limit", {"loan_amount": 300000, "pre_approved_limit": 200000})
+    reply = advance(session, "yes")
+    assert reply["state"] == "offer"
+    assert session.application_data["loan_amount"] == 200000
+
+
+def test_states_without_a_handler_use_the_fallback():
+    session = FlowSession("goodbye")
+    reply = advance(session, "asdf qwerty")
+    assert reply["response"] == FALLBACK_RESPONSE
+    assert reply["state"] == "goodbye"
+
+
+def test_help_can_start_over():
+    session = FlowSession("help", {"mobile": "9876543210"})
+    reply = advance(session, "start a new application")
+    assert reply["state"] == INITIAL_STATE
+    assert session.application_data == {}
+
+
+def test_sessions_round_trip_through_json_records():
+    session = FlowSession()
+    _walk_to_tenure(session)
+    restored = FlowSession.from_record(json.loads(json.dumps(session.to_record())))
+    assert restored.state == session.state
+    assert restored.application_data == session.application_data
+
+    random.seed(11)
+    expected = advance(session, "go ahead")
+    random.seed(11)
+    assert advance(restored, "go ahead") == expected
+
+
+def test_sessions_are_independent():
+    first, second = FlowSession(), FlowSession()
+    advance(first, "9876543210")
+    assert second.state == INITIAL_STATE
+    assert second.application_data == {}
+
+
+def test_the_object_api_wraps_a_session():
+    flow = CompleteConversationFlow()
+    reply = flow.generate_response("9876543210")
+    assert reply["state"] == flow.get_conversation_state() == flow.conversation_state == "mobile_verification"
+    assert flow.application_data is flow.session.application_data
+    assert flow.extract_entities("54 months") == {"tenure": 54}
+    assert isinstance(flow.assess_loan_application()["options"], list)
+
+    flow.reset_conversation()
+    assert flow.conversation_state == INITIAL_STATE
+    assert flow.application_data == {}
+    assert flow.get_conversation_history() == []
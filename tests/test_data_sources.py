@@ -0,0 +1,52 @@
+# tests/test_data_sources.py
+import asyncio
+
+import pytest
+
+from agents.underwriting_agent import UnderwritingAgent
+from mock_apis import server
+from utils.api_client import CustomerNotFoundError
+from utils.data_sources import InProcessDataSource, create_data_source
+
+PHONES = ["9876543210", "9876543211", "0000000000"]
+
+
+@pytest.fixture
+def mock_api():
+    return server.app.test_client()
+
+
+def test_in_process_bodies_match_the_mock_apis(mock_api):
+    source = InProcessDataSource()
+    phone = PHONES[0]
+
+    assert source.get_credit_score(phone) == mock_api.get("/api/credit-bureau/score", query_string={"phone": phone}).get_json()
+    assert source.get_pre_approved_offer(phone) == mock_api.get("/api/offer-mart/pre-approved", query_string={"phone": phone}).get_json()
+    combined = mock_api.get("/api/underwriting-data", query_string={"phone": phone}).get_json()
+    assert source.get_underwriting_data(phone) == (combined["credit"], combined["offer"])
+    assert asyncio.run(source.get_underwriting_data_async(phone)) == (combined["credit"], combined["offer"])
+
+
+@pytest.mark.parametrize("method, path", [
+    ("get_credit_scores_batch", "/api/credit-bureau/score/batch"),
+    ("get_pre_approved_offers_batch", "/api/offer-mart/pre-approved/batch"),
+    ("get_underwriting_data_batch", "/api/underwriting-data/batch"),
+])
+def test_in_process_batches_match_the_mock_apis(mock_api, method, path):
+    expected = mock_api.post(path, json={"phones": PHONES}).get_json()["results"]
+    assert getattr(InProcessDataSource(), method)(PHONES) == expected
+
+
+def test_unknown_phone_raises_customer_not_found():
+    with pytest.raises(CustomerNotFoundError):
+        InProcessDataSource().get_credit_score("0000000000")
+    assert UnderwritingAgent(InProcessDataSource()).evaluate_loan("0000000000", 100000) == {
+        "status": "error", "message": "Customer not found."}
+
+
+def test_data_source_selection():
+    from utils.api_client import api_client
+    assert create_data_source("http") is api_client
+    assert isinstance(create_data_source("inprocess"), InProcessDataSource)
+    with pytest.raises(ValueError):
+        create_data_source("grpc")
@@ -0,0 +1,112 @@
+# tests/test_database.py
+import json
+import os
+import sqlite3
+
+import pytest
+
+from utils import database
+from utils.database import CustomerDatabase, SQLiteCustomerBackend, JsonCustomerBackend, convert_json_to_sqlite
+
+CUSTOMERS = [{"phone": "9876543210", "name": "Rajesh Kumar", "credit_score": 780, "pre_approved_limit": 500000}]
+
+
+def _write_json(path, text):
+    path.write_text(text)
+    # A distinct size and modification time, so the change is always detected
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_sqlite_backend_rejects_a_file_that_is_not_a_customers_database(tmp_path):
+    not_a_database = tmp_path / "garbage.db"
+    not_a_database.write_bytes(b"this is not sqlite" * 100)
+    with pytest.raises(sqlite3.Error):
+        SQLiteCustomerBackend(str(not_a_database))
+
+    empty = tmp_path / "empty.db"
+    sqlite3.connect(str(empty)).close()
+    with pytest.raises(sqlite3.Error):
+        SQLiteCustomerBackend(str(empty))
+
+    json_path = tmp_path / "customers.json"
+    json_path.write_text(json.dumps(CUSTOMERS))
+    convert_json_to_sqlite(str(json_path), str(tmp_path / "customers.db"))
+    assert SQLiteCustomerBackend(str(tmp_path / "customers.db")).get("9876543210")["name"] == "Rajesh Kumar"
+
+
+def test_a_broken_file_is_not_retried_until_it_changes(tmp_path, monkeypatch):
+    path = tmp_path / "customers.json"
+    _write_json(path, json.dumps(CUSTOMERS))
+    attempts = []
+
+    def create_backend():
+        attempts.append(1)
+        return JsonCustomerBackend(str(path))
+
+    monkeypatch.setattr(CustomerDatabase, "_source_path", staticmethod(lambda: str(path)))
+    monkeypatch.setattr(database, "create_backend", create_backend)
+    db = CustomerDatabase(backend=create_backend())
+    db._source_signature = db._read_source_signature(str(path))
+
+    _write_json(path, "[{broken")
+    assert db.reload_if_changed() is False
+    assert db.reload_if_changed() is False
+    assert len(attempts) == 2  # The initial load and one failed reload
+    assert db.get_customer_by_phone("9876543210") is not None
+
+    _write_json(path, json.dumps(CUSTOMERS + [dict(CUSTOMERS[0], phone="9876543211")]))
+    assert db.reload_if_changed() is True
+    assert len(db) == 2
+
+
+def test_sqlite_backend_matches_the_json_file(tmp_path):
+    json_backend = JsonCustomerBackend()
+    convert_json_to_sqlite(database.DEFAULT_JSON_PATH, str(tmp_path / "customers.db"))
+    sqlite_backend = SQLiteCustomerBackend(str(tmp_path / "customers.db"))
+
+    assert len(sqlite_backend) == len(json_backend)
+    for customer in json_backend.iter_customers():
+        assert sqlite_backend.get(customer["phone"]) == customer
+    assert sqlite_backend.get("0000000000") is None
+    assert [customer["phone"] for customer in sqlite_backend.iter_customers()] == sorted(json_backend.customers)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        database.create_backend("csv")
+    with pytest.raises(FileNotFoundError):
+        database.create_backend("sqlite", "/nonexistent/customers.db")
+
+
+def test_reload_swaps_in_new_data_and_notifies_listeners(tmp_path, monkeypatch):
+    path = tmp_path / "customers.json"
+    _write_json(path, json.dumps(CUSTOMERS))
+    monkeypatch.setattr(CustomerDatabase, "_source_path", staticmethod(lambda: str(path)))
+    monkeypatch.setattr(database, "create_backend", lambda: JsonCustomerBackend(str(path)))
+    db = CustomerDatabase(backend=JsonCustomerBackend(str(path)))
+    notified = []
+    db.add_reload_listener(lambda reloaded: 1 / 0)  # A failing listener does not stop the others
+    db.add_reload_listener(notified.append)
+    old_backend = db.backend
+
+    _write_json(path, json.dumps([dict(CUSTOMERS[0], credit_score=640)]))
+    assert db.reload_if_changed() is True
+
+    assert db.get_customer_by_phone("9876543210")["credit_score"] == 640
+    assert old_backend.get("9876543210")["credit_score"] == 780  # Readers of the old data are unaffected
+    assert notified == [db]
+    assert db.reload_if_changed() is False  # Unchanged file
+
+
+def test_admin_reload_endpoint_is_restricted_to_loopback(monkeypatch):
+    from utils import admin
+    from web_interface import app as web_app
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    monkeypatch.setattr(web_app.customer_db, "reload", lambda: True)
+    client = web_app.app.test_client()
+
+    assert client.post('/admin/reload-customers', environ_base={"REMOTE_ADDR": "10.0.0.8"}).status_code == 403
+    response = client.post('/admin/reload-customers', environ_base={"REMOTE_ADDR": "127.0.0.1"})
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "reloaded"
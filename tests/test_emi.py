@@ -0,0 +1,65 @@
+# tests/test_emi.py
+import pytest
+
+from utils import emi
+from utils.emi import (amortization_schedule, annuity_factor, calculate_emi, emi_table, is_affordable,
+                       is_valid_tenure, max_affordable_amount, parse_rate)
+
+
+def _reference_emi(principal, tenure_months, annual_rate):
+    monthly_rate = annual_rate / 1200.0
+    growth = (1 + monthly_rate) ** tenure_months
+    return principal * monthly_rate * growth / (growth - 1)
+
+
+@pytest.mark.parametrize("principal, tenure, rate", [(500000, 60, 10.99), (100000, 12, 12.5), (2500000, 360, 8.4)])
+def test_emi_matches_the_standard_formula(principal, tenure, rate):
+    assert calculate_emi(principal, tenure, rate) == round(_reference_emi(principal, tenure, rate))
+
+
+def test_rates_are_accepted_in_any_form():
+    assert parse_rate("10.99%") == parse_rate("10.99") == parse_rate(10.99) == 10.99
+    assert calculate_emi(500000, 60, "10.99%") == calculate_emi(500000, 60, 10.99)
+    with pytest.raises(ValueError):
+        parse_rate("n/a")
+
+
+def test_zero_rate_and_invalid_tenure():
+    assert calculate_emi(120000, 12, 0) == 10000
+    with pytest.raises(ValueError):
+        annuity_factor(10.99, 0)
+    assert not is_valid_tenure(0) and is_valid_tenure(1) and is_valid_tenure(360) and not is_valid_tenure(361)
+
+
+def test_max_affordable_amount_is_the_affordability_boundary():
+    amount = max_affordable_amount(80000, 36)
+
+    assert is_affordable(amount, 80000, 36)
+    assert not is_affordable(amount + 1000, 80000, 36)
+
+
+def test_table_and_schedule_agree_with_single_emis(monkeypatch):
+    amounts, tenures, rates = [100000, 500000], [12, 60], [10.99, 12.5]
+    expected = [[[calculate_emi(a, t, r) for r in rates] for t in tenures] for a in amounts]
+
+    monkeypatch.setattr(emi, "np", None)
+    assert emi_table(amounts, tenures, rates) == expected
+
+    schedule = amortization_schedule(500000, 60)
+    assert len(schedule) == 60
+    assert schedule[-1]["balance"] == 0
+    assert sum(row["principal"] for row in schedule) == pytest.approx(500000, abs=1)
+
+
+def test_salary_slip_decision_reports_the_emi_check():
+    from agents.underwriting_agent import UnderwritingAgent
+    agent = UnderwritingAgent()
+
+    result = agent.apply_rules(800000, 750, 500000, monthly_salary=30000, tenure=36)
+
+    assert result["status"] == "pending_salary_slip"
+    assert result["emi"] == calculate_emi(800000, 36)
+    assert result["emi_within_limit"] is False
+    assert result["max_affordable_amount"] == max_affordable_amount(30000, 36)
+    # Without a salary on file the decision carries no EMI details
+    assert "emi" not in agent.apply_rules(800000, 750, 500000)
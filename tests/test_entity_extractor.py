@@ -0,0 +1,56 @@
+# tests/test_entity_extractor.py
+import pytest
+
+from utils.entity_extractor import extract_batch, extract_entities, iter_conversation_log, iter_extract
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("tenure of 48", {"tenure": 48}),
+    ("a term of 36", {"tenure": 36}),
+    ("2 years 6 months", {"tenure": 30}),
+    ("2 years and 6 months", {"tenure": 30}),
+    ("+919876543210", {"mobile": "9876543210"}),
+    ("919876543210", {"mobile": "9876543210"}),
+    ("my number is +91 98765 43210", {"mobile": "9876543210"}),
+    ("call me on 98765 43210", {"mobile": "9876543210"}),
+    ("9876543210", {"mobile": "9876543210"}),
+    ("I need a loan of 5 lakh for 3 years", {"loan_amount": 500000, "tenure": 36}),
+    ("₹5,00,000 please", {"loan_amount": 500000}),
+    ("48 months, not 2 years", {"tenure": 48}),
+    (".5 years", {"tenure": 6}),
+    ("5 lakh 50 thousand", {"loan_amount": 550000}),
+    ("1 crore and 20 lakh", {"loan_amount": 12000000}),
+    ("I am 35 years old", {}),
+    ("aged 35, I need 5 lakh for 3 years", {"loan_amount": 500000, "tenure": 36}),
+    ("loan 9876543210", {"mobile": "9876543210"}),
+    ("₹1,00,00,000", {"loan_amount": 10000000}),
+])
+def test_extract_entities(message, expected):
+    assert extract_entities(message) == expected
+
+
+def test_batch_matches_one_by_one_extraction():
+    messages = ["9876543210", "5 lakh", "yes", "5 lakh", "60 months"] * 3
+
+    expected = [extract_entities(message) for message in messages]
+    assert extract_batch(messages) == expected
+    assert extract_batch(messages, workers=2, chunk_size=4) == expected
+    assert list(iter_extract(messages)) == expected
+
+
+def test_batch_results_are_independent_copies():
+    results = extract_batch(["5 lakh", "5 lakh"])
+    results[0]["loan_amount"] = 1
+    assert results[1] == {"loan_amount": 500000}
+
+
+def test_conversation_log_accepts_json_and_plain_lines(tmp_path):
+    log = tmp_path / "conversation.log"
+    log.write_text('{"message": "I need 5 lakh"}\n\nyes please\n{broken json\n', encoding="utf-8")
+
+    parsed = list(iter_conversation_log(str(log)))
+
+    assert [entry["line"] for entry in parsed] == [1, 3, 4]
+    assert parsed[0]["entities"] == {"loan_amount": 500000}
+    assert parsed[1]["entities"] == {"response": "yes"}
+    assert parsed[2]["message"] == "{broken json"
@@ -0,0 +1,171 @@
+# tests/test_letter_job_queue.py
+import os
+import time
+
+from agents import sanction_letter_generator
+from agents.letter_job_queue import LetterJobQueue
+from agents.sanction_letter_generator import SanctionLetterGenerator
+from utils.letter_store import STALE_TEMP_FILE_SECONDS, LetterStore, prune_letter_directory
+
+CUSTOMER = {
+    "customer_id": "CUST001",
+    "name": "Rajesh Kumar",
+    "phone": "9876543210",
+    "email": "rajesh.kumar@email.com",
+    "address": "123, Bandra West, Mumbai - 400050"
+}
+LOAN = {"approved_amount": 500000, "interest_rate": "10.99%", "tenure": 60}
+
+
+def _wait_for(queue, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while queue.status(job_id)["status"] == "pending" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return queue.status(job_id)
+
+
+def test_process_mode_renders_a_letter(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    queue = LetterJobQueue(SanctionLetterGenerator(storage="disk"), max_workers=1, mode="process")
+    try:
+        status = _wait_for(queue, queue.submit(CUSTOMER, LOAN))
+    finally:
+        queue.shutdown()
+
+    assert status["status"] == "completed"
+    assert os.listdir(tmp_path / "generated_letters") == [status["filename"]]
+
+
+def test_evicted_in_memory_letter_is_reported_expired(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generator = SanctionLetterGenerator(storage="memory", store=LetterStore(max_letters=1))
+    queue = LetterJobQueue(generator, max_workers=1, mode="thread")
+    try:
+        first = queue.submit(CUSTOMER, LOAN)
+        assert _wait_for(queue, first)["status"] == "completed"
+        second = queue.submit(CUSTOMER, dict(LOAN, approved_amount=400000))
+        assert _wait_for(queue, second)["status"] == "completed"
+    finally:
+        queue.shutdown()
+
+    # The second letter pushed the first out of the store, so its download link would 404
+    assert queue.status(first) == {"status": "expired"}
+
+
+def test_prune_removes_stale_temporary_files(tmp_path):
+    stale = tmp_path / ".Sanction_Letter_A.pdf.abc.tmp"
+    fresh = tmp_path / ".Sanction_Letter_B.pdf.def.tmp"
+    letter = tmp_path / "Sanction_Letter_C.pdf"
+    for path in (stale, fresh, letter):
+        path.write_bytes(b"%PDF")
+    an_hour_and_more_ago = time.time() - STALE_TEMP_FILE_SECONDS - 60
+    os.utime(stale, (an_hour_and_more_ago, an_hour_and_more_ago))
+
+    assert prune_letter_directory(str(tmp_path)) == 1
+    assert sorted(os.listdir(tmp_path)) == sorted([fresh.name, letter.name])
+
+
+def test_first_letter_written_triggers_a_prune(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(time, "monotonic", lambda: 1.0)  # Soon after boot, well inside the prune interval
+    swept = []
+    monkeypatch.setattr(sanction_letter_generator, "prune_letter_directory", lambda directory: swept.append(directory) or 0)
+
+    SanctionLetterGenerator(storage="disk", store=LetterStore()).generate_letter(CUSTOMER, LOAN)
+
+    assert swept == ["generated_letters"]
+
+
+class _FailingGenerator:
+    storage = "memory"
+
+    def generate_letter(self, customer_details, loan_details, template_name):
+        raise RuntimeError("renderer crashed")
+
+
+def test_thread_mode_renders_in_the_background(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    queue = LetterJobQueue(SanctionLetterGenerator(storage="memory", store=LetterStore()), max_workers=1,
+                           mode="thread", max_tracked_jobs=2)
+    try:
+        job_ids = [queue.submit(CUSTOMER, dict(LOAN, approved_amount=amount)) for amount in (100000, 200000, 300000)]
+        statuses = [_wait_for(queue, job_id) for job_id in job_ids]
+    finally:
+        queue.shutdown()
+
+    # Only the two most recent jobs are tracked
+    assert statuses[0] == {"status": "unknown"}
+    assert [status["status"] for status in statuses[1:]] == ["completed", "completed"]
+    assert queue.generator.get_letter_bytes(statuses[2]["filename"]).startswith(b"%PDF")
+
+
+def test_failed_render_is_reported():
+    queue = LetterJobQueue(_FailingGenerator(), max_workers=1, mode="thread")
+    try:
+        assert _wait_for(queue, queue.submit(CUSTOMER, LOAN)) == {"status": "failed"}
+    finally:
+        queue.shutdown()
+
+
+def test_letter_status_endpoint(monkeypatch):
+    from web_interface import app as web_app
+    monkeypatch.setattr(web_app.letter_jobs, "status", lambda job_id: {"status": "completed", "filename": "a.pdf"})
+    client = web_app.app.test_client()
+
+    assert client.get('/letter_status/job-1').get_json() == {
+        "status": "completed", "filename": "a.pdf", "message": "||DOWNLOAD_LINK:a.pdf||"}
+
+    monkeypatch.setattr(web_app.letter_jobs, "status", lambda job_id: {"status": "unknown"})
+    assert client.get('/letter_status/job-2').status_code == 404
+
+
+def test_identical_letters_are_rendered_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generator = SanctionLetterGenerator(storage="disk", store=LetterStore())
+    renders = []
+    render_bytes = generator.render_bytes
+    monkeypatch.setattr(generator, "render_bytes", lambda *args: renders.append(1) or render_bytes(*args))
+
+    first = generator.generate_letter(CUSTOMER, LOAN)
+    second = generator.generate_letter(dict(CUSTOMER), dict(LOAN))
+    other = generator.generate_letter(CUSTOMER, dict(LOAN, tenure=48))
+
+    assert first == second and other["filename"] != first["filename"]
+    assert len(renders) == 2
+    assert (tmp_path / "generated_letters" / first["filename"]).read_bytes() == generator.get_letter_bytes(first["filename"])
+
+
+def test_letter_store_is_bounded_by_count_and_bytes():
+    store = LetterStore(max_bytes=10, max_letters=2)
+    store.put("a.pdf", b"aaaa")
+    store.put("b.pdf", b"bbbb")
+    store.get("a.pdf")
+    store.put("c.pdf", b"cccc")  # Over the count: the least recently used (b) goes
+    assert "b.pdf" not in store and "a.pdf" in store
+
+    store.put("d.pdf", b"dddddddd")  # Over the byte budget
+    assert store.total_bytes <= 10 and "d.pdf" in store
+    store.put("huge.pdf", b"x" * 11)  # Larger than the whole budget: never stored
+    assert "huge.pdf" not in store
+
+
+def test_prune_applies_age_and_size_limits(tmp_path):
+    for name, age_days in (("old.pdf", 40), ("older.pdf", 20), ("new.pdf", 0)):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        mtime = time.time() - age_days * 86400
+        os.utime(path, (mtime, mtime))
+
+    assert prune_letter_directory(str(tmp_path), max_age_days=30, max_total_bytes=150) == 2
+    assert os.listdir(tmp_path) == ["new.pdf"]
+
+
+def test_download_streams_letters_from_memory(monkeypatch):
+    from web_interface import app as web_app
+    monkeypatch.setattr(web_app.master_agent.sanction_generator, "get_letter_bytes",
+                        lambda filename: b"%PDF-1.4 test" if filename == "a.pdf" else None)
+    client = web_app.app.test_client()
+
+    response = client.get('/download_letter/a.pdf')
+    assert response.status_code == 200 and response.data == b"%PDF-1.4 test"
+    assert client.get('/download_letter/missing.pdf').status_code == 404
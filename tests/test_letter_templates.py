@@ -0,0 +1,61 @@
+# tests/test_letter_templates.py
+import datetime
+import threading
+
+import pytest
+from reportlab.platypus import Paragraph
+
+from agents.letter_templates import get_styles, get_template
+from agents.sanction_letter_generator import SanctionLetterGenerator
+
+CUSTOMER = {
+    "customer_id": "CUST001",
+    "name": "Rajesh <Kumar> & Sons",
+    "phone": "9876543210",
+    "email": "rajesh.kumar@email.com",
+    "address": "123, Bandra West, Mumbai - 400050"
+}
+LOAN = {"approved_amount": 500000, "interest_rate": "10.99%", "tenure": 60}
+ISSUE_DATE = datetime.date(2026, 1, 15)
+
+
+def _text(story):
+    return " ".join(flowable.getPlainText() for flowable in story if isinstance(flowable, Paragraph))
+
+
+def test_rendering_is_reproducible(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generator = SanctionLetterGenerator(storage="memory")
+
+    first = generator.render_bytes(CUSTOMER, LOAN, "standard", ISSUE_DATE)
+
+    assert first.startswith(b"%PDF")
+    assert generator.render_bytes(CUSTOMER, LOAN, "standard", ISSUE_DATE) == first
+    assert generator.render_bytes(CUSTOMER, LOAN, "document_verified", ISSUE_DATE) != first
+
+
+def test_story_holds_the_escaped_customer_fields():
+    text = _text(get_template("document_verified").build_story(CUSTOMER, LOAN, ISSUE_DATE))
+
+    assert "Rajesh <Kumar> & Sons" in text
+    assert "₹500,000" in text and "60 months" in text
+    assert "15-January-2026" in text
+    assert "salary slip" in text
+
+
+def test_static_flowables_are_compiled_once_per_thread():
+    template = get_template("standard")
+    assert template._static_flowables() is template._static_flowables()
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(template._static_flowables()))
+    thread.start()
+    thread.join()
+    assert other[0] is not template._static_flowables()
+    assert get_styles() is get_styles()
+
+
+def test_unknown_template_is_rejected():
+    with pytest.raises(ValueError):
+        get_template("no-such-template")
+
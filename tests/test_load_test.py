@@ -0,0 +1,64 @@
+# tests/test_load_test.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from agents.underwriting_engine import MIN_CREDIT_SCORE
+from benchmarks import load_test
+from utils.database import customer_db
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_scenarios_follow_the_underwriting_rules():
+    scenarios = load_test.build_scenarios()
+
+    for scenario, conversations in scenarios.items():
+        for phone, amount in conversations:
+            customer = customer_db.get_customer_by_phone(phone)
+            assert (customer["credit_score"] < MIN_CREDIT_SCORE) == (scenario == "rejection")
+            ratio = 1.5 if scenario == "salary_slip" else 0.8
+            assert amount == int(customer["pre_approved_limit"] * ratio)
+
+
+def test_mix_parsing():
+    scenarios = {"instant": [("9876543210", 1)], "salary_slip": [("9876543210", 2)], "rejection": []}
+
+    assert load_test.parse_mix("instant=0.6, salary_slip=0.4,rejection=0.1", scenarios) == (
+        ["instant", "salary_slip"], [0.6, 0.4])
+    with pytest.raises(ValueError):
+        load_test.parse_mix("instant=1,refund=1", scenarios)
+    with pytest.raises(ValueError):
+        load_test.parse_mix("rejection=1", scenarios)
+
+
+def test_summary_counts_errors_and_outcomes():
+    stats = load_test.LoadStats()
+    for turn in load_test.TURNS:
+        stats.record_turn(turn, 0.01)
+    stats.record_conversation("instant", load_test.classify("🎉 Congratulations! Your loan ..."))
+    stats.record_turn("phone", 0.5, error="HTTP 503")
+    stats.record_conversation("rejection", "error")
+
+    summary = load_test.summarize(stats, elapsed=2.0)
+
+    assert summary["conversations"] == 2 and summary["requests_per_s"] == 2.0
+    assert summary["turns"]["phone"]["errors"] == 1 and summary["turns"]["phone"]["error_rate"] == 0.5
+    assert summary["error_rate"] == 0.25
+    assert summary["outcomes"] == {"instant:approved": 1, "rejection:error": 1}
+
+
+def test_load_generator_runs_against_an_in_process_target(tmp_path):
+    output = tmp_path / "summary.json"
+    completed = subprocess.run(
+        [sys.executable, os.path.join(PROJECT_ROOT, "benchmarks", "load_test.py"), "--rate", "10",
+         "--duration", "0.5", "--output", str(output)],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120)
+
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+    summary = json.loads(output.read_text())["summary"]
+    assert summary["conversations"] > 0 and summary["error_rate"] == 0
+    assert all(outcome.split(":")[1] in ("approved", "rejected") for outcome in summary["outcomes"])
@@ -0,0 +1,60 @@
+# tests/test_log.py
+import io
+import json
+import threading
+
+import pytest
+
+from utils import log
+
+
+@pytest.fixture
+def output():
+    """Routes log output to a buffer; the default configuration is restored afterwards."""
+    stream = io.StringIO()
+    yield stream
+    log.configure_logging()
+
+
+def test_records_are_written_by_the_listener_thread(output):
+    written_by = []
+
+    class _RecordingStream(io.StringIO):
+        def write(self, text):
+            written_by.append(threading.current_thread())
+            return super().write(text)
+
+    stream = _RecordingStream()
+    log.configure_logging(level="INFO", fmt="text", stream=stream)
+    log.get_logger("underwriting").info("Evaluating ₹%s", 500000)
+    log.shutdown_logging()
+
+    assert "INFO    [underwriting] Evaluating ₹500000" in stream.getvalue()
+    assert written_by and threading.current_thread() not in written_by
+
+
+def test_records_below_the_level_are_dropped(output):
+    log.configure_logging(level="WARNING", stream=output)
+    logger = log.get_logger("sales")
+    logger.info("not shown")
+    logger.warning("shown")
+    log.shutdown_logging()
+
+    assert "not shown" not in output.getvalue()
+    assert "[sales] shown" in output.getvalue()
+
+
+def test_json_format_has_one_object_per_line(output):
+    log.configure_logging(level="INFO", fmt="json", stream=output)
+    logger = log.get_logger("api_client")
+    logger.info("first")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("second")
+    log.shutdown_logging()
+
+    entries = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [(entry["component"], entry["level"], entry["message"]) for entry in entries] == [
+        ("api_client", "INFO", "first"), ("api_client", "ERROR", "second")]
+    assert "ValueError: boom" in entries[1]["exception"]
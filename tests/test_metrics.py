@@ -0,0 +1,81 @@
+# tests/test_metrics.py
+import pytest
+from flask import Flask
+
+from utils.metrics import PROMETHEUS_CONTENT_TYPE, MetricsRegistry, instrument_flask_app
+
+
+def test_counter_renders_one_line_per_label_set():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs.", ("kind",))
+    counter.inc(kind="a")
+    counter.inc(2, kind="b")
+    counter.inc(kind="a")
+
+    assert registry.counter("jobs_total", "Jobs.", ("kind",)) is counter
+    assert counter.value(kind="a") == 2
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a"} 2\njobs_total{kind="b"} 2' in text
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("wait_seconds", "Waits.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines = histogram.render()
+
+    assert lines[:3] == ['wait_seconds_bucket{le="0.1"} 2', 'wait_seconds_bucket{le="1.0"} 3',
+                         'wait_seconds_bucket{le="+Inf"} 4']
+    assert lines[3] == "wait_seconds_sum 5.65"
+    assert lines[4] == "wait_seconds_count 4"
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("odd_total", "Odd labels.", ("value",)).inc(value='a "quoted"\nvalue')
+    assert 'odd_total{value="a \\"quoted\\"\\nvalue"} 1' in registry.render()
+
+
+def test_track_records_outcomes_and_exceptions():
+    registry = MetricsRegistry()
+    with registry.track("underwriting") as stage:
+        stage.outcome = "approved_instant"
+    with pytest.raises(RuntimeError):
+        with registry.track("underwriting"):
+            raise RuntimeError("down")
+
+    assert registry.stage_calls.value(stage="underwriting", outcome="approved_instant") == 1
+    assert registry.stage_calls.value(stage="underwriting", outcome="exception") == 1
+
+
+def test_flask_requests_are_measured_by_route():
+    registry = MetricsRegistry()
+    app = Flask(__name__)
+
+    @app.route('/items/<item_id>')
+    def item(item_id):
+        return item_id
+
+    instrument_flask_app(app, registry)
+    client = app.test_client()
+    client.get('/items/1')
+    client.get('/items/2')
+    client.get('/missing')
+
+    response = client.get('/metrics')
+    assert response.headers["Content-Type"] == PROMETHEUS_CONTENT_TYPE
+    text = response.get_data(as_text=True)
+    assert 'http_requests_total{endpoint="item",method="GET",status="200"} 2' in text
+    assert 'http_requests_total{endpoint="unmatched",method="GET",status="404"} 1' in text
+
+
+def test_chat_app_exposes_stage_metrics():
+    from web_interface import app as web_app
+    client = web_app.app.test_client()
+    client.post('/chat', json={"message": "9876543210"})
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'chat_stage_calls_total{stage="verification",outcome="success"}' in text
@@ -0,0 +1,66 @@
+# tests/test_mock_api_server.py
+import pytest
+
+from mock_apis import server
+from mock_apis.server import MAX_BATCH_SIZE
+
+KNOWN, UNKNOWN = "9876543210", "0000000000"
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+@pytest.mark.parametrize("path, single_path", [
+    ("/api/credit-bureau/score/batch", "/api/credit-bureau/score"),
+    ("/api/offer-mart/pre-approved/batch", "/api/offer-mart/pre-approved"),
+    ("/api/underwriting-data/batch", "/api/underwriting-data"),
+])
+def test_batch_matches_single_lookups_in_request_order(client, path, single_path):
+    response = client.post(path, json={"phones": [UNKNOWN, KNOWN, KNOWN]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["count"] == 3 and body["not_found"] == 1
+    assert body["results"][0] == {"phone": UNKNOWN, "error": "Customer not found"}
+    single = client.get(single_path, query_string={"phone": KNOWN}).get_json()
+    assert body["results"][1] == body["results"][2] == single
+
+
+def test_combined_lookup_holds_both_bodies(client):
+    combined = client.get("/api/underwriting-data", query_string={"phone": KNOWN}).get_json()
+
+    assert combined["credit"] == client.get("/api/credit-bureau/score", query_string={"phone": KNOWN}).get_json()
+    assert combined["offer"] == client.get("/api/offer-mart/pre-approved", query_string={"phone": KNOWN}).get_json()
+
+
+@pytest.mark.parametrize("body", [None, {}, {"phones": "9876543210"}, {"phones": [9876543210]},
+                                  {"phones": [KNOWN] * (MAX_BATCH_SIZE + 1)}])
+def test_invalid_batch_bodies_are_rejected(client, body):
+    response = client.post("/api/credit-bureau/score/batch", json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+@pytest.mark.parametrize("path", ["/api/credit-bureau/score", "/api/offer-mart/pre-approved"])
+def test_lookups_are_cacheable_and_revalidate_with_304(client, path):
+    response = client.get(path, query_string={"phone": KNOWN})
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == server.CACHE_CONTROL
+    etag = response.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    revalidated = client.get(path, query_string={"phone": KNOWN}, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == etag
+
+    stale = client.get(path, query_string={"phone": KNOWN}, headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.get_json() == response.get_json()
+
+
+def test_unknown_and_missing_phones_get_errors(client):
+    assert client.get("/api/credit-bureau/score", query_string={"phone": UNKNOWN}).status_code == 404
+    assert client.get("/api/credit-bureau/score").status_code == 400
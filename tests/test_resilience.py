@@ -0,0 +1,109 @@
+# tests/test_resilience.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.resilience import CircuitBreaker, Deadline, RetryBudget, hedged_call
+
+
+def _delayed(replies):
+    """A call that returns (or raises) the next reply after that reply's delay."""
+    replies = iter(replies)
+
+    def call():
+        seconds, outcome = next(replies)
+        time.sleep(seconds)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return call
+
+
+def _is_success(status):
+    return status < 500
+
+
+def test_breaker_opens_half_opens_and_closes():
+    changes = []
+    breaker = CircuitBreaker("dep", failure_threshold=2, reset_timeout=0.05,
+                             on_state_change=lambda b, state: changes.append(state))
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()        # the trial call
+    assert not breaker.allow()    # only one trial at a time
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+    assert changes == [CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN, CircuitBreaker.CLOSED]
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker("dep", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_retry_budget_is_exhausted_and_earned_back_by_requests():
+    budget = RetryBudget(ratio=0.5, min_per_second=0, max_balance=2)
+
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+    budget.record_request()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert budget.try_spend()
+
+
+def test_deadline_never_goes_negative():
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    assert deadline.remaining() == 0.0
+
+
+def test_fast_call_is_not_hedged():
+    hedges = []
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = hedged_call(pool, _delayed([(0, 200)]), 0.5, on_hedge=lambda: hedges.append(1),
+                             is_success=_is_success)
+    assert result == 200
+    assert hedges == []
+
+
+def test_hedge_returns_the_first_success_not_the_first_reply():
+    # The primary is slow but succeeds; the hedged copy fails fast with a 5xx
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = hedged_call(pool, _delayed([(0.15, 200), (0.01, 503)]), 0.05, is_success=_is_success)
+    assert result == 200
+
+
+def test_hedge_skips_a_copy_that_raises():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = hedged_call(pool, _delayed([(0.15, 200), (0.01, ConnectionError("reset"))]), 0.05,
+                             is_success=_is_success)
+    assert result == 200
+
+
+def test_hedge_falls_back_to_the_last_failure():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        result = hedged_call(pool, _delayed([(0.1, 503), (0.01, 502)]), 0.05, is_success=_is_success)
+    assert result == 503
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with pytest.raises(ConnectionError):
+            hedged_call(pool, _delayed([(0.1, ConnectionError("reset")), (0.01, 502)]), 0.05,
+                        is_success=_is_success)
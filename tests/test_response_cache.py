@@ -0,0 +1,39 @@
+# tests/test_response_cache.py
+from mock_apis.response_cache import ResponseCache
+
+
+class _Database:
+    def __init__(self, customers):
+        self.customers = customers
+        self.lookups = 0
+
+    def get_customer_by_phone(self, phone):
+        self.lookups += 1
+        return self.customers.get(phone)
+
+
+def _customer(credit_score):
+    return {"phone": "9876543210", "name": "Rajesh Kumar", "credit_score": credit_score, "pre_approved_limit": 500000}
+
+
+def test_responses_are_built_on_first_use_and_memoized():
+    database = _Database({"9876543210": _customer(780)})
+    cache = ResponseCache(database)
+    assert len(cache) == 0
+
+    first = cache.get("credit", "9876543210")
+    assert cache.get("credit", "9876543210") is first
+    assert database.lookups == 1
+    assert cache.get("credit", "0000000000") is None
+
+
+def test_invalidate_drops_the_previous_generation():
+    old = ResponseCache(_Database({"9876543210": _customer(780)}))
+    _, old_etag = old.get("credit", "9876543210")
+
+    old.invalidate(_Database({"9876543210": _customer(640)}))
+
+    assert len(old) == 0
+    body, etag = old.get("credit", "9876543210")
+    assert etag != old_etag
+    assert b"640" in body
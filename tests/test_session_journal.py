@@ -0,0 +1,105 @@
+# tests/test_session_journal.py
+import asyncio
+
+import pytest
+
+from utils.session_journal import SessionJournal, SessionJournalError
+from utils.session_store import SessionStore
+from web_interface import app as web_app
+
+
+class _FailingFile:
+    """Stands in for a journal segment on a full or failing disk."""
+    def write(self, data):
+        raise OSError(28, "No space left on device")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = SessionJournal(str(tmp_path), fsync=False)
+    yield journal
+    journal.close()
+
+
+def test_wait_raises_for_a_record_that_never_reached_the_disk(journal):
+    journal.start(lambda: ())
+    journal._file = _FailingFile()
+
+    with pytest.raises(SessionJournalError):
+        journal.wait(journal.put("session-1", {"state": "AWAITING_TENURE"}, 2e9), timeout=5)
+
+    # Later records go to a fresh segment and are durable again
+    assert journal.wait(journal.put("session-1", {"state": "AWAITING_TENURE"}, 2e9), timeout=5)
+    assert "session-1" in SessionJournal(journal.directory).recover()
+
+
+def test_chat_turn_that_cannot_be_journaled_is_undone(journal, monkeypatch):
+    store = SessionStore(journal=journal)
+    monkeypatch.setattr(web_app, "session_store", store)
+    convo = store.create()
+    journal._file = _FailingFile()
+
+    response = web_app.app.test_client().post('/chat', json={"message": "9876543210", "session_id": convo.session_id,
+                                                              "turn_id": "turn-1"})
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+    assert convo.state == 'AWAITING_PHONE'
+    # The turn was forgotten, so sending it again runs it
+    _, is_owner = convo.claim_turn("turn-1")
+    assert is_owner
+
+
+def test_evicted_sessions_do_not_come_back_after_a_restart(tmp_path):
+    store = SessionStore(max_sessions=2, num_shards=1, journal=SessionJournal(str(tmp_path), fsync=False))
+    sessions = []
+    for _ in range(3):
+        sessions.append(store.create())  # The third evicts the first
+        store.save(sessions[-1])
+    store.create()  # Evicts the second
+    # Saving an evicted session does not bring it back either
+    assert store.save(sessions[0]) is None
+    store.close()
+
+    recovered = SessionStore(max_sessions=2, num_shards=1, journal=SessionJournal(str(tmp_path), fsync=False))
+    try:
+        assert recovered.get(sessions[0].session_id) is None
+        assert recovered.get(sessions[1].session_id) is None
+        assert recovered.get(sessions[2].session_id) is not None
+    finally:
+        recovered.close()
+
+
+def test_sessions_over_capacity_on_recovery_are_journaled_as_deleted(tmp_path):
+    store = SessionStore(journal=SessionJournal(str(tmp_path), fsync=False))
+    sessions = [store.create() for _ in range(3)]
+    for session in sessions:
+        store.save(session)
+    store.close()
+
+    # Restarting with less room evicts the soonest-expiring session, for good
+    SessionStore(max_sessions=2, num_shards=1, journal=SessionJournal(str(tmp_path), fsync=False)).close()
+    recovered = SessionJournal(str(tmp_path)).recover()
+
+    assert sessions[0].session_id not in recovered
+    assert {sessions[1].session_id, sessions[2].session_id} <= set(recovered)
+
+
+def test_save_raises_when_the_commit_times_out(journal, monkeypatch):
+    import utils.session_store as session_store_module
+    from web_interface import asgi
+    monkeypatch.setattr(session_store_module, "JOURNAL_COMMIT_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(asgi, "JOURNAL_COMMIT_TIMEOUT_SECONDS", 0.05)
+    journal.start = lambda snapshot: None  # Never started, so nothing is ever written
+    store = SessionStore(journal=journal)
+    convo = store.create()
+
+    with pytest.raises(SessionJournalError):
+        store.save(convo)
+
+    monkeypatch.setattr(asgi, "session_store", store)
+    with pytest.raises(SessionJournalError):
+        asyncio.run(asgi._save_session(convo))
@@ -0,0 +1,61 @@
+# tests/test_session_store.py
+import time
+
+from utils.session_store import SessionStore
+from web_interface import app as web_app
+
+
+def test_sessions_expire_after_the_ttl():
+    store = SessionStore(ttl_seconds=0.05)
+    session = store.create()
+    assert store.get(session.session_id) is session
+
+    time.sleep(0.06)
+
+    assert store.get(session.session_id) is None
+    assert len(store) == 0
+
+
+def test_access_refreshes_the_ttl():
+    store = SessionStore(ttl_seconds=0.1)
+    session = store.create()
+    for _ in range(3):
+        time.sleep(0.05)
+        assert store.get(session.session_id) is session
+
+
+def test_store_is_capped_and_evicts_the_least_recently_used():
+    store = SessionStore(max_sessions=2, num_shards=1)
+    first, second = store.create(), store.create()
+    store.get(first.session_id)  # Now the second is least recently used
+
+    store.create()
+
+    assert len(store) == 2
+    assert store.get(first.session_id) is first
+    assert store.get(second.session_id) is None
+
+
+def test_unknown_and_deleted_sessions():
+    store = SessionStore()
+    assert store.get(None) is None
+    assert store.get("no-such-session") is None
+    assert store.get_or_create("no-such-session").session_id != "no-such-session"
+
+    session = store.create()
+    store.delete(session.session_id)
+    assert store.get(session.session_id) is None
+
+
+def test_each_browser_gets_its_own_conversation():
+    first, second = web_app.app.test_client(), web_app.app.test_client()
+
+    first_reply = first.post('/chat', json={"message": "9876543210"}).get_json()
+    second_reply = second.post('/chat', json={"message": "hello"}).get_json()
+
+    assert first_reply["session_id"] != second_reply["session_id"]
+    assert web_app.session_store.get(first_reply["session_id"]).state == 'AWAITING_LOAN_AMOUNT'
+    assert web_app.session_store.get(second_reply["session_id"]).state == 'AWAITING_PHONE'
+    # The session cookie alone carries the conversation on
+    first.post('/chat', json={"message": "300000"})
+    assert web_app.session_store.get(first_reply["session_id"]).state == 'AWAITING_TENURE'
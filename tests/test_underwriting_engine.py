@@ -0,0 +1,41 @@
+# tests/test_underwriting_engine.py
+import pytest
+
+from agents import underwriting_engine as engine
+from agents.underwriting_agent import UnderwritingAgent
+
+SCORES = [650, 750, 750, 750]
+LIMITS = [500000, 500000, 500000, 500000]
+AMOUNTS = [100000, 500000, 1000000, 1000001]
+
+
+def test_decisions_summary_and_reasons():
+    codes = engine.decide(SCORES, LIMITS, AMOUNTS)
+
+    assert list(engine.decision_statuses(codes)) == ["rejected", "approved_instant", "pending_salary_slip", "rejected"]
+    assert list(engine.decision_reasons(codes))[0] == "Credit score is below the minimum threshold."
+    assert engine.summarize(codes) == {"approved_instant": 1, "pending_salary_slip": 1,
+                                       "rejected_credit_score": 1, "rejected_amount": 1}
+
+
+def test_policy_can_be_changed_per_run():
+    codes = engine.decide(SCORES, LIMITS, AMOUNTS, min_credit_score=600, salary_slip_multiplier=3)
+    assert list(engine.decision_statuses(codes)) == [
+        "approved_instant", "approved_instant", "pending_salary_slip", "pending_salary_slip"]
+
+
+def test_numpy_and_plain_python_agree(monkeypatch):
+    np = pytest.importorskip("numpy")
+    with_numpy = engine.decide(np.asarray(SCORES), np.asarray(LIMITS), np.asarray(AMOUNTS))
+    monkeypatch.setattr(engine, "np", None)
+    assert list(with_numpy) == engine.decide(SCORES, LIMITS, AMOUNTS)
+
+
+def test_rescoring_the_customer_base_matches_the_agent():
+    agent = UnderwritingAgent()
+    columns, codes = engine.rescore_customer_base(amount_ratio=1.5)
+
+    assert len(columns["phone"]) > 0
+    for phone, score, limit, status in zip(columns["phone"], columns["credit_score"],
+                                           columns["pre_approved_limit"], engine.decision_statuses(codes)):
+        assert status == agent.apply_rules(int(limit * 1.5), score, limit)["status"], phone
@@ -0,0 +1,48 @@
+# tests/test_underwriting_errors.py
+import asyncio
+
+from agents.underwriting_agent import UnderwritingAgent
+from utils.api_client import ApiClient
+from web_interface import app as web_app
+
+
+def _open_circuit_agent():
+    """An underwriting agent whose Credit Bureau and Offer Mart circuits are both open."""
+    client = ApiClient(base_url="http://127.0.0.1:9")
+    for path in ("/api/credit-bureau/score", "/api/offer-mart/pre-approved"):
+        breaker = client._breaker_for(path)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        assert breaker.state == breaker.OPEN
+    return UnderwritingAgent(data_source=client)
+
+
+def _start_application(client):
+    response = client.post('/chat', json={"message": "9876543210"})
+    session_id = response.get_json()["session_id"]
+    client.post('/chat', json={"message": "300000", "session_id": session_id})
+    return session_id
+
+
+def test_open_circuit_keeps_the_application_open(monkeypatch):
+    monkeypatch.setattr(web_app.master_agent, "underwriting_agent", _open_circuit_agent())
+    client = web_app.app.test_client()
+    session_id = _start_application(client)
+
+    response = client.post('/chat', json={"message": "36", "session_id": session_id})
+
+    assert response.status_code == 200
+    assert "Could not connect to verification services." in response.get_json()["message"]
+    assert "letter_job_id" not in response.get_json()
+    assert web_app.session_store.get(session_id).state == 'AWAITING_TENURE'
+
+
+def test_open_circuit_keeps_the_application_open_async(monkeypatch):
+    monkeypatch.setattr(web_app.master_agent, "underwriting_agent", _open_circuit_agent())
+    client = web_app.app.test_client()
+    convo = web_app.session_store.get(_start_application(client))
+
+    result = asyncio.run(web_app.process_message_async(convo, "36"))
+
+    assert "Could not connect to verification services." in result["message"]
+    assert convo.state == 'AWAITING_TENURE'
@@ -0,0 +1,37 @@
+# tests/test_underwriting_parity.py
+import itertools
+
+import pytest
+
+from agents.sales_agent import SalesAgent
+from agents.underwriting_agent import UnderwritingAgent
+from agents.underwriting_engine import (MIN_CREDIT_SCORE, SALARY_SLIP_LIMIT_MULTIPLIER, decide,
+                                        decision_statuses)
+
+LIMIT = 500000
+SCORES = (MIN_CREDIT_SCORE - 1, MIN_CREDIT_SCORE, MIN_CREDIT_SCORE + 1)
+AMOUNTS = (LIMIT - 1, LIMIT, LIMIT + 1,
+           SALARY_SLIP_LIMIT_MULTIPLIER * LIMIT - 1, SALARY_SLIP_LIMIT_MULTIPLIER * LIMIT,
+           SALARY_SLIP_LIMIT_MULTIPLIER * LIMIT + 1)
+# No salary on file, a salary that cannot carry the EMI and one that easily can
+SALARIES = (None, 10000, 1000000)
+TENURES = (None, 12, 84)
+
+
+def test_engine_matches_agent_at_rule_boundaries():
+    agent = UnderwritingAgent()
+    cases = list(itertools.product(SCORES, AMOUNTS, SALARIES, TENURES))
+
+    codes = decide([score for score, *_ in cases], [LIMIT] * len(cases), [amount for _, amount, *_ in cases])
+
+    for (score, amount, salary, tenure), status in zip(cases, decision_statuses(codes)):
+        expected = agent.apply_rules(amount, score, LIMIT, salary, tenure)["status"]
+        assert status == expected, (score, amount, salary, tenure)
+
+
+@pytest.mark.parametrize("tenure", [0, -12, 100000])
+def test_sales_agent_refuses_invalid_tenure(tenure):
+    result = SalesAgent().discuss_loan("9876543210", 400000, tenure)
+
+    assert result["status"] == "error"
+    assert "tenure" in result["message"]
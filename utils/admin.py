@@ -0,0 +1,24 @@
+# utils/admin.py
+import hmac
+import os
+
+# Shared secret for admin endpoints. When unset, admin endpoints only accept loopback requests.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+LOOPBACK_ADDRESSES = {"127.0.0.1", "::1"}
+
+
+def is_admin_request(request):
+    """
+    Checks whether a Flask request may call an admin endpoint.
+
+    Args:
+        request (flask.Request): The incoming request.
+
+    Returns:
+        bool: True if the request carries the admin token (or comes from localhost when no token is configured).
+    """
+    if ADMIN_TOKEN:
+        supplied = request.headers.get("X-Admin-Token", "")
+        return hmac.compare_digest(supplied, ADMIN_TOKEN)
+    return request.remote_addr in LOOPBACK_ADDRESSES
@@ -0,0 +1,179 @@
+# utils/admission.py
+"""
+Admission control for the chat pipeline.
+
+At most `max_concurrent` requests run at once. Others wait in a bounded queue,
+ordered by priority and then arrival, so customers who are already part-way
+through an application are served before brand-new conversations. When the queue
+is full a new arrival is rejected straight away, unless it outranks the lowest
+priority waiter, which is then turned away instead. Waiters that are not admitted
+within `queue_timeout` seconds are rejected as well. A rejected request should be
+answered with 503 and a Retry-After of `retry_after()` seconds.
+
+Works for threads (`acquire`) and for asyncio tasks (`acquire_async`) on the same limiter.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+
+from utils.metrics import metrics
+
+# Defaults for /chat (overridable via environment variables)
+CHAT_MAX_CONCURRENCY = int(os.environ.get("CHAT_MAX_CONCURRENCY", 32))
+CHAT_MAX_QUEUE = int(os.environ.get("CHAT_MAX_QUEUE", 64))
+CHAT_QUEUE_TIMEOUT = float(os.environ.get("CHAT_QUEUE_TIMEOUT", 5.0))
+
+# Lower numbers are admitted first
+PRIORITY_IN_PROGRESS = 0
+PRIORITY_NEW = 1
+PRIORITY_NAMES = {PRIORITY_IN_PROGRESS: "in_progress", PRIORITY_NEW: "new"}
+
+_admissions = metrics.counter("chat_admission_total", "Admission decisions for /chat.", ("priority", "outcome"))
+_queue_wait = metrics.histogram("chat_admission_wait_seconds", "Time /chat requests waited for admission.", ("priority",))
+
+
+class _Waiter:
+    """A queued request. `wake` is called, under the limiter's lock, once it is admitted or displaced."""
+    __slots__ = ("priority", "seq", "admitted", "done", "wake")
+
+    def __init__(self, priority, seq, wake):
+        self.priority = priority
+        self.seq = seq
+        self.admitted = False
+        self.done = False
+        self.wake = wake
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """A concurrency limiter with a bounded priority wait queue."""
+    def __init__(self, max_concurrent=CHAT_MAX_CONCURRENCY, max_queue=CHAT_MAX_QUEUE,
+                 queue_timeout=CHAT_QUEUE_TIMEOUT):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiting = []  # heap of _Waiter; finished waiters are dropped lazily
+        self._queued = 0    # waiters that are neither admitted nor given up
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._avg_service_seconds = 0.1  # moving average, used for Retry-After
+
+    # --- Queue bookkeeping (call with the lock held) ---
+
+    def _try_enqueue(self, priority, wake):
+        """Admits immediately, queues, or returns None if there is no room for `priority`."""
+        if self.in_flight < self.max_concurrent and self._queued == 0:
+            self.in_flight += 1
+            return True
+        if self._queued >= self.max_queue:
+            lowest = max((waiter for waiter in self._waiting if not waiter.done), default=None)
+            if lowest is None or lowest.priority <= priority:
+                return None
+            # Make room by turning away the newest waiter of the lowest priority
+            lowest.done = True
+            self._queued -= 1
+            lowest.wake()
+        if len(self._waiting) > 2 * self.max_queue:
+            # Drop the waiters that timed out or were displaced
+            self._waiting = [waiter for waiter in self._waiting if not waiter.done]
+            heapq.heapify(self._waiting)
+        waiter = _Waiter(priority, next(self._seq), wake)
+        heapq.heappush(self._waiting, waiter)
+        self._queued += 1
+        return waiter
+
+    def _give_up(self, waiter):
+        """Called when a waiter timed out. Returns True if it was admitted just before."""
+        if waiter.admitted:
+            return True
+        if not waiter.done:
+            waiter.done = True
+            self._queued -= 1
+        return False
+
+    def _admit_next(self):
+        while self._waiting and self.in_flight < self.max_concurrent:
+            waiter = heapq.heappop(self._waiting)
+            if waiter.done:
+                continue
+            waiter.done = waiter.admitted = True
+            self._queued -= 1
+            self.in_flight += 1
+            waiter.wake()
+
+    def _record(self, priority, admitted, waited):
+        name = PRIORITY_NAMES[priority]
+        _admissions.inc(priority=name, outcome="admitted" if admitted else "rejected")
+        _queue_wait.observe(waited, priority=name)
+
+    # --- Public API ---
+
+    def acquire(self, priority=PRIORITY_NEW):
+        """
+        Blocks until the request may run. Returns False if it was rejected.
+        Call `release` after every successful acquire.
+        """
+        start = time.monotonic()
+        event = threading.Event()
+        with self._lock:
+            slot = self._try_enqueue(priority, event.set)
+        if slot is None or slot is True:
+            self._record(priority, slot is True, 0.0)
+            return slot is True
+
+        event.wait(self.queue_timeout)
+        with self._lock:
+            admitted = self._give_up(slot)
+        self._record(priority, admitted, time.monotonic() - start)
+        return admitted
+
+    async def acquire_async(self, priority=PRIORITY_NEW):
+        """Asyncio variant of acquire; waits without blocking the event loop."""
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        with self._lock:
+            slot = self._try_enqueue(priority, wake)
+        if slot is None or slot is True:
+            self._record(priority, slot is True, 0.0)
+            return slot is True
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # The client went away; hand the slot on if it was granted meanwhile
+            with self._lock:
+                admitted = self._give_up(slot)
+            if admitted:
+                self.release()
+            raise
+        with self._lock:
+            admitted = self._give_up(slot)
+        self._record(priority, admitted, time.monotonic() - start)
+        return admitted
+
+    def release(self, service_seconds=None):
+        """Frees the slot of a finished request and admits the next waiter."""
+        with self._lock:
+            self.in_flight -= 1
+            if service_seconds is not None:
+                self._avg_service_seconds += 0.1 * (service_seconds - self._avg_service_seconds)
+            self._admit_next()
+
+    def retry_after(self):
+        """Whole seconds a rejected client should wait: roughly the time to drain the current queue."""
+        backlog = self._queued + self.in_flight
+        return max(1, math.ceil(backlog * self._avg_service_seconds / max(1, self.max_concurrent)))
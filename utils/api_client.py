@@ -0,0 +1,364 @@
+# utils/api_client.py
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.cache import TTLCache
+from utils.database import customer_db
+from utils.log import get_logger
+from utils.metrics import metrics
+from utils.resilience import (Deadline, RetryBudget, CircuitBreaker, LatencyTracker, backoff_delay,
+                              hedged_call)
+
+logger = get_logger("api_client")
+
+# Base URL and connection settings for the Credit Bureau and Offer Mart APIs
+API_BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:5001")
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", 2.0))
+DEFAULT_READ_TIMEOUT = float(os.environ.get("API_READ_TIMEOUT", 5.0))
+DEFAULT_POOL_SIZE = int(os.environ.get("API_POOL_SIZE", 20))
+# Phones sent per batch request (the mock server accepts up to 5000)
+DEFAULT_BATCH_SIZE = int(os.environ.get("API_BATCH_SIZE", 1000))
+
+# Lookup cache settings (a TTL of 0 disables caching for that source)
+CREDIT_SCORE_CACHE_TTL = float(os.environ.get("CREDIT_SCORE_CACHE_TTL", 300))
+OFFER_CACHE_TTL = float(os.environ.get("OFFER_CACHE_TTL", 60))
+NOT_FOUND_CACHE_TTL = float(os.environ.get("NOT_FOUND_CACHE_TTL", 30))
+API_CACHE_SIZE = int(os.environ.get("API_CACHE_SIZE", 10000))
+# Total time one lookup may take, across all of its attempts
+API_REQUEST_DEADLINE = float(os.environ.get("API_REQUEST_DEADLINE", 8.0))
+# Retries of failed lookups (connection errors, timeouts, 5xx), with jittered exponential backoff
+API_MAX_RETRIES = int(os.environ.get("API_MAX_RETRIES", 2))
+API_RETRY_BASE_DELAY = float(os.environ.get("API_RETRY_BASE_DELAY", 0.05))
+API_RETRY_MAX_DELAY = float(os.environ.get("API_RETRY_MAX_DELAY", 1.0))
+# Retries may add at most this fraction of extra load (plus a small floor per second)
+API_RETRY_BUDGET_RATIO = float(os.environ.get("API_RETRY_BUDGET_RATIO", 0.2))
+API_RETRY_MIN_PER_SECOND = float(os.environ.get("API_RETRY_MIN_PER_SECOND", 5))
+# Consecutive failures that open a dependency's circuit, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("API_CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT = float(os.environ.get("API_CIRCUIT_RESET_TIMEOUT", 10.0))
+# Hedged GETs: send a second copy once the first is slower than this percentile of recent calls
+API_HEDGE = os.environ.get("API_HEDGE", "0") == "1"
+API_HEDGE_PERCENTILE = float(os.environ.get("API_HEDGE_PERCENTILE", 95))
+# Bodies kept with their ETags for conditional revalidation (0 disables If-None-Match)
+VALIDATOR_CACHE_SIZE = int(os.environ.get("API_VALIDATOR_CACHE_SIZE", 10000))
+
+API_REQUEST_DURATION = metrics.histogram(
+    "api_request_duration_seconds", "Latency of outbound Credit Bureau / Offer Mart calls.", ("path", "outcome"))
+API_RETRIES = metrics.counter("api_retries_total", "Retried outbound API attempts.", ("path",))
+API_RETRY_BUDGET_EXHAUSTED = metrics.counter(
+    "api_retry_budget_exhausted_total", "Retries skipped because the retry budget was used up.", ("path",))
+API_DEADLINE_EXCEEDED = metrics.counter(
+    "api_deadline_exceeded_total", "Lookups abandoned because their deadline passed.", ("path",))
+API_CIRCUIT_REJECTIONS = metrics.counter(
+    "api_circuit_rejections_total", "Calls failed fast because the dependency's circuit was open.", ("dependency",))
+API_CIRCUIT_TRANSITIONS = metrics.counter(
+    "api_circuit_transitions_total", "Circuit breaker state changes.", ("dependency", "state"))
+API_HEDGES = metrics.counter("api_hedged_requests_total", "Second copies sent for slow GET requests.", ("path",))
+
+
+class CustomerNotFoundError(requests.exceptions.HTTPError):
+    """Raised when an API answers 404 because it has no record for the phone number."""
+
+
+class ServiceUnavailableError(requests.exceptions.ConnectionError):
+    """Raised without calling the API while its circuit breaker is open."""
+
+
+class DeadlineExceededError(requests.exceptions.Timeout):
+    """Raised when a lookup's deadline passes before any attempt succeeded."""
+
+
+def _log_circuit_change(breaker, state):
+    API_CIRCUIT_TRANSITIONS.inc(dependency=breaker.name, state=state)
+    if state == CircuitBreaker.OPEN:
+        logger.warning("Circuit for %s opened; failing fast for %.0fs", breaker.name, breaker.reset_timeout)
+    else:
+        logger.info("Circuit for %s is now %s", breaker.name, state)
+
+
+class ApiClient:
+    """
+    A client for the Credit Bureau and Offer Mart APIs.
+
+    All calls go through one requests.Session backed by a keep-alive connection
+    pool, so we only pay TCP connection setup once per pooled connection instead
+    of once per request. Every call has a (connect, read) timeout.
+
+    GET lookups are revalidated: the last body seen for each URL is kept with its
+    ETag and sent back as If-None-Match, so an unchanged record comes back as an
+    empty 304 and is neither transferred nor decoded again.
+
+    Every lookup has a deadline covering all of its attempts. Connection errors,
+    timeouts and 5xx responses are retried with jittered backoff while the shared
+    retry budget allows, and each dependency (credit-bureau, offer-mart, ...) has a
+    circuit breaker that fails calls fast while it is down. With hedging on, a GET
+    that is slower than the recent p95 gets a second copy and the first reply wins.
+    """
+    def __init__(self, base_url=API_BASE_URL, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, pool_size=DEFAULT_POOL_SIZE,
+                 batch_size=DEFAULT_BATCH_SIZE, validator_cache_size=VALIDATOR_CACHE_SIZE,
+                 deadline=API_REQUEST_DEADLINE, max_retries=API_MAX_RETRIES, hedge=API_HEDGE,
+                 hedge_percentile=API_HEDGE_PERCENTILE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.batch_size = batch_size
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.retry_budget = RetryBudget(API_RETRY_BUDGET_RATIO, API_RETRY_MIN_PER_SECOND)
+        self._breakers = {}   # dependency -> CircuitBreaker
+        self._latencies = {}  # path -> LatencyTracker
+        self._resilience_lock = threading.Lock()
+        self.validator_cache_size = validator_cache_size
+        self._validators = OrderedDict()  # (path, phone) -> (etag, decoded body)
+        self._validators_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Worker threads used to issue lookups concurrently
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api-client")
+        # Hedged copies get their own workers, so they never wait behind the lookups that started them
+        self._hedge_executor = (ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api-hedge")
+                                if hedge else None)
+
+    def _breaker_for(self, path):
+        dependency = path.split("/")[2] if path.startswith("/api/") else path
+        with self._resilience_lock:
+            breaker = self._breakers.get(dependency)
+            if breaker is None:
+                breaker = self._breakers[dependency] = CircuitBreaker(
+                    dependency, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT, _log_circuit_change)
+            return breaker
+
+    def invalidate(self, database=None):
+        """Forgets every remembered body and ETag. Registered as a customer data reload listener."""
+        with self._validators_lock:
+            self._validators.clear()
+
+    def _latency_for(self, path):
+        with self._resilience_lock:
+            tracker = self._latencies.get(path)
+            if tracker is None:
+                tracker = self._latencies[path] = LatencyTracker()
+            return tracker
+
+    def _attempt(self, method, path, timeout, **kwargs):
+        """Issues one HTTP request and records its latency by path and outcome (status code or error)."""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=timeout, **kwargs)
+            outcome = response.status_code
+            if response.status_code < 500:
+                self._latency_for(path).record(time.perf_counter() - start)
+            return response
+        finally:
+            API_REQUEST_DURATION.observe(time.perf_counter() - start, path=path, outcome=outcome)
+
+    def _send(self, method, path, **kwargs):
+        """
+        Issues one lookup: attempts bounded by the deadline, retried within the retry
+        budget, hedged when enabled (GETs only), and guarded by the dependency's circuit breaker.
+
+        Returns:
+            requests.Response: The first response below 500, or the last 5xx response.
+        """
+        breaker = self._breaker_for(path)
+        deadline = Deadline(self.deadline)
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                API_CIRCUIT_REJECTIONS.inc(dependency=breaker.name)
+                raise ServiceUnavailableError(f"{breaker.name} is unavailable (circuit open)")
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                API_DEADLINE_EXCEEDED.inc(path=path)
+                raise DeadlineExceededError(f"Deadline of {self.deadline}s exceeded for {path}")
+            timeout = (min(self.timeout[0], remaining), min(self.timeout[1], remaining))
+
+            error = response = None
+            try:
+                if self.hedge and method == "GET":
+                    response = self._hedged_attempt(method, path, timeout, **kwargs)
+                else:
+                    response = self._attempt(method, path, timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                error = e
+            if response is not None and response.status_code < 500:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+
+            # Every lookup here is a read, so any failed attempt is safe to retry
+            delay = backoff_delay(attempt, API_RETRY_BASE_DELAY, API_RETRY_MAX_DELAY)
+            if attempt >= self.max_retries or delay >= deadline.remaining():
+                break
+            if not self.retry_budget.try_spend():
+                API_RETRY_BUDGET_EXHAUSTED.inc(path=path)
+                break
+            API_RETRIES.inc(path=path)
+            time.sleep(delay)
+            attempt += 1
+
+        if error is not None:
+            raise error
+        return response
+
+    def _hedged_attempt(self, method, path, timeout, **kwargs):
+        """One attempt, plus a second copy if the first runs past the recent latency percentile."""
+        delay = self._latency_for(path).percentile(self.hedge_percentile)
+        if delay is None:
+            return self._attempt(method, path, timeout, **kwargs)
+        return hedged_call(self._hedge_executor, lambda: self._attempt(method, path, timeout, **kwargs),
+                           delay, on_hedge=lambda: API_HEDGES.inc(path=path),
+                           is_success=lambda response: response.status_code < 500)
+
+    def _get_json(self, path, params):
+        """
+        Issues a (conditional) GET request and returns the decoded JSON body.
+        Raises for 4xx/5xx responses.
+        """
+        key = (path, tuple(sorted(params.items())))
+        with self._validators_lock:
+            validator = self._validators.get(key)
+
+        headers = {"If-None-Match": validator[0]} if validator else None
+        response = self._send("GET", path, params=params, headers=headers)
+        if response.status_code == 304 and validator:
+            with self._validators_lock:
+                if key in self._validators:
+                    self._validators.move_to_end(key)
+            return validator[1]
+        if response.status_code == 404:
+            with self._validators_lock:
+                self._validators.pop(key, None)
+            raise CustomerNotFoundError(f"Customer not found: {response.url}", response=response)
+        response.raise_for_status()
+
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag and self.validator_cache_size > 0:
+            with self._validators_lock:
+                self._validators[key] = (etag, data)
+                self._validators.move_to_end(key)
+                while len(self._validators) > self.validator_cache_size:
+                    self._validators.popitem(last=False)
+        return data
+
+    def _post_json(self, path, body):
+        """Issues a POST request with a JSON body and returns the decoded JSON response."""
+        response = self._send("POST", path, json=body)
+        response.raise_for_status()
+        return response.json()
+
+    def _post_batches(self, path, phone_numbers):
+        """
+        Splits a list of phones into batch-sized chunks, posts the chunks concurrently,
+        and returns the per-phone results in the original order.
+        """
+        phone_numbers = list(phone_numbers)
+        chunks = [phone_numbers[i:i + self.batch_size] for i in range(0, len(phone_numbers), self.batch_size)]
+        futures = [self._executor.submit(self._post_json, path, {"phones": chunk}) for chunk in chunks]
+        results = []
+        for future in futures:
+            results.extend(future.result()["results"])
+        return results
+
+    def get_credit_score(self, phone_number):
+        """Fetches a customer's credit score from the Credit Bureau API."""
+        return self._get_json("/api/credit-bureau/score", {"phone": phone_number})
+
+    def get_pre_approved_offer(self, phone_number):
+        """Fetches a customer's pre-approved offer from the Offer Mart API."""
+        return self._get_json("/api/offer-mart/pre-approved", {"phone": phone_number})
+
+    def get_underwriting_data(self, phone_number):
+        """
+        Fetches the credit score and the pre-approved offer concurrently.
+
+        Returns:
+            tuple: (credit_data, offer_data) as returned by the two APIs.
+        """
+        # The offer lookup runs on a worker while this thread fetches the score,
+        # so the total latency is the slower of the two calls rather than their sum.
+        offer_future = self._executor.submit(self.get_pre_approved_offer, phone_number)
+        credit_data = self.get_credit_score(phone_number)
+        offer_data = offer_future.result()
+        return credit_data, offer_data
+
+    def get_credit_scores_batch(self, phone_numbers):
+        """Fetches credit scores for many phones. Unknown phones get an entry with an 'error' key."""
+        return self._post_batches("/api/credit-bureau/score/batch", phone_numbers)
+
+    def get_pre_approved_offers_batch(self, phone_numbers):
+        """Fetches pre-approved offers for many phones. Unknown phones get an entry with an 'error' key."""
+        return self._post_batches("/api/offer-mart/pre-approved/batch", phone_numbers)
+
+    def get_underwriting_data_batch(self, phone_numbers):
+        """
+        Fetches credit scores and offers for many phones from the combined endpoint.
+        Each result has 'credit' and 'offer' entries, or an 'error' key for unknown phones.
+        """
+        return self._post_batches("/api/underwriting-data/batch", phone_numbers)
+
+    async def get_underwriting_data_async(self, phone_number):
+        """Asyncio variant of get_underwriting_data that does not block the event loop."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            loop.run_in_executor(self._executor, self.get_credit_score, phone_number),
+            loop.run_in_executor(self._executor, self.get_pre_approved_offer, phone_number),
+        )
+
+
+class CachingApiClient(ApiClient):
+    """
+    An ApiClient with a TTL cache in front of the credit score and offer lookups.
+
+    Customers often retry with a different amount or tenure seconds apart, so repeat
+    lookups for the same phone are answered from memory. 404s are cached briefly as
+    well, and concurrent misses for one phone share a single request. Both caches are
+    dropped when the customer data is reloaded.
+    """
+    def __init__(self, credit_score_ttl=CREDIT_SCORE_CACHE_TTL, offer_ttl=OFFER_CACHE_TTL,
+                 not_found_ttl=NOT_FOUND_CACHE_TTL, cache_size=API_CACHE_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self.credit_cache = TTLCache(maxsize=cache_size, ttl_seconds=credit_score_ttl,
+                                     negative_ttl_seconds=not_found_ttl,
+                                     negative_exceptions=(CustomerNotFoundError,))
+        self.offer_cache = TTLCache(maxsize=cache_size, ttl_seconds=offer_ttl,
+                                    negative_ttl_seconds=not_found_ttl,
+                                    negative_exceptions=(CustomerNotFoundError,))
+
+    def get_credit_score(self, phone_number):
+        return self.credit_cache.get_or_load(phone_number, super().get_credit_score)
+
+    def get_pre_approved_offer(self, phone_number):
+        return self.offer_cache.get_or_load(phone_number, super().get_pre_approved_offer)
+
+    def invalidate(self, database=None):
+        """Drops both lookup caches as well, so reloaded customer data is served right away."""
+        super().invalidate(database)
+        self.credit_cache.clear()
+        self.offer_cache.clear()
+
+    def cache_stats(self):
+        """Returns hit/miss counters for both lookup caches."""
+        return {"credit_score": self.credit_cache.stats(), "offer": self.offer_cache.stats()}
+
+
+# Create a single, global client so every agent shares one connection pool and lookup cache
+api_client = CachingApiClient()
+# Cached scores and offers are dropped whenever the customer data is reloaded
+customer_db.add_reload_listener(api_client.invalidate)
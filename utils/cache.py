@@ -0,0 +1,174 @@
+# utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """A load in progress. Threads that miss on the same key wait on it instead of loading again."""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    A bounded, thread-safe cache with per-entry expiry and LRU eviction.
+
+    - Entries expire `ttl_seconds` after they were loaded.
+    - When the cache is full, the least recently used entry is evicted.
+    - Exceptions listed in `negative_exceptions` (e.g. "customer not found") are cached
+      for `negative_ttl_seconds` and re-raised on later lookups, so repeated misses
+      for unknown keys don't reach the backend either.
+    - Concurrent misses for the same key are collapsed into a single load
+      (single-flight); the other callers wait for its result.
+    """
+    def __init__(self, maxsize=10000, ttl_seconds=300, negative_ttl_seconds=30, negative_exceptions=()):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.negative_exceptions = tuple(negative_exceptions)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value, cached_error)
+        self._inflight = {}            # key -> _Flight
+        self._generation = 0           # Bumped by clear(), so loads that began before it are not stored
+
+        # Counters
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value for `key`, calling `loader(key)` on a miss.
+
+        Raises:
+            Whatever `loader` raised. Negative exceptions are also re-raised from the cache until they expire.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, cached_error = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    if cached_error is not None:
+                        self.negative_hits += 1
+                        raise cached_error.with_traceback(None)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                is_leader = False
+            else:
+                self.misses += 1
+                flight = self._inflight[key] = _Flight()
+                is_leader = True
+            generation = self._generation
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader(key)
+        except self.negative_exceptions as e:
+            flight.error = e
+            self._store(key, None, e, self.negative_ttl_seconds, generation)
+            raise
+        except Exception as e:
+            # Transient failures are shared with waiters but never cached
+            flight.error = e
+            raise
+        else:
+            self._store(key, flight.value, None, self.ttl_seconds, generation)
+            return flight.value
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.done.set()
+
+    def _store(self, key, value, cached_error, ttl_seconds, generation):
+        if ttl_seconds <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return  # The cache was cleared while this value was loading; it may be stale
+            self._entries[key] = (time.monotonic() + ttl_seconds, value, cached_error)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Drops a single entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drops every entry. Loads already in progress are returned to their callers but not cached."""
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self._generation += 1
+
+    def stats(self):
+        """Returns the cache's size and hit/miss counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# --- Self-test for the cache ---
+if __name__ == '__main__':
+    from concurrent.futures import ThreadPoolExecutor
+
+    load_calls = []
+
+    def slow_loader(key):
+        load_calls.append(key)
+        time.sleep(0.2)
+        if key == "missing":
+            raise KeyError(key)
+        return key.upper()
+
+    cache = TTLCache(maxsize=2, ttl_seconds=60, negative_ttl_seconds=60, negative_exceptions=(KeyError,))
+
+    print("--- TEST 1: Concurrent misses are loaded once ---")
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda _: cache.get_or_load("a", slow_loader), range(10)))
+    print(f"Results: {set(results)}, loader calls: {len(load_calls)}\n")
+
+    print("--- TEST 2: Negative caching ---")
+    for _ in range(3):
+        try:
+            cache.get_or_load("missing", slow_loader)
+        except KeyError:
+            pass
+    print(f"Loader calls: {len(load_calls)}\n")
+
+    print("--- TEST 3: LRU eviction ---")
+    cache.get_or_load("b", slow_loader)
+    cache.get_or_load("c", slow_loader)
+    print(f"Stats: {cache.stats()}")
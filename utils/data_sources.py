@@ -0,0 +1,98 @@
+# utils/data_sources.py
+"""
+Where underwriting gets credit scores and pre-approved offers from.
+
+Every data source offers the same methods as ApiClient:
+
+    get_credit_score(phone) / get_pre_approved_offer(phone)
+    get_underwriting_data(phone) -> (credit_data, offer_data)
+    get_underwriting_data_async(phone)
+    get_credit_scores_batch(phones) / get_pre_approved_offers_batch(phones) / get_underwriting_data_batch(phones)
+
+and raises CustomerNotFoundError for unknown phones.
+
+    http       The Credit Bureau / Offer Mart APIs over HTTP (the shared, cached api_client).
+    inprocess  Reads customer_db directly and builds the same response bodies as the mock
+               API server, with no JSON encoding or loopback networking. For single-node
+               deployments and tests where the mock APIs would run in the same process anyway.
+
+Select one with UNDERWRITING_DATA_SOURCE (default: http).
+"""
+import os
+
+from mock_apis.payloads import credit_score_payload, offer_payload, underwriting_payload, not_found_payload
+from utils.api_client import api_client, CustomerNotFoundError
+from utils.database import customer_db
+
+UNDERWRITING_DATA_SOURCE = os.environ.get("UNDERWRITING_DATA_SOURCE", "http")
+
+
+class InProcessDataSource:
+    """Serves credit and offer data straight from the customer database."""
+    def __init__(self, database=None):
+        self.database = database or customer_db
+
+    def _get_customer(self, phone_number):
+        customer = self.database.get_customer_by_phone(phone_number)
+        if not customer:
+            raise CustomerNotFoundError(f"Customer not found: {phone_number}")
+        return customer
+
+    def get_credit_score(self, phone_number):
+        """Returns the Credit Bureau body for a customer."""
+        return credit_score_payload(phone_number, self._get_customer(phone_number))
+
+    def get_pre_approved_offer(self, phone_number):
+        """Returns the Offer Mart body for a customer."""
+        return offer_payload(phone_number, self._get_customer(phone_number))
+
+    def get_underwriting_data(self, phone_number):
+        """
+        Returns the credit score and the pre-approved offer from one lookup.
+
+        Returns:
+            tuple: (credit_data, offer_data)
+        """
+        payload = underwriting_payload(phone_number, self._get_customer(phone_number))
+        return payload["credit"], payload["offer"]
+
+    async def get_underwriting_data_async(self, phone_number):
+        """Asyncio variant of get_underwriting_data; a memory lookup never blocks the loop."""
+        return self.get_underwriting_data(phone_number)
+
+    def _batch(self, build, phone_numbers):
+        results = []
+        for phone_number in phone_numbers:
+            customer = self.database.get_customer_by_phone(phone_number)
+            results.append(build(phone_number, customer) if customer else not_found_payload(phone_number))
+        return results
+
+    def get_credit_scores_batch(self, phone_numbers):
+        """Credit scores for many phones. Unknown phones get an entry with an 'error' key."""
+        return self._batch(credit_score_payload, phone_numbers)
+
+    def get_pre_approved_offers_batch(self, phone_numbers):
+        """Pre-approved offers for many phones. Unknown phones get an entry with an 'error' key."""
+        return self._batch(offer_payload, phone_numbers)
+
+    def get_underwriting_data_batch(self, phone_numbers):
+        """Credit scores and offers for many phones, as 'credit' and 'offer' entries per phone."""
+        return self._batch(underwriting_payload, phone_numbers)
+
+
+def create_data_source(kind=None):
+    """
+    Returns the configured data source.
+
+    Args:
+        kind (str, optional): "http" or "inprocess" (default: UNDERWRITING_DATA_SOURCE).
+
+    Raises:
+        ValueError: If `kind` is not a known data source.
+    """
+    kind = kind or UNDERWRITING_DATA_SOURCE
+    if kind == "http":
+        return api_client
+    if kind == "inprocess":
+        return InProcessDataSource()
+    raise ValueError(f"Unknown underwriting data source: {kind!r} (expected 'http' or 'inprocess')")
@@ -1,34 +1,277 @@
 # utils/database.py
+import argparse
 import json
 import os
+import sqlite3
+import sys
+import threading
+import time
 
-class CustomerDatabase:
-    """A simple class to manage our customer data."""
-    def __init__(self):
+# Construct paths relative to the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to the Python path so the converter can run as a script
+sys.path.append(PROJECT_ROOT)
+from utils.log import get_logger
+
+logger = get_logger("customer_database")
+DEFAULT_JSON_PATH = os.path.join(PROJECT_ROOT, 'data', 'customers.json')
+DEFAULT_SQLITE_PATH = os.path.join(PROJECT_ROOT, 'data', 'customers.db')
+
+# Storage backend selection: "json" (default) or "sqlite"
+CUSTOMER_DB_BACKEND = os.environ.get('CUSTOMER_DB_BACKEND', 'json')
+CUSTOMER_DB_PATH = os.environ.get('CUSTOMER_DB_PATH')
+# How often (seconds) the data file is checked for changes; 0 disables the watcher
+CUSTOMER_DB_WATCH_INTERVAL = float(os.environ.get('CUSTOMER_DB_WATCH_INTERVAL', 2.0))
+
+
+class JsonCustomerBackend:
+    """Loads every customer from a JSON file into an in-memory dict keyed by phone number."""
+    def __init__(self, file_path=DEFAULT_JSON_PATH):
+        self.file_path = file_path
         self.customers = {}
-        self.load_customers()
-    
+        with open(file_path, 'r') as f:
+            for customer in json.load(f):
+                # Use phone number as the primary key for easy lookup
+                self.customers[customer['phone']] = customer
+
+    def get(self, phone):
+        return self.customers.get(phone)
+
+    def iter_customers(self):
+        return iter(self.customers.values())
+
+    def __len__(self):
+        return len(self.customers)
+
+
+class SQLiteCustomerBackend:
+    """
+    Reads customers on demand from an indexed SQLite file (see convert_json_to_sqlite).
+
+    Startup cost and memory don't depend on the number of customers: opening the
+    backend only checks that the file is a readable customers database (one row is
+    read), and each lookup is a primary-key B-tree search. Each thread gets its own
+    read-only connection.
+    """
+    def __init__(self, db_path=DEFAULT_SQLITE_PATH):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        self.file_path = db_path
+        self._local = threading.local()
+        # Fail here, before the backend can be swapped in, if the file is not a customers database
+        connection = self._connection()
+        row = connection.execute("SELECT phone, data FROM customers LIMIT 1").fetchone()
+        if row is not None:
+            json.loads(row[1])
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.file_path}?mode=ro", uri=True)
+            self._local.connection = connection
+        return connection
+
+    def get(self, phone):
+        row = self._connection().execute(
+            "SELECT data FROM customers WHERE phone = ?", (phone,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_customers(self):
+        for (data,) in self._connection().execute("SELECT data FROM customers ORDER BY phone"):
+            yield json.loads(data)
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+
+def convert_json_to_sqlite(json_path=DEFAULT_JSON_PATH, db_path=DEFAULT_SQLITE_PATH):
+    """
+    One-shot converter from the customers JSON file to an indexed SQLite file.
+    The new file is built next to the target and then moved into place, so readers
+    never see a partially written database.
+
+    Returns:
+        int: The number of customers written.
+    """
+    with open(json_path, 'r') as f:
+        customers_data = json.load(f)
+
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute("CREATE TABLE customers (phone TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID")
+        connection.executemany(
+            "INSERT OR REPLACE INTO customers (phone, data) VALUES (?, ?)",
+            ((customer['phone'], json.dumps(customer)) for customer in customers_data)
+        )
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(tmp_path, db_path)
+    return len(customers_data)
+
+
+def create_backend(kind=CUSTOMER_DB_BACKEND, path=CUSTOMER_DB_PATH):
+    """Builds the configured storage backend."""
+    if kind == 'sqlite':
+        return SQLiteCustomerBackend(path or DEFAULT_SQLITE_PATH)
+    if kind == 'json':
+        return JsonCustomerBackend(path or DEFAULT_JSON_PATH)
+    raise ValueError(f"Unknown customer database backend: {kind}")
+
+
+class CustomerDatabase:
+    """
+    A simple class to manage our customer data.
+
+    The data can be reloaded while the servers are running: a new backend is built
+    off to the side and then swapped in with a single reference assignment, so
+    lookups always see either the old data or the new data, never a mix.
+    """
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._source_signature = None
+        self._failed_signature = None  # The data file version that last failed to load
+        self._reload_lock = threading.Lock()
+        self._reload_listeners = []
+        self._watcher = None
+        if self.backend is None:
+            self.load_customers()
+
     def load_customers(self):
-        """Loads customer data from the JSON file."""
+        """Opens the configured storage backend (JSON file by default)."""
         try:
-            # Construct the path relative to the project root
-            project_root = os.path.dirname(os.path.dirname(__file__))
-            file_path = os.path.join(project_root, 'data', 'customers.json')
-            
-            with open(file_path, 'r') as f:
-                customers_data = json.load(f)
-                for customer in customers_data:
-                    # Use phone number as the primary key for easy lookup
-                    self.customers[customer['phone']] = customer
-        except FileNotFoundError:
-            print(f"Error: The file {file_path} was not found.")
-            print("Please ensure the data directory and customers.json file exist.")
+            self._source_signature = self._read_source_signature(self._source_path())
+            self.backend = create_backend()
+        except FileNotFoundError as e:
+            logger.error("The file %s was not found. Please ensure the data directory and customer data file exist.",
+                         e.filename or e)
+            self.backend = _EmptyBackend()
         except json.JSONDecodeError:
-            print(f"Error: The file {file_path} contains invalid JSON.")
-    
+            logger.error("The customer data file contains invalid JSON.")
+            self.backend = _EmptyBackend()
+        except (KeyError, sqlite3.Error) as e:
+            logger.error("The customer data file could not be read: %s", e)
+            self.backend = _EmptyBackend()
+
+    @staticmethod
+    def _source_path():
+        """The data file the configured backend reads from."""
+        if CUSTOMER_DB_PATH:
+            return CUSTOMER_DB_PATH
+        return DEFAULT_SQLITE_PATH if CUSTOMER_DB_BACKEND == 'sqlite' else DEFAULT_JSON_PATH
+
+    @staticmethod
+    def _read_source_signature(path):
+        """Returns (mtime, size) for the data file, or None if it doesn't exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def reload(self):
+        """
+        Rebuilds the backend from the data file and atomically swaps it in.
+        If the new data cannot be loaded, the current data stays in place.
+
+        Returns:
+            bool: True if the new data was swapped in.
+        """
+        path = self._source_path()
+        with self._reload_lock:
+            signature = self._read_source_signature(path)
+            try:
+                new_backend = create_backend()
+            except (FileNotFoundError, json.JSONDecodeError, KeyError, sqlite3.Error) as e:
+                logger.error("Could not reload customer data from %s: %s. Keeping the current data.", path, e)
+                # Don't retry this version of the file; the watcher tries again once it changes
+                self._failed_signature = signature
+                return False
+            self.backend = new_backend
+            self._source_signature = signature
+            self._failed_signature = None
+            # Let caches derived from the data catch up before the next reload can start
+            for listener in self._reload_listeners:
+                try:
+                    listener(self)
+                except Exception as e:
+                    logger.exception("Customer data reload listener failed: %s", e)
+        logger.info("Reloaded %d customers from %s", len(new_backend), path)
+        return True
+
+    def add_reload_listener(self, listener):
+        """Registers `listener(database)` to be called after every successful reload."""
+        self._reload_listeners.append(listener)
+
+    def reload_if_changed(self):
+        """Reloads only if the data file's modification time or size has changed (and that version hasn't failed before)."""
+        path = self._source_path()
+        signature = self._read_source_signature(path)
+        if signature is None or signature == self._source_signature or signature == self._failed_signature:
+            return False
+        return self.reload()
+
+    def start_watching(self, interval=CUSTOMER_DB_WATCH_INTERVAL):
+        """Starts a background thread that reloads the data whenever the file changes."""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    logger.exception("Customer data watcher failed: %s", e)
+
+        self._watcher = threading.Thread(target=watch, name="customer-db-watcher", daemon=True)
+        self._watcher.start()
+
+    @property
+    def customers(self):
+        """All customers keyed by phone number. Loads the whole backend; prefer get_customer_by_phone."""
+        return {customer['phone']: customer for customer in self.backend.iter_customers()}
+
     def get_customer_by_phone(self, phone):
         """Retrieves a customer's data using their phone number."""
-        return self.customers.get(phone)
+        return self.backend.get(phone)
+
+    def iter_customers(self):
+        """Iterates over every customer without building a full copy in memory."""
+        return self.backend.iter_customers()
+
+    def __len__(self):
+        return len(self.backend)
+
+
+class _EmptyBackend:
+    """Stands in for a backend whose data file could not be loaded."""
+    def get(self, phone):
+        return None
+
+    def iter_customers(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
 
 # Create a single, global instance of our database to be used across the application
-customer_db = CustomerDatabase()
\ No newline at end of file
+customer_db = CustomerDatabase()
+
+
+# --- Command-line converter ---
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert customers.json into an indexed SQLite database.")
+    parser.add_argument('json_path', nargs='?', default=DEFAULT_JSON_PATH)
+    parser.add_argument('db_path', nargs='?', default=DEFAULT_SQLITE_PATH)
+    args = parser.parse_args()
+
+    count = convert_json_to_sqlite(args.json_path, args.db_path)
+    print(f"✅ Wrote {count} customers to {args.db_path}")
+    print("Set CUSTOMER_DB_BACKEND=sqlite to use it.")
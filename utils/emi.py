@@ -0,0 +1,134 @@
+# utils/emi.py
+"""
+EMI and amortization helpers.
+
+All formulas work off a cached "annuity factor" per (rate, tenure): the EMI for one
+rupee of principal. Once a factor is cached, the EMI for any amount and the maximum
+affordable amount for any salary are a single multiplication or division.
+
+NumPy is used for the vectorized table when it is installed.
+"""
+import re
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+# The standard personal loan rate offered by the Offer Mart
+DEFAULT_ANNUAL_RATE = 10.99
+DEFAULT_TENURE_MONTHS = 60
+# Tenures accepted from customers, in months
+MIN_TENURE_MONTHS = 1
+MAX_TENURE_MONTHS = 360
+
+
+def parse_rate(rate):
+    """Accepts 10.99, "10.99" or "10.99%" and returns the annual rate in percent as a float."""
+    if isinstance(rate, str):
+        match = re.search(r"\d+(?:\.\d+)?", rate)
+        if not match:
+            raise ValueError(f"Invalid interest rate: {rate!r}")
+        return float(match.group(0))
+    return float(rate)
+
+
+def is_valid_tenure(tenure_months):
+    """Checks whether a tenure (in whole months) is one we can quote an EMI for."""
+    return MIN_TENURE_MONTHS <= tenure_months <= MAX_TENURE_MONTHS
+
+
+@lru_cache(maxsize=4096)
+def annuity_factor(annual_rate, tenure_months):
+    """The EMI per rupee of principal for a given annual rate (percent) and tenure (months)."""
+    if tenure_months <= 0:
+        raise ValueError("Tenure must be at least one month.")
+    monthly_rate = annual_rate / 1200.0
+    if monthly_rate == 0:
+        return 1.0 / tenure_months
+    growth = (1 + monthly_rate) ** tenure_months
+    return monthly_rate * growth / (growth - 1)
+
+
+def calculate_emi(principal, tenure_months, annual_rate=DEFAULT_ANNUAL_RATE):
+    """Returns the monthly instalment for a loan, rounded to the nearest rupee."""
+    return round(principal * annuity_factor(parse_rate(annual_rate), int(tenure_months)))
+
+
+def max_affordable_amount(monthly_salary, tenure_months, annual_rate=DEFAULT_ANNUAL_RATE, max_emi_percent=50):
+    """The largest principal whose EMI stays within `max_emi_percent` of the monthly salary."""
+    max_emi = monthly_salary * max_emi_percent / 100.0
+    return int(max_emi / annuity_factor(parse_rate(annual_rate), int(tenure_months)))
+
+
+def is_affordable(principal, monthly_salary, tenure_months, annual_rate=DEFAULT_ANNUAL_RATE, max_emi_percent=50):
+    """Checks whether the EMI for a loan is within `max_emi_percent` of the monthly salary."""
+    return calculate_emi(principal, tenure_months, annual_rate) <= monthly_salary * max_emi_percent / 100.0
+
+
+def emi_table(amounts, tenures, annual_rates):
+    """
+    Computes the EMI for every (amount, tenure, rate) combination.
+
+    Returns:
+        A NumPy array (or nested lists without NumPy) indexed as [amount][tenure][rate].
+    """
+    rates = [parse_rate(rate) for rate in annual_rates]
+    if np is not None:
+        factors = np.array([[annuity_factor(rate, int(tenure)) for rate in rates] for tenure in tenures])
+        return np.rint(np.asarray(amounts, dtype=float)[:, None, None] * factors[None, :, :])
+    factors = [[annuity_factor(rate, int(tenure)) for rate in rates] for tenure in tenures]
+    return [[[round(amount * factor) for factor in row] for row in factors] for amount in amounts]
+
+
+@lru_cache(maxsize=256)
+def _unit_schedule(annual_rate, tenure_months):
+    """The amortization schedule for one rupee of principal, cached per (rate, tenure)."""
+    monthly_rate = annual_rate / 1200.0
+    payment = annuity_factor(annual_rate, tenure_months)
+    balance = 1.0
+    rows = []
+    for month in range(1, tenure_months + 1):
+        interest = balance * monthly_rate
+        principal_paid = payment - interest
+        balance = max(balance - principal_paid, 0.0)
+        rows.append((month, interest, principal_paid, balance))
+    return tuple(rows)
+
+
+def amortization_schedule(principal, tenure_months, annual_rate=DEFAULT_ANNUAL_RATE):
+    """
+    Month-by-month repayment schedule for a loan, scaled from the cached per-rupee schedule.
+
+    Returns:
+        list: Dicts with month, emi, interest, principal and balance (rounded to two decimals).
+    """
+    emi = principal * annuity_factor(parse_rate(annual_rate), int(tenure_months))
+    return [
+        {
+            "month": month,
+            "emi": round(emi, 2),
+            "interest": round(principal * interest, 2),
+            "principal": round(principal * principal_paid, 2),
+            "balance": round(principal * balance, 2),
+        }
+        for month, interest, principal_paid, balance in _unit_schedule(parse_rate(annual_rate), int(tenure_months))
+    ]
+
+
+# --- Self-test for the EMI helpers ---
+if __name__ == '__main__':
+    print("--- TEST 1: EMI for ₹5,00,000 over 60 months at 10.99% ---")
+    print(f"EMI: ₹{calculate_emi(500000, 60, '10.99%'):,}\n")
+
+    print("--- TEST 2: Maximum affordable amount for a ₹80,000 salary ---")
+    for tenure in (12, 36, 60):
+        print(f"{tenure} months: ₹{max_affordable_amount(80000, tenure):,}")
+
+    print("\n--- TEST 3: EMI table ---")
+    print(emi_table([100000, 500000], [12, 60], [10.99, 12.5]))
+
+    print("\n--- TEST 4: Amortization schedule (last two months) ---")
+    for row in amortization_schedule(500000, 60)[-2:]:
+        print(row)
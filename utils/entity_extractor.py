@@ -0,0 +1,233 @@
+# utils/entity_extractor.py
+"""
+Single-pass entity extraction for chat messages.
+
+One compiled regular expression splits a message into tokens (the rupee sign,
+numbers and words) in a single scan. A single left-to-right walk over those tokens
+then decides what each number means, using its unit ("lakh", "crore", "years", ...)
+and the words before it ("loan", "tenure", "₹", ...) as context.
+
+Understands, for example:
+    "5 lakh", "5L", "₹5,00,000", "1.2 crore", "50k"   -> loan_amount
+    "3 years", "36 months", "tenure of 48"            -> tenure (in months)
+    "2 years 6 months", ".5 years"                    -> tenure 30, tenure 6
+    "5 lakh 50 thousand", "1 crore 20 lakh"           -> loan_amount 550000, 12000000
+    "9876543210", "+91 98765 43210", "+919876543210"  -> mobile
+    "yes", "sure", "ok" / "no", "nope"                -> response (word match, so "know" is not "no")
+
+Ages ("35 years old", "aged 35") are not tenures, and a mobile-shaped number is never
+read as an amount unless it follows a currency marker ("loan 9876543210" is a mobile).
+"""
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+
+_AMOUNT_MULTIPLIERS = {
+    "crore": 10_000_000, "crores": 10_000_000, "cr": 10_000_000,
+    "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000, "l": 100_000,
+    "k": 1_000, "thousand": 1_000,
+}
+_TENURE_MULTIPLIERS = {
+    "year": 12, "years": 12, "yr": 12, "yrs": 12,
+    "month": 1, "months": 1, "mo": 1, "mos": 1,
+}
+
+_AMOUNT_WORDS = ("loan", "amount", "borrow", "need", "want", "request", "requesting")
+_TENURE_WORDS = ("tenure", "period", "duration", "term", "for")
+_YES_WORDS = ("yes", "yeah", "yep", "yup", "sure", "ok", "okay", "accept", "proceed", "y")
+_NO_WORDS = ("no", "nope", "nah", "decline", "n")
+_CURRENCY_WORDS = ("rs", "inr", "rupee", "rupees")
+_AGE_WORDS = ("age", "aged")
+
+# What each interesting word means; every other word is ignored with a single dict lookup
+_WORD_KINDS = {}
+for _kind, _words in (("amount", _AMOUNT_WORDS), ("tenure", _TENURE_WORDS), ("yes", _YES_WORDS),
+                      ("no", _NO_WORDS), ("currency", _CURRENCY_WORDS), ("age", _AGE_WORDS)):
+    _WORD_KINDS.update(dict.fromkeys(_words, _kind))
+
+# Mobile numbers written with a +91/91 prefix or in spaced digit groups ("98765 43210", "987-654-3210").
+# They are matched as one token, so their digit groups are never read as amounts or tenures. A plain
+# 10-digit number is an ordinary number token; the walk tells it apart from an amount by context.
+_PHONE_GROUPS = r"\d{5}[\s-]?\d{5}|\d{3}[\s-]?\d{3}[\s-]?\d{4}"
+_MOBILE_PATTERN = (rf"(?:\+\s?|(?<![\d,.]))91[\s-]?(?:{_PHONE_GROUPS})(?![\d,.])"
+                   rf"|(?<![\d,.+])(?:\d{{5}}[\s-]\d{{5}}|\d{{3}}[\s-]\d{{3}}[\s-]\d{{4}})(?![\d,.])")
+
+# Tokens: mobile numbers, the rupee sign, numbers (with an optional +country-code prefix and Indian digit
+# grouping, or a bare fraction such as ".5"), words. Apart from the lookarounds the pattern only uses
+# character classes, so the regex engine scans it quickly.
+_TOKEN_RE = re.compile(rf"{_MOBILE_PATTERN}|₹|\+?\d[\d,]*(?:\.\d+)?|(?<![\w.])\.\d+|[a-z]+")
+_NON_DIGITS_RE = re.compile(r"\D")
+# Indian mobile numbers start with 6-9
+_MOBILE_RE = re.compile(r"[6-9]\d{9}")
+
+# Bare numbers (no unit or context) at or above this are read as amounts; smaller ones as tenures
+_BARE_AMOUNT_THRESHOLD = 1000
+_MAX_BARE_TENURE_MONTHS = 360
+
+
+def extract_entities(text: str) -> Dict[str, Any]:
+    """Extract mobile number, loan amount, tenure (months) and yes/no response from one message."""
+    entities: Dict[str, Any] = {}
+    context = None        # "amount", "tenure" or "age", set by the most recent keyword
+    after_currency = False
+    tenure_end = None     # Index just past the last "<number> <tenure unit>", to add up "2 years 6 months"
+    amount_end = None     # Likewise for "<number> <amount unit>", to add up "5 lakh 50 thousand"
+    amount_unit = None    # Multiplier of that amount; only smaller units continue it
+
+    tokens = _TOKEN_RE.findall(text.lower())
+    count = len(tokens)
+    i = 0
+    while i < count:
+        token = tokens[i]
+        i += 1
+
+        if not token[0].isdigit() and token[0] not in "+.":
+            kind = "currency" if token == "₹" else _WORD_KINDS.get(token)
+            if kind is None:
+                continue
+            if kind == "currency":
+                after_currency = True
+            elif kind == "amount" or kind == "tenure" or kind == "age":
+                context = kind
+            elif "response" not in entities:
+                entities["response"] = kind
+            continue
+
+        if token[0] == "+" or " " in token or "-" in token or (len(token) == 12 and token.startswith("91")):
+            # A prefixed or grouped mobile number, or a stray country code such as "+1"
+            digits = _NON_DIGITS_RE.sub("", token)
+            if len(digits) >= 10:
+                entities.setdefault("mobile", digits[-10:])
+                context = None
+                after_currency = False
+            continue
+
+        # A number, possibly followed by a unit word ("5 lakh", "5L", "3 years")
+        unit = tokens[i] if i < count else None
+        value = float(token.replace(",", "").rstrip(","))
+        if context == "age":
+            # "aged 35", "age 35 years": not a tenure or an amount
+            if unit in _TENURE_MULTIPLIERS:
+                i += 1
+        elif unit in _AMOUNT_MULTIPLIERS:
+            multiplier = _AMOUNT_MULTIPLIERS[unit]
+            amount = int(round(value * multiplier))
+            i += 1
+            if amount_end is not None and multiplier < amount_unit and tokens[amount_end:i - 2] in ([], ["and"]):
+                entities["loan_amount"] += amount  # Continues the previous amount: "5 lakh (and) 50 thousand"
+                amount_end, amount_unit = i, multiplier
+            elif "loan_amount" not in entities:
+                entities["loan_amount"] = amount
+                amount_end, amount_unit = i, multiplier
+        elif unit in _TENURE_MULTIPLIERS:
+            months = int(round(value * _TENURE_MULTIPLIERS[unit]))
+            i += 1
+            if i < count and tokens[i] == "old":
+                i += 1  # An age: "35 years old"
+            elif tenure_end is not None and tokens[tenure_end:i - 2] in ([], ["and"]):
+                entities["tenure"] += months  # Continues the previous duration: "2 years (and) 6 months"
+                tenure_end = i
+            elif "tenure" not in entities:
+                entities["tenure"] = months
+                tenure_end = i
+        elif (len(token) == 10 and token.isdigit() and not after_currency
+              and (context != "amount" or _MOBILE_RE.match(token))):
+            entities.setdefault("mobile", token)
+        elif after_currency or context == "amount":
+            entities.setdefault("loan_amount", int(value))
+        elif context == "tenure" and value <= _MAX_BARE_TENURE_MONTHS:
+            entities.setdefault("tenure", int(value))
+        elif value >= _BARE_AMOUNT_THRESHOLD:
+            entities.setdefault("loan_amount", int(value))
+        elif 0 < value <= _MAX_BARE_TENURE_MONTHS:
+            entities.setdefault("tenure", int(value))
+
+        context = None
+        after_currency = False
+
+    return entities
+
+
+def iter_extract(messages: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Lazily extract entities from a stream of messages."""
+    for message in messages:
+        yield extract_entities(message)
+
+
+def _extract_chunk(messages: List[str]) -> List[Dict[str, Any]]:
+    # Logs repeat short replies ("yes", "60", ...) constantly, so parse each distinct message once
+    parsed: Dict[str, Dict[str, Any]] = {}
+    results = []
+    for message in messages:
+        entities = parsed.get(message)
+        if entities is None:
+            entities = parsed[message] = extract_entities(message)
+        results.append(dict(entities))
+    return results
+
+
+def extract_batch(messages: Iterable[str], workers: int = 1, chunk_size: int = 5000) -> List[Dict[str, Any]]:
+    """
+    Extract entities from many messages, optionally across several worker processes.
+
+    Returns:
+        List[Dict[str, Any]]: One entity dict per message, in order.
+    """
+    messages = list(messages)
+    if workers <= 1 or len(messages) <= chunk_size:
+        return _extract_chunk(messages)
+
+    chunks = [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
+    results: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_result in pool.map(_extract_chunk, chunks):
+            results.extend(chunk_result)
+    return results
+
+
+def iter_conversation_log(path: str, field: str = "message") -> Iterator[Dict[str, Any]]:
+    """
+    Extract entities from a conversation log, one message per line.
+    Lines may be JSON objects (the text is read from `field`) or plain text.
+
+    Yields:
+        Dict[str, Any]: {"line": line_number, "message": text, "entities": {...}}
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            text = line
+            if line.startswith("{"):
+                try:
+                    text = str(json.loads(line).get(field, ""))
+                except json.JSONDecodeError:
+                    pass
+            yield {"line": line_number, "message": text, "entities": extract_entities(text)}
+
+
+# --- Self-test for the extractor ---
+if __name__ == '__main__':
+    samples = [
+        "9876543210",
+        "I need a loan of 5 lakh for 3 years",
+        "5L",
+        "₹5,00,000 please",
+        "1.2 crore",
+        "tenure of 48",
+        "2 years 6 months",
+        ".5 years",
+        "5 lakh 50 thousand",
+        "I am 35 years old",
+        "loan 9876543210",
+        "60 months",
+        "my number is +91 98765 43210",
+        "300000",
+        "yes",
+        "I don't know",
+        "nope",
+    ]
+    for sample in samples:
+        print(f"{sample!r:45} -> {extract_entities(sample)}")
@@ -0,0 +1,100 @@
+# utils/letter_store.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# In-memory cache limits for recently generated letters
+LETTER_CACHE_MAX_BYTES = int(os.environ.get("LETTER_CACHE_MAX_MB", 64)) * 1024 * 1024
+LETTER_CACHE_MAX_LETTERS = int(os.environ.get("LETTER_CACHE_MAX_LETTERS", 2000))
+
+# Retention policy for letters written to disk
+LETTER_RETENTION_DAYS = float(os.environ.get("LETTER_RETENTION_DAYS", 30))
+LETTER_MAX_DISK_BYTES = int(os.environ.get("LETTER_MAX_DISK_MB", 500)) * 1024 * 1024
+# Temporary files older than this are left over from crashed writes (a live write takes well under a second)
+STALE_TEMP_FILE_SECONDS = 3600
+
+
+class LetterStore:
+    """
+    A bounded LRU of recently generated letters, keyed by filename.
+
+    Bounded both by the number of letters and by their total size in bytes, so a
+    burst of approvals cannot grow memory without limit.
+    """
+    def __init__(self, max_bytes=LETTER_CACHE_MAX_BYTES, max_letters=LETTER_CACHE_MAX_LETTERS):
+        self.max_bytes = max_bytes
+        self.max_letters = max_letters
+        self.total_bytes = 0
+        self._letters = OrderedDict()  # filename -> bytes
+        self._lock = threading.Lock()
+
+    def put(self, filename, pdf_bytes):
+        """Stores a letter, evicting the least recently used ones if over budget."""
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._letters.pop(filename, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+            self._letters[filename] = pdf_bytes
+            self.total_bytes += len(pdf_bytes)
+            while self.total_bytes > self.max_bytes or len(self._letters) > self.max_letters:
+                _, evicted = self._letters.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def get(self, filename):
+        """Returns a letter's bytes, or None if it is not in memory."""
+        with self._lock:
+            pdf_bytes = self._letters.get(filename)
+            if pdf_bytes is not None:
+                self._letters.move_to_end(filename)
+            return pdf_bytes
+
+    def __contains__(self, filename):
+        with self._lock:
+            return filename in self._letters
+
+    def __len__(self):
+        return len(self._letters)
+
+
+def prune_letter_directory(directory, max_age_days=LETTER_RETENTION_DAYS, max_total_bytes=LETTER_MAX_DISK_BYTES):
+    """
+    Applies the on-disk retention policy: deletes letters older than `max_age_days`,
+    then the oldest remaining letters until the directory fits in `max_total_bytes`.
+    Temporary files left behind by crashed writes are removed as well.
+
+    Returns:
+        int: The number of files deleted.
+    """
+    try:
+        entries = [entry for entry in os.scandir(directory) if entry.is_file()]
+    except FileNotFoundError:
+        return 0
+
+    now = time.time()
+    deleted = 0
+    for entry in entries:
+        if entry.name.endswith(".tmp") and entry.stat().st_mtime < now - STALE_TEMP_FILE_SECONDS:
+            try:
+                os.remove(entry.path)
+                deleted += 1
+            except FileNotFoundError:
+                pass
+
+    files = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                    for entry in entries if entry.name.endswith(".pdf")))
+    cutoff = now - max_age_days * 86400
+    total_bytes = sum(size for _, size, _ in files)
+
+    for mtime, size, path in files:
+        if mtime >= cutoff and total_bytes <= max_total_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+        deleted += 1
+    return deleted
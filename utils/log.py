@@ -0,0 +1,111 @@
+# utils/log.py
+"""
+Leveled, non-blocking logging for the agents and services.
+
+Every component logs through `get_logger("<component>")`, a child of the
+"loan_chatbot" logger. Records are handed to a queue on the calling thread and
+formatted and written by a background listener thread, so a request never waits
+on stdout. Calls below the configured level return after a single level check.
+
+Configuration (environment):
+    LOG_LEVEL   DEBUG | INFO | WARNING | ERROR (default: INFO; use WARNING in production)
+    LOG_FORMAT  text | json (default: text)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+ROOT_LOGGER_NAME = "loan_chatbot"
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s [%(component)s] %(message)s"
+
+_listener = None
+_configure_lock = threading.RLock()
+
+
+class _ComponentFormatter(logging.Formatter):
+    """Adds `component` (the logger name without the "loan_chatbot." prefix) to each record."""
+    def format(self, record):
+        record.component = record.name[len(ROOT_LOGGER_NAME) + 1:] or ROOT_LOGGER_NAME
+        return super().format(record)
+
+
+class JsonFormatter(_ComponentFormatter):
+    """Formats each record as one JSON object per line."""
+    def format(self, record):
+        super().format(record)
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "component": record.component,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records as-is. The stock QueueHandler formats the message on the calling
+    thread; the queue here never leaves the process, so that work can wait for the listener.
+    """
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(level=None, fmt=None, stream=None):
+    """
+    (Re)configures the "loan_chatbot" logger with a queue-backed handler.
+
+    Args:
+        level (str, optional): Minimum level to emit (default: LOG_LEVEL).
+        fmt (str, optional): "text" or "json" (default: LOG_FORMAT).
+        stream (file, optional): Where the listener writes (default: sys.stdout).
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(JsonFormatter() if (fmt or LOG_FORMAT) == "json" else _ComponentFormatter(TEXT_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(_DeferredQueueHandler(log_queue))
+        root.setLevel(level or LOG_LEVEL)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, handler)
+        _listener.start()
+
+
+def shutdown_logging():
+    """Flushes queued records and stops the listener thread."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(component):
+    """Returns the logger for a component (e.g. "underwriting"), configuring logging on first use."""
+    if _listener is None:
+        with _configure_lock:
+            if _listener is None:
+                configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{component}")
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,197 @@
+# utils/metrics.py
+"""
+In-process counters and latency histograms, exposed in the Prometheus text format.
+
+    with metrics.track("underwriting") as stage:
+        result = underwriting_agent.evaluate_loan(...)
+        stage.outcome = result["status"]
+
+records the call's duration in `chat_stage_duration_seconds{stage="underwriting",outcome=...}`
+and counts it in `chat_stage_calls_total`. Exceptions are recorded with outcome="exception".
+"""
+import bisect
+import threading
+import time
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing count, one per combination of label values."""
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Counts observations into cumulative buckets, one set per combination of label values."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {series[-1]!r}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _StageTimer:
+    """Context manager returned by MetricsRegistry.track; set `.outcome` to label the result."""
+    __slots__ = ("_registry", "stage", "outcome", "_start")
+
+    def __init__(self, registry, stage):
+        self._registry = registry
+        self.stage = stage
+        self.outcome = "ok"
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.outcome = "exception"
+        elapsed = time.perf_counter() - self._start
+        self._registry.stage_duration.observe(elapsed, stage=self.stage, outcome=self.outcome)
+        self._registry.stage_calls.inc(stage=self.stage, outcome=self.outcome)
+        return False
+
+
+class MetricsRegistry:
+    """Holds the process's metrics and renders them for a /metrics endpoint."""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.stage_duration = self.histogram(
+            "chat_stage_duration_seconds", "Latency of each agent stage.", ("stage", "outcome"))
+        self.stage_calls = self.counter(
+            "chat_stage_calls_total", "Agent stage calls by outcome.", ("stage", "outcome"))
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Returns the counter called `name`, creating it on first use."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Returns the histogram called `name`, creating it on first use."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def track(self, stage):
+        """Times a block of code as one call of `stage`."""
+        return _StageTimer(self, stage)
+
+    def render(self):
+        """Renders every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def instrument_flask_app(app, registry=None):
+    """
+    Records the latency and status of every request to a Flask app, by endpoint,
+    and adds a GET /metrics route serving the registry.
+    """
+    from flask import Response, g, request
+
+    registry = registry or metrics
+    duration = registry.histogram("http_request_duration_seconds", "HTTP request latency.", ("endpoint", "method"))
+    requests_total = registry.counter("http_requests_total", "HTTP requests by status code.",
+                                      ("endpoint", "method", "status"))
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = getattr(g, "_metrics_start", None)
+        if start is not None:
+            # Label by route name rather than URL so ids in paths don't explode the series count
+            endpoint = request.endpoint or "unmatched"
+            duration.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method)
+            requests_total.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return Response(registry.render(), mimetype=None, content_type=PROMETHEUS_CONTENT_TYPE)
+
+    return app
+
+
+# One registry per process
+metrics = MetricsRegistry()
@@ -0,0 +1,220 @@
+# utils/resilience.py
+"""
+Building blocks for calling dependencies that may be slow or down.
+
+    Deadline        a time budget for one logical call, shared by all its attempts
+    backoff_delay   exponential backoff with full jitter
+    RetryBudget     caps retries to a fraction of traffic, so retries cannot multiply load during an outage
+    CircuitBreaker  fails fast while a dependency keeps failing, then lets one trial call through
+    LatencyTracker  recent latencies of successful calls, for choosing a hedge delay
+    hedged_call     starts a second copy of a slow call and returns whichever succeeds first
+
+Used by utils/api_client.py for the Credit Bureau and Offer Mart APIs.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class Deadline:
+    """The point in time by which a call, including all of its retries, must finish."""
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Delay before retry number `attempt` (0-based): uniform in [0, min(max_delay, base_delay * 2^attempt)]."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class RetryBudget:
+    """
+    A token bucket for retries.
+
+    Every request earns `ratio` tokens and every retry spends one, so retries stay
+    below roughly `ratio` of the request rate. `min_per_second` tokens are added over
+    time regardless, so a quiet client can still retry an occasional failure.
+    """
+    def __init__(self, ratio=0.2, min_per_second=5.0, max_balance=None):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max_balance if max_balance is not None else max(10.0, min_per_second * 10)
+        self._balance = self.max_balance
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._balance = min(self.max_balance, self._balance + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def record_request(self):
+        """Credits the budget for one request."""
+        with self._lock:
+            self._refill()
+            self._balance = min(self.max_balance, self._balance + self.ratio)
+
+    def try_spend(self):
+        """Takes one retry from the budget. Returns False if the budget is exhausted."""
+        with self._lock:
+            self._refill()
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency after `failure_threshold` consecutive failures.
+
+    closed     calls go through
+    open       calls are rejected immediately, for `reset_timeout` seconds
+    half_open  one trial call goes through; success closes the circuit, failure re-opens it
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=10.0, on_state_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_state_change = on_state_change
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state):
+        # Called with the lock held
+        self.state = state
+        if self.on_state_change is not None:
+            self.on_state_change(self, state)
+
+    def allow(self):
+        """Returns True if a call may go through now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._transition(self.OPEN)
+
+
+class LatencyTracker:
+    """Keeps the last `window` latencies and answers percentile queries over them."""
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._sorted = None  # Cached sorted copy, dropped on every new sample
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self._sorted = None
+
+    def percentile(self, pct):
+        """The `pct`th percentile in seconds, or None until `min_samples` latencies were recorded."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self._samples)
+            samples = self._sorted
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def hedged_call(executor, call, delay, on_hedge=None, is_success=None):
+    """
+    Runs `call()` on `executor`; if it has not finished after `delay` seconds, starts a
+    second copy and returns the result of whichever succeeds first. The slower copy
+    is left to finish in the background.
+
+    A copy succeeds when it returns without raising and `is_success(result)` (if given)
+    is true, so a copy that fails fast cannot beat a slower one that succeeds.
+
+    Returns:
+        The first successful result, or the last failed result if no copy succeeded.
+
+    Raises:
+        The last error, if no copy succeeded and the last one to finish raised.
+    """
+    primary = executor.submit(call)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    if on_hedge is not None:
+        on_hedge()
+    pending = {primary, executor.submit(call)}
+    failed = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None and (is_success is None or is_success(future.result())):
+                return future.result()
+            failed = future
+    return failed.result()
+
+
+# --- Self-test for the resilience helpers ---
+if __name__ == '__main__':
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("--- TEST 1: Circuit breaker opens, half-opens and closes ---")
+    breaker = CircuitBreaker("demo", failure_threshold=2, reset_timeout=0.1,
+                             on_state_change=lambda b, state: print(f"  {b.name} -> {state}"))
+    breaker.record_failure()
+    breaker.record_failure()
+    print(f"Allowed while open: {breaker.allow()}")
+    time.sleep(0.15)
+    print(f"Trial allowed: {breaker.allow()}, second call allowed: {breaker.allow()}")
+    breaker.record_success()
+    print()
+
+    print("--- TEST 2: Retry budget ---")
+    budget = RetryBudget(ratio=0.5, min_per_second=0, max_balance=2)
+    print(f"Retries granted: {[budget.try_spend() for _ in range(4)]}")
+    budget.record_request()
+    budget.record_request()
+    print(f"After two requests: {budget.try_spend()}\n")
+
+    print("--- TEST 3: Hedging skips a fast failure ---")
+    replies = iter([(0.15, 200), (0.01, 503)])
+
+    def slow_call():
+        seconds, status = next(replies)
+        time.sleep(seconds)
+        return status
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        print(f"Result: {hedged_call(pool, slow_call, 0.1, is_success=lambda status: status < 500)}")
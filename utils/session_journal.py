@@ -0,0 +1,315 @@
+# utils/session_journal.py
+"""
+Durable, append-only journal of session state.
+
+Every mutation is one JSON line in the current journal segment: the session's full
+state ("put") or its removal ("del"). Last writer wins per session, so recovery is a
+straight replay. Appends are group-committed: callers enqueue their line and a single
+writer thread writes everything that has queued up, then flushes and fsyncs once for
+the whole batch, so concurrent turns share one disk sync.
+
+Once a segment holds `compact_after` records, the writer starts a new segment and a
+background thread writes a snapshot of the live sessions; after the snapshot is safely
+on disk the older segments and snapshots are deleted. Recovery therefore reads the
+newest snapshot plus the (bounded) segments written since, not the full history.
+
+Files in the journal directory:
+    snapshot-<gen>.jsonl   every live session at the time generation <gen> started
+    journal-<gen>.log      records appended during generation <gen>
+
+Enable it for the web app with CHAT_SESSION_JOURNAL_DIR.
+"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+from utils.log import get_logger
+from utils.metrics import metrics
+
+logger = get_logger("session_journal")
+
+SESSION_JOURNAL_DIR = os.environ.get("CHAT_SESSION_JOURNAL_DIR", "")
+# Records per segment before a snapshot is taken and older segments are compacted away
+SESSION_JOURNAL_COMPACT_AFTER = int(os.environ.get("CHAT_SESSION_JOURNAL_COMPACT_AFTER", 50000))
+# fsync every batch ("1"), or leave flushing to the OS ("0")
+SESSION_JOURNAL_FSYNC = os.environ.get("CHAT_SESSION_JOURNAL_FSYNC", "1") == "1"
+# Most records written by a single group commit
+MAX_BATCH_RECORDS = 1024
+# Failed group commits remembered for `wait`
+MAX_TRACKED_FAILURES = 64
+
+_FILE_RE = re.compile(r"^(journal|snapshot)-(\d+)\.(log|jsonl)$")
+_STOP = object()
+
+_commit_duration = metrics.histogram("session_journal_commit_seconds", "Time to write and sync one group commit.")
+_committed_records = metrics.counter("session_journal_records_total", "Session records written to the journal.")
+_commit_errors = metrics.counter("session_journal_errors_total", "Group commits that failed to reach the disk.")
+
+
+class SessionJournalError(Exception):
+    """Raised by `SessionJournal.wait` for a record that could not be written to the disk."""
+
+
+def _encode(key, record, expires_at):
+    return json.dumps({"k": key, "v": record, "e": expires_at}, separators=(",", ":"), ensure_ascii=False)
+
+
+class SessionJournal:
+    """
+    Append-only journal with group commit, snapshots and compaction.
+
+    `expires_at` values are wall-clock times (time.time()), so sessions that expired
+    while the process was down are dropped on recovery.
+    """
+    def __init__(self, directory, compact_after=SESSION_JOURNAL_COMPACT_AFTER, fsync=SESSION_JOURNAL_FSYNC):
+        self.directory = directory
+        self.compact_after = compact_after
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.SimpleQueue()
+        self._seq_lock = threading.Lock()
+        self._seq = 0
+        self._written = threading.Condition()
+        self._written_seq = 0
+        self._failed = deque(maxlen=MAX_TRACKED_FAILURES)  # (first seq, last seq) of failed group commits
+
+        self._generation = None
+        self._file = None
+        self._segment_records = 0
+        self._snapshot_source = None
+        self._compacting = threading.Lock()
+        self._writer = None
+
+    # --- Files ---
+
+    def _path(self, kind, generation):
+        extension = "log" if kind == "journal" else "jsonl"
+        return os.path.join(self.directory, f"{kind}-{generation:08d}.{extension}")
+
+    def _generations(self, kind):
+        found = []
+        for name in os.listdir(self.directory):
+            match = _FILE_RE.match(name)
+            if match and match.group(1) == kind:
+                found.append(int(match.group(2)))
+        return sorted(found)
+
+    @staticmethod
+    def _read_lines(path):
+        """Yields the parsed records of a file, stopping at a torn final line left by a crash."""
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("Ignoring a torn record at %s:%d", path, line_number)
+                    return
+
+    # --- Recovery ---
+
+    def recover(self):
+        """
+        Rebuilds the live sessions from the newest snapshot and the segments after it.
+
+        Returns:
+            dict: key -> (record, expires_at) for every session that has not expired.
+        """
+        start = time.perf_counter()
+        sessions = {}
+        snapshots = self._generations("snapshot")
+        base = snapshots[-1] if snapshots else 0
+        if snapshots:
+            for entry in self._read_lines(self._path("snapshot", base)):
+                sessions[entry["k"]] = (entry["v"], entry["e"])
+
+        replayed = 0
+        segments = [generation for generation in self._generations("journal") if generation >= base]
+        for generation in segments:
+            for entry in self._read_lines(self._path("journal", generation)):
+                replayed += 1
+                if entry.get("v") is None:
+                    sessions.pop(entry["k"], None)
+                else:
+                    sessions[entry["k"]] = (entry["v"], entry["e"])
+
+        now = time.time()
+        live = {key: value for key, value in sessions.items() if value[1] > now}
+        # Later writes go to a fresh segment, never after a possibly torn tail
+        self._generation = max(segments + snapshots + [0]) + 1
+        self._segment_records = replayed
+        logger.info("Recovered %d live sessions (snapshot %d, %d journal records) in %.1f ms",
+                    len(live), base, replayed, (time.perf_counter() - start) * 1000)
+        return live
+
+    # --- Writing ---
+
+    def start(self, snapshot_source):
+        """
+        Starts the writer thread.
+
+        Args:
+            snapshot_source (callable): Returns an iterable of (key, record, expires_at)
+                for every live session; called from the compaction thread.
+        """
+        if self._generation is None:
+            self.recover()
+        self._snapshot_source = snapshot_source
+        self._file = open(self._path("journal", self._generation), "a", encoding="utf-8")
+        if self._segment_records >= self.compact_after:
+            # A long tail was replayed; snapshot it so the next start is quick
+            self._rotate()
+        self._writer = threading.Thread(target=self._run, name="session-journal", daemon=True)
+        self._writer.start()
+
+    def _append(self, line):
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+            self._queue.put((seq, line))
+        return seq
+
+    def put(self, key, record, expires_at):
+        """Queues the full state of a session. Returns a sequence number for `wait`."""
+        return self._append(_encode(key, record, expires_at))
+
+    def delete(self, key):
+        """Queues the removal of a session. Returns a sequence number for `wait`."""
+        return self._append(_encode(key, None, None))
+
+    def wait(self, seq, timeout=None):
+        """
+        Blocks until record `seq` has been written (and synced). Returns False on timeout.
+
+        Raises:
+            SessionJournalError: The group commit holding the record failed.
+        """
+        with self._written:
+            if not self._written.wait_for(lambda: self._written_seq >= seq, timeout):
+                return False
+            if any(first <= seq <= last for first, last in self._failed):
+                raise SessionJournalError(f"Session record {seq} could not be written to the journal")
+            return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            stop = item is _STOP
+            batch = [] if stop else [item]
+            while not stop and len(batch) < MAX_BATCH_RECORDS:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                self._commit(batch)
+            if stop:
+                self._file.close()
+                return
+
+    def _commit(self, batch):
+        start = time.perf_counter()
+        try:
+            self._file.write("\n".join(line for _, line in batch) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except (OSError, ValueError):  # ValueError: the segment could not be reopened after an earlier failure
+            _commit_errors.inc()
+            logger.exception("Could not write %d session records to the journal", len(batch))
+            failed = True
+        else:
+            _committed_records.inc(len(batch))
+            _commit_duration.observe(time.perf_counter() - start)
+            failed = False
+
+        with self._written:
+            if failed:
+                self._failed.append((batch[0][0], batch[-1][0]))
+            self._written_seq = batch[-1][0]
+            self._written.notify_all()
+
+        if failed:
+            # The segment may end in a torn line, which recovery stops at; continue in a fresh one
+            try:
+                self._open_segment()
+            except OSError:
+                logger.exception("Could not start a new session journal segment")
+            return
+
+        self._segment_records += len(batch)
+        if self._segment_records >= self.compact_after:
+            self._rotate()
+
+    # --- Snapshots and compaction ---
+
+    def _open_segment(self):
+        """Closes the current segment and starts the next generation's (writer thread only)."""
+        self._file.close()
+        self._generation += 1
+        self._file = open(self._path("journal", self._generation), "a", encoding="utf-8")
+        self._segment_records = 0
+
+    def _rotate(self):
+        """Starts a new segment and snapshots the live sessions in the background (writer thread only)."""
+        if not self._compacting.acquire(blocking=False):
+            return  # The previous snapshot is still being written
+        self._open_segment()
+        threading.Thread(target=self._compact, args=(self._generation,), name="session-journal-compact",
+                         daemon=True).start()
+
+    def _compact(self, generation):
+        """
+        Writes snapshot-<generation> and deletes everything older.
+
+        The snapshot is taken after the new segment was opened, so it holds at least
+        everything written to older segments; any record in the new segment is replayed
+        on top of it.
+        """
+        try:
+            start = time.perf_counter()
+            path = self._path("snapshot", generation)
+            temporary_path = path + ".tmp"
+            count = 0
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                for key, record, expires_at in self._snapshot_source():
+                    f.write(_encode(key, record, expires_at) + "\n")
+                    count += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, path)
+
+            for kind in ("journal", "snapshot"):
+                for old in self._generations(kind):
+                    if old < generation:
+                        os.remove(self._path(kind, old))
+            logger.info("Wrote a snapshot of %d sessions (generation %d) in %.1f ms",
+                        count, generation, (time.perf_counter() - start) * 1000)
+        except OSError:
+            logger.exception("Session journal compaction failed; keeping the older segments")
+        finally:
+            self._compacting.release()
+
+    def close(self):
+        """Writes everything queued so far, stops the writer thread and waits for a running snapshot."""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        with self._compacting:
+            pass
+
+
+def open_session_journal(directory=None):
+    """Returns a SessionJournal for `directory` (default: CHAT_SESSION_JOURNAL_DIR), or None if unset."""
+    directory = directory or SESSION_JOURNAL_DIR
+    return SessionJournal(directory) if directory else None
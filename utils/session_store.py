@@ -0,0 +1,348 @@
+# utils/session_store.py
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Add the project root to the Python path so the self-test can run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.session_journal import SessionJournalError
+
+# Defaults for the web chat session layer (overridable via environment variables)
+DEFAULT_SESSION_TTL_SECONDS = int(os.environ.get("CHAT_SESSION_TTL", 30 * 60))
+DEFAULT_MAX_SESSIONS = int(os.environ.get("CHAT_MAX_SESSIONS", 50000))
+DEFAULT_NUM_SHARDS = int(os.environ.get("CHAT_SESSION_SHARDS", 32))
+# How long, and for how many recent turns, a session remembers its responses for retried requests
+TURN_REPLAY_TTL_SECONDS = int(os.environ.get("CHAT_TURN_REPLAY_TTL", 120))
+TURN_REPLAY_MAX_TURNS = int(os.environ.get("CHAT_TURN_REPLAY_SIZE", 8))
+# Longest a turn waits for its session to reach the journal before giving up on the turn
+JOURNAL_COMMIT_TIMEOUT_SECONDS = 5
+
+
+class ConversationSession:
+    """
+    The state of a single web chat conversation.
+    Uses __slots__ so that each live session stays small in memory.
+
+    `lock` serializes turns of the same conversation (`async_lock()` on an asyncio
+    event loop). Responses to client-supplied
+    turn ids are remembered briefly, so a retried request is answered from the
+    replay cache instead of advancing the state machine a second time.
+    """
+    __slots__ = ("session_id", "state", "customer_details", "loan_details", "expires_at",
+                 "lock", "_async_lock", "_turn_lock", "_turns")
+
+    def __init__(self, session_id, expires_at):
+        self.session_id = session_id
+        self.state = "AWAITING_PHONE"
+        self.customer_details = None
+        self.loan_details = {}
+        self.expires_at = expires_at
+        self.lock = threading.Lock()
+        self._async_lock = None  # created on first use by the ASGI app
+        self._turn_lock = threading.Lock()
+        self._turns = None  # turn_id -> (expires_at, Future), created on first use
+
+    def to_record(self):
+        """The durable part of the session, as written to the session journal."""
+        return {"state": self.state, "customer_details": self.customer_details, "loan_details": self.loan_details}
+
+    @classmethod
+    def from_record(cls, session_id, record, expires_at):
+        session = cls(session_id, expires_at)
+        session.restore(record)
+        return session
+
+    def restore(self, record):
+        """Puts back state from `to_record()`, e.g. to undo a turn that could not be journaled."""
+        self.state = record["state"]
+        self.customer_details = record["customer_details"]
+        self.loan_details = record["loan_details"]
+
+    def async_lock(self):
+        """The asyncio.Lock that serializes this conversation's turns on the event loop."""
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        return self._async_lock
+
+    def claim_turn(self, turn_id, ttl_seconds=TURN_REPLAY_TTL_SECONDS, max_turns=TURN_REPLAY_MAX_TURNS):
+        """
+        Registers a client-supplied turn id.
+
+        Returns:
+            tuple: (future, is_owner). The owner must process the turn and call
+                   `complete_turn` or `abandon_turn`; anyone else waits on `future`
+                   for the response the owner produced.
+        """
+        now = time.monotonic()
+        with self._turn_lock:
+            if self._turns is None:
+                self._turns = OrderedDict()
+            turns = self._turns
+            # Entries are in arrival order and share one TTL, so expired ones are at the front
+            while turns and next(iter(turns.values()))[0] <= now:
+                turns.popitem(last=False)
+
+            entry = turns.get(turn_id)
+            if entry is not None:
+                return entry[1], False
+
+            future = Future()
+            turns[turn_id] = (now + ttl_seconds, future)
+            while len(turns) > max_turns:
+                turns.popitem(last=False)
+            return future, True
+
+    def complete_turn(self, turn_id, response, future=None):
+        """
+        Stores the response for a claimed turn and releases any duplicates waiting on it.
+        Pass the `future` from claim_turn to release them even if the turn has since
+        been evicted from the replay cache.
+        """
+        if future is None:
+            with self._turn_lock:
+                entry = self._turns.get(turn_id) if self._turns else None
+            future = entry[1] if entry is not None else None
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    def abandon_turn(self, turn_id, error, future=None):
+        """Forgets a claimed turn that failed, so a retry runs it again; waiting duplicates get `error`."""
+        with self._turn_lock:
+            entry = self._turns.get(turn_id) if self._turns else None
+            if entry is not None and (future is None or entry[1] is future):
+                del self._turns[turn_id]
+                future = entry[1]
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+
+class _Shard:
+    """One lock-protected slice of the session store, kept in LRU order."""
+    __slots__ = ("lock", "sessions", "capacity")
+
+    def __init__(self, capacity):
+        self.lock = threading.Lock()
+        self.sessions = OrderedDict()
+        self.capacity = capacity
+
+
+class SessionStore:
+    """
+    An in-memory, sharded store of conversation sessions keyed by a session token.
+
+    Each shard has its own lock (lock striping), so requests for different
+    sessions rarely contend with each other. Sessions expire after `ttl_seconds`
+    of inactivity, and every shard is capped so the total number of live
+    sessions never exceeds `max_sessions`; the least recently used session is
+    evicted first when a shard is full.
+
+    With a `journal` (utils/session_journal.py), sessions survive restarts: the
+    store is rebuilt from the journal on construction, `save` records a session
+    after each turn and `delete` records its removal.
+    """
+    def __init__(self, ttl_seconds=DEFAULT_SESSION_TTL_SECONDS,
+                 max_sessions=DEFAULT_MAX_SESSIONS, num_shards=DEFAULT_NUM_SHARDS, journal=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        per_shard_capacity = max(1, max_sessions // num_shards)
+        self._shards = [_Shard(per_shard_capacity) for _ in range(num_shards)]
+        self.journal = journal
+        if journal is not None:
+            self._restore(journal.recover())
+            journal.start(self._journal_snapshot)
+
+    def _shard_for(self, session_id):
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    @staticmethod
+    def _purge_expired(shard, now):
+        """
+        Drops expired sessions from the front of a shard.
+        Because every access moves a session to the back and refreshes its expiry,
+        LRU order is also expiry order, so we can stop at the first live session.
+        """
+        sessions = shard.sessions
+        while sessions:
+            session_id, session = next(iter(sessions.items()))
+            if session.expires_at > now:
+                break
+            del sessions[session_id]
+
+    def get(self, session_id):
+        """
+        Returns the live session for a token, or None if it is unknown or has expired.
+        Accessing a session refreshes its TTL and marks it as most recently used.
+        """
+        if not session_id:
+            return None
+        shard = self._shard_for(session_id)
+        now = time.monotonic()
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is None:
+                return None
+            if session.expires_at <= now:
+                del shard.sessions[session_id]
+                return None
+            session.expires_at = now + self.ttl_seconds
+            shard.sessions.move_to_end(session_id)
+            return session
+
+    def create(self):
+        """Creates a new session with a fresh, unguessable token."""
+        session_id = uuid.uuid4().hex
+        shard = self._shard_for(session_id)
+        now = time.monotonic()
+        session = ConversationSession(session_id, now + self.ttl_seconds)
+        with shard.lock:
+            self._purge_expired(shard, now)
+            evicted = self._evict_for_insert(shard)
+            shard.sessions[session_id] = session
+        self._journal_evictions(evicted)
+        return session
+
+    @staticmethod
+    def _evict_for_insert(shard):
+        """Evicts least recently used sessions until the shard has room for one more. Returns their ids."""
+        evicted = []
+        while len(shard.sessions) >= shard.capacity:
+            evicted.append(shard.sessions.popitem(last=False)[0])
+        return evicted
+
+    def _journal_evictions(self, session_ids):
+        """Records evicted sessions as deleted, so they do not come back after a restart."""
+        if self.journal is not None:
+            for session_id in session_ids:
+                self.journal.delete(session_id)
+
+    def get_or_create(self, session_id):
+        """Returns the live session for a token, creating a new one if needed."""
+        session = self.get(session_id)
+        if session is None:
+            session = self.create()
+        return session
+
+    def delete(self, session_id):
+        """Removes a session, e.g. when the customer starts over."""
+        shard = self._shard_for(session_id)
+        with shard.lock:
+            removed = shard.sessions.pop(session_id, None)
+        if removed is not None and self.journal is not None:
+            self.journal.delete(session_id)
+
+    def save(self, session, wait=True):
+        """
+        Records a session's current state in the journal (a no-op without one).
+        Call it after every turn that changes the session.
+
+        Args:
+            wait (bool): Return only once the record is on disk. Concurrent saves
+                         share one group commit, so waiting costs about one fsync.
+
+        Returns:
+            int: The journal sequence number (for `journal.wait`), or None without a journal
+                 or if the session has been evicted in the meantime.
+
+        Raises:
+            SessionJournalError: With `wait`, if the record could not be written, or was
+                                 not written within JOURNAL_COMMIT_TIMEOUT_SECONDS.
+        """
+        if self.journal is None:
+            return None
+        # Sessions live in monotonic time; the journal needs wall-clock expiry to survive a restart
+        expires_at = time.time() + (session.expires_at - time.monotonic())
+        shard = self._shard_for(session.session_id)
+        with shard.lock:
+            # Queued under the shard lock, so an eviction's delete is always journaled after this record
+            if shard.sessions.get(session.session_id) is not session:
+                return None
+            seq = self.journal.put(session.session_id, session.to_record(), expires_at)
+        if wait and not self.journal.wait(seq, JOURNAL_COMMIT_TIMEOUT_SECONDS):
+            raise SessionJournalError(
+                f"Session record {seq} was not written within {JOURNAL_COMMIT_TIMEOUT_SECONDS}s")
+        return seq
+
+    def _restore(self, recovered):
+        """Loads sessions recovered from the journal, soonest-expiring first so LRU order matches expiry."""
+        offset = time.monotonic() - time.time()
+        evicted = []
+        for session_id, (record, expires_at) in sorted(recovered.items(), key=lambda item: item[1][1]):
+            shard = self._shard_for(session_id)
+            with shard.lock:
+                evicted.extend(self._evict_for_insert(shard))
+                shard.sessions[session_id] = ConversationSession.from_record(session_id, record, expires_at + offset)
+        self._journal_evictions(evicted)
+
+    def _journal_snapshot(self):
+        """Yields (session_id, record, wall-clock expiry) for every live session; used for journal snapshots."""
+        offset = time.time() - time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                entries = [(session_id, session.to_record(), session.expires_at + offset)
+                           for session_id, session in shard.sessions.items()]
+            yield from entries
+
+    def close(self):
+        """Flushes and stops the journal, if any."""
+        if self.journal is not None:
+            self.journal.close()
+
+    def purge_expired(self):
+        """Removes every expired session. Safe to call periodically from a background thread."""
+        now = time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                self._purge_expired(shard, now)
+
+    def __len__(self):
+        return sum(len(shard.sessions) for shard in self._shards)
+
+
+# --- Self-test for the session store ---
+if __name__ == '__main__':
+    store = SessionStore(ttl_seconds=1, max_sessions=8, num_shards=2)
+
+    print("--- TEST 1: Create and fetch a session ---")
+    session = store.create()
+    session.state = "AWAITING_LOAN_AMOUNT"
+    print(f"Result: {store.get(session.session_id).state}\n")
+
+    print("--- TEST 2: Bounded size with LRU eviction ---")
+    for _ in range(100):
+        store.create()
+    print(f"Live sessions: {len(store)} (max {store.max_sessions})\n")
+
+    print("--- TEST 3: TTL expiry ---")
+    time.sleep(1.1)
+    print(f"Expired session lookup: {store.get(session.session_id)}")
+    store.purge_expired()
+    print(f"Live sessions after purge: {len(store)}\n")
+
+    print("--- TEST 4: Turn replay ---")
+    session = store.create()
+    future, is_owner = session.claim_turn("turn-1")
+    session.complete_turn("turn-1", {"message": "first response"})
+    replay, is_owner_again = session.claim_turn("turn-1")
+    print(f"Owner: {is_owner}, duplicate owner: {is_owner_again}, replayed: {replay.result()}\n")
+
+    print("--- TEST 5: Recovery from the session journal ---")
+    import tempfile
+    from utils.session_journal import SessionJournal
+    with tempfile.TemporaryDirectory() as directory:
+        store = SessionStore(journal=SessionJournal(directory, compact_after=50))
+        for amount in range(120):
+            session = store.create()
+            session.state = "AWAITING_TENURE"
+            session.loan_details = {"requested_amount": amount}
+            store.save(session, wait=False)
+        store.close()
+
+        recovered = SessionStore(journal=SessionJournal(directory))
+        print(f"Recovered sessions: {len(recovered)}, "
+              f"state: {recovered.get(session.session_id).state}, loan: {recovered.get(session.session_id).loan_details}")
+        recovered.close()
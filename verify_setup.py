@@ -5,12 +5,12 @@ def main():
     print("--- Tata Capital Chatbot: Setup Verification ---")
     
     # Test 1: Check if the database loaded
-    all_customers = customer_db.customers
-    if not all_customers:
+    customer_count = len(customer_db)
+    if not customer_count:
         print("❌ FAILED: Customer database is empty.")
         return
     else:
-        print(f"✅ SUCCESS: Loaded {len(all_customers)} customers into the database.")
+        print(f"✅ SUCCESS: Loaded {customer_count} customers into the database.")
 
     # Test 2: Check if we can retrieve a specific customer
     test_phone = "9876543210" # Rajesh Kumar's phone
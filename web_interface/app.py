@@ -1,156 +1,417 @@
 # web_interface/app.py
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, send_file, make_response
 from flask_cors import CORS
+import atexit
+import copy
+import io
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import sys
 import os
+import time
 
 # Add the project root to the Python path to import our agents
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents.master_agent import MasterAgent
+from agents.letter_job_queue import LetterJobQueue
+from utils.session_store import SessionStore
+from utils.session_journal import open_session_journal, SessionJournalError
+from utils.database import customer_db
+from utils.admin import is_admin_request
+from utils.metrics import metrics, instrument_flask_app
+from utils.admission import AdmissionController, PRIORITY_IN_PROGRESS, PRIORITY_NEW
+from utils.emi import is_valid_tenure, MIN_TENURE_MONTHS, MAX_TENURE_MONTHS
 
 # Initialize Flask App
 app = Flask(__name__)
 # Enable CORS for all routes
 CORS(app) 
+# Per-route request latency plus a Prometheus-format GET /metrics
+instrument_flask_app(app)
 
 # Create a single instance of the Master Agent to be used across sessions
 # In a real product with many users, you'd manage agent instances more carefully
 master_agent = MasterAgent()
 
+# Sanction letters are rendered in the background so approvals don't wait on PDF layout
+letter_jobs = LetterJobQueue(master_agent.sanction_generator)
+
+# Per-browser conversation state lives in a sharded, TTL-bounded session store.
+# With CHAT_SESSION_JOURNAL_DIR set it is journaled to disk and recovered on restart.
+SESSION_COOKIE_NAME = 'chat_session_id'
+session_store = SessionStore(journal=open_session_journal())
+atexit.register(session_store.close)
+
+# The browser tags each message with a turn id and retries with the same id after a
+# timeout; repeats are answered from the session's replay cache (see claim_turn)
+MAX_TURN_ID_LENGTH = 64
+TURN_REPLAYED_HEADER = 'X-Turn-Replayed'
+# How long a repeated request waits for the first attempt of its turn to finish
+TURN_REPLAY_WAIT_SECONDS = 30
+turn_replays = metrics.counter("chat_turn_replays_total", "Repeated /chat turns answered from the replay cache.")
+
+# Bounds how many chat turns run at once; under overload, customers already past
+# verification are served first and the rest get a quick 503 with Retry-After
+admission = AdmissionController()
+
+INVALID_TENURE_MESSAGE = f"It seems there was an issue with the number. Please enter a valid tenure between {MIN_TENURE_MONTHS} and {MAX_TENURE_MONTHS} months."
+
 @app.route('/')
 def index():
-    """Renders the main chat page."""
-    return render_template('index.html')
+    """Renders the main chat page and starts a fresh conversation."""
+    session_id = request.cookies.get(SESSION_COOKIE_NAME)
+    if session_id:
+        session_store.delete(session_id)
+    response = make_response(render_template('index.html'))
+    response.delete_cookie(SESSION_COOKIE_NAME)
+    return response
 
 @app.route('/chat', methods=['POST'])
 def chat():
     """Handles chat messages from the user."""
     # Get the user's message from the POST request
-    user_message = request.json.get('message', '')
-    
-    # For simplicity, we'll manage the conversation state here.
-    # A more robust solution would use sessions or a database.
-    # We'll simulate the flow based on the message content.
-    
-    # This is a simplified state machine for the conversation
-    if not hasattr(chat, 'state'):
-        chat.state = 'AWAITING_PHONE'
-        chat.customer_details = None
-        chat.loan_details = {}
+    payload = request.json or {}
+    user_message = payload.get('message', '')
+    turn_id = payload.get('turn_id')
+    if not valid_turn_id(turn_id):
+        return jsonify({"error": f"'turn_id' must be a string of at most {MAX_TURN_ID_LENGTH} characters"}), 400
+
+    # Each browser gets its own conversation, keyed by a session token stored in a cookie.
+    # API clients without cookies can pass the token back as 'session_id' instead.
+    session_id = payload.get('session_id') or request.cookies.get(SESSION_COOKIE_NAME)
+    convo = session_store.get(session_id)
+
+    # A repeated turn id is answered from the replay cache without taking an admission slot
+    future, is_owner = claim_turn(convo, turn_id)
+    if not is_owner:
+        turn_replays.inc()
+        result = wait_for_turn(future)
+        if result is None:
+            return busy_response()
+        return chat_response(convo, result, replayed=True)
+
+    if not admission.acquire(chat_priority(convo)):
+        if future is not None:
+            convo.abandon_turn(turn_id, TurnNotAdmitted(), future)
+        return busy_response()
+    start = time.perf_counter()
+    try:
+        if convo is None:
+            convo = session_store.create()
+            future, _ = claim_turn(convo, turn_id)
+        result = run_turn(convo, turn_id, future, user_message)
+    except SessionJournalError:
+        # The turn was undone; the client can safely send it again
+        return busy_response()
+    finally:
+        admission.release(time.perf_counter() - start)
+    return chat_response(convo, result)
+
+
+def chat_response(convo, result, replayed=False):
+    response = jsonify(result)
+    response.set_cookie(SESSION_COOKIE_NAME, convo.session_id, httponly=True, samesite='Lax')
+    if replayed:
+        response.headers[TURN_REPLAYED_HEADER] = '1'
+    return response
+
+
+def busy_response():
+    """A 503 with Retry-After: /chat is overloaded, a repeated turn is still running, or a turn could not be saved."""
+    retry_after = admission.retry_after()
+    response = jsonify(busy_payload(retry_after))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def chat_priority(convo):
+    """Conversations past phone verification, and not yet concluded, are admitted ahead of new ones."""
+    if convo is not None and convo.state not in ('AWAITING_PHONE', 'CONVERSATION_END'):
+        return PRIORITY_IN_PROGRESS
+    return PRIORITY_NEW
+
+
+def busy_payload(retry_after):
+    """The body of a 503 sent when /chat is overloaded."""
+    return {
+        "error": "busy",
+        "message": f"We're experiencing very high demand right now. Please try again in {retry_after} second{'s' if retry_after != 1 else ''}.",
+        "retry_after": retry_after
+    }
+
+
+def valid_turn_id(turn_id):
+    """A turn id is optional; when given it must be a short string."""
+    return turn_id is None or (isinstance(turn_id, str) and 0 < len(turn_id) <= MAX_TURN_ID_LENGTH)
+
+
+class TurnNotAdmitted(Exception):
+    """Given to repeats of a turn whose first attempt was turned away by admission control."""
+
+
+def claim_turn(convo, turn_id):
+    """
+    Claims a client-supplied turn id on a conversation, so each turn runs at most once.
+
+    A request that repeats a turn id (the browser retrying after a timeout) is not the
+    owner: it gets the first attempt's response through the returned future instead of
+    advancing the state machine again.
+
+    Returns:
+        tuple: (future or None, is_owner). There is nothing to claim without a
+               conversation or a turn id.
+    """
+    if convo is None or turn_id is None:
+        return None, True
+    return convo.claim_turn(turn_id)
+
+
+def journal_checkpoint(convo):
+    """A copy of the session's state to put back if its turn cannot be journaled (None without a journal)."""
+    return copy.deepcopy(convo.to_record()) if session_store.journal is not None else None
+
+
+def wait_for_turn(future):
+    """Waits for the first attempt of a repeated turn. Returns its result, or None if it could not be had in time."""
+    try:
+        return future.result(timeout=TURN_REPLAY_WAIT_SECONDS)
+    except (FutureTimeoutError, TurnNotAdmitted, SessionJournalError):
+        return None
+
+
+def run_turn(convo, turn_id, future, user_message):
+    """
+    Runs one turn of a conversation as the owner of `turn_id` (the turn claimed with `future`, if any).
+
+    Raises:
+        SessionJournalError: The session could not be journaled; the turn has been undone.
+    """
+    try:
+        with convo.lock:
+            before = journal_checkpoint(convo)
+            result = process_message(convo, user_message)
+            try:
+                session_store.save(convo)
+            except SessionJournalError:
+                convo.restore(before)
+                raise
+        result['session_id'] = convo.session_id
+    except Exception as e:
+        if future is not None:
+            convo.abandon_turn(turn_id, e, future)
+        raise
+    if future is not None:
+        convo.complete_turn(turn_id, result, future)
+    return result
 
+
+def process_message(convo, user_message):
+    """
+    Advances one conversation by a single user message.
+
+    Args:
+        convo (ConversationSession): The customer's conversation state.
+        user_message (str): The message the customer sent.
+
+    Returns:
+        dict: The JSON payload to send back to the frontend.
+    """
     response_message = ""
+    letter_job_id = None
     
-    if chat.state == 'AWAITING_PHONE':
+    if convo.state == 'AWAITING_PHONE':
         # First message from the user should be the phone number
         if len(user_message) == 10 and user_message.isdigit():
-            verification_result = master_agent.verification_agent.verify_customer(user_message)
+            with metrics.track("verification") as stage:
+                verification_result = master_agent.verification_agent.verify_customer(user_message)
+                stage.outcome = verification_result['status']
             if verification_result['status'] == 'success':
-                chat.customer_details = verification_result
-                chat.state = 'AWAITING_LOAN_AMOUNT'
+                convo.customer_details = verification_result
+                convo.state = 'AWAITING_LOAN_AMOUNT'
                 
                 # --- FIX: Get the pre-approved limit from the verification result ---
                 pre_approved_limit = verification_result['pre_approved_limit']
                 
-                response_message = f"Thank you, {chat.customer_details['name']}! I've found your profile."
+                response_message = f"Thank you, {convo.customer_details['name']}! I've found your profile."
                 
                 # Return a special JSON object to trigger the banner on the frontend
-                return jsonify({
+                return {
                     "message": response_message,
                     "show_pre_approval_banner": True,
-                    "customer_name": chat.customer_details['name'],
+                    "customer_name": convo.customer_details['name'],
                     "pre_approved_limit": pre_approved_limit
-                })
+                }
             else:
                 response_message = "I'm sorry, but I couldn't find an account associated with that number. Please check and try again."
         else:
             response_message = "That doesn't seem to be a valid 10-digit number. Please provide your mobile number to get started."
 
-    elif chat.state == 'AWAITING_LOAN_AMOUNT':
+    elif convo.state == 'AWAITING_LOAN_AMOUNT':
         try:
             amount = int(user_message)
-            chat.loan_details['requested_amount'] = amount
-            chat.state = 'AWAITING_TENURE'
+            convo.loan_details['requested_amount'] = amount
+            convo.state = 'AWAITING_TENURE'
             response_message = "Great. And for how many months would you like the tenure? (e.g., 60)"
         except ValueError:
             response_message = "It seems there was an issue with the number. Please enter a numeric loan amount."
 
-    elif chat.state == 'AWAITING_TENURE':
-        try:
-            tenure = int(user_message)
-            chat.loan_details['tenure'] = tenure
-            
-            # Now, trigger the rest of the agent logic
-            sales_result = master_agent.sales_agent.discuss_loan(
-                chat.customer_details['phone'], 
-                chat.loan_details['requested_amount'],
-                chat.loan_details['tenure']
-            )
-            
-            if sales_result['status'] == 'suggestion':
-                # This is a simplification. A real UI would present this as buttons.
-                chat.loan_details['final_amount'] = sales_result['suggested_amount']
-                response_message = sales_result['message'] + " I've taken the liberty of proceeding with the suggested amount for instant approval."
-            else:
-                chat.loan_details['final_amount'] = sales_result['final_amount']
-                response_message = sales_result['message']
-            
+    elif convo.state == 'AWAITING_TENURE':
+        tenure = parse_tenure(user_message)
+        if tenure is None:
+            response_message = INVALID_TENURE_MESSAGE
+        else:
+            response_message = _discuss_loan(convo, tenure)
+
             # Proceed to underwriting
-            underwriting_result = master_agent.underwriting_agent.evaluate_loan(
-                chat.customer_details['phone'], 
-                chat.loan_details['final_amount']
-            )
-            
-            if underwriting_result['status'] == 'approved_instant':
-                # Generate letter
-                loan_details_for_letter = {
-                    'approved_amount': underwriting_result['approved_amount'],
-                    'interest_rate': '10.99%',
-                    'tenure': chat.loan_details['tenure']
-                }
-                letter_result = master_agent.sanction_generator.generate_letter(chat.customer_details, loan_details_for_letter)
-                
-                if letter_result['status'] == 'success':
-                    # Pass the filename to the frontend
-                    response_message += f"\n\n🎉 Congratulations! Your loan of ₹{loan_details_for_letter['approved_amount']:,} has been approved."
-                    response_message += f"||DOWNLOAD_LINK:{letter_result['filename']}||" # Special marker for the frontend
-                    chat.state = 'CONVERSATION_END'
-                else:
-                    response_message += "\n\nThere was an issue generating your sanction letter. Please contact support."
-                    chat.state = 'CONVERSATION_END'
-            
-            elif underwriting_result['status'] == 'pending_salary_slip':
-                # Simulate the salary slip upload and approval
-                response_message += "\n\nSimulating salary slip upload and verification... Done! Your loan has been approved after document verification."
-                loan_details_for_letter = {
-                    'approved_amount': chat.loan_details['final_amount'],
-                    'interest_rate': '10.99%',
-                    'tenure': chat.loan_details['tenure']
-                }
-                letter_result = master_agent.sanction_generator.generate_letter(chat.customer_details, loan_details_for_letter)
-                if letter_result['status'] == 'success':
-                    response_message += f"\n\n🎉 Congratulations! Your loan of ₹{loan_details_for_letter['approved_amount']:,} has been approved."
-                    response_message += f"||DOWNLOAD_LINK:{letter_result['filename']}||" # Special marker for the frontend
-                    chat.state = 'CONVERSATION_END'
-                else:
-                    response_message += "\n\nThere was an issue generating your sanction letter. Please contact support."
-                    chat.state = 'CONVERSATION_END'
-
-            else: # Rejected
-                response_message += f"\n\n{underwriting_result['reason']}"
-                chat.state = 'CONVERSATION_END'
+            with metrics.track("underwriting") as stage:
+                underwriting_result = master_agent.underwriting_agent.evaluate_loan(
+                    convo.customer_details['phone'], 
+                    convo.loan_details['final_amount'],
+                    convo.loan_details['tenure']
+                )
+                stage.outcome = underwriting_result['status']
 
-        except ValueError:
-            response_message = "It seems there was an issue with the number. Please enter a numeric tenure in months."
+            response_message, letter_job_id = _conclude_application(convo, response_message, underwriting_result)
     
-    elif chat.state == 'CONVERSATION_END':
+    elif convo.state == 'CONVERSATION_END':
         response_message = "This conversation has concluded. Please refresh the page to start a new one."
 
-    return jsonify({"message": response_message})
+    if letter_job_id:
+        return {"message": response_message, "letter_job_id": letter_job_id}
+    return {"message": response_message}
+
+
+async def process_message_async(convo, user_message):
+    """
+    Asyncio variant of process_message, used by the ASGI app (web_interface/asgi.py).
+
+    Only the tenure turn waits on I/O (the underwriting lookups). It awaits them, so
+    the event loop keeps serving other conversations in the meantime; every other
+    turn is pure in-memory work and runs as-is.
+    """
+    tenure = parse_tenure(user_message) if convo.state == 'AWAITING_TENURE' else None
+    if tenure is None:
+        return process_message(convo, user_message)
+
+    response_message = _discuss_loan(convo, tenure)
+    with metrics.track("underwriting") as stage:
+        underwriting_result = await master_agent.underwriting_agent.evaluate_loan_async(
+            convo.customer_details['phone'],
+            convo.loan_details['final_amount'],
+            convo.loan_details['tenure']
+        )
+        stage.outcome = underwriting_result['status']
+
+    response_message, letter_job_id = _conclude_application(convo, response_message, underwriting_result)
+    if letter_job_id:
+        return {"message": response_message, "letter_job_id": letter_job_id}
+    return {"message": response_message}
+
+
+def parse_tenure(user_message):
+    """Reads a tenure in months from a message, or returns None if it isn't a whole number in range."""
+    try:
+        tenure = int(user_message)
+    except ValueError:
+        return None
+    return tenure if is_valid_tenure(tenure) else None
+
+
+def _discuss_loan(convo, tenure):
+    """Records the tenure, runs the sales discussion and fixes the final amount. Returns the reply so far."""
+    convo.loan_details['tenure'] = tenure
+
+    with metrics.track("sales") as stage:
+        sales_result = master_agent.sales_agent.discuss_loan(
+            convo.customer_details['phone'], 
+            convo.loan_details['requested_amount'],
+            convo.loan_details['tenure']
+        )
+        stage.outcome = sales_result['status']
+    
+    if sales_result['status'] == 'suggestion':
+        # This is a simplification. A real UI would present this as buttons.
+        convo.loan_details['final_amount'] = sales_result['suggested_amount']
+        return sales_result['message'] + " I've taken the liberty of proceeding with the suggested amount for instant approval."
+    convo.loan_details['final_amount'] = sales_result['final_amount']
+    return sales_result['message']
+
+
+def _conclude_application(convo, response_message, underwriting_result):
+    """
+    Acts on the underwriting decision: queues the sanction letter for approvals and ends the
+    conversation, or leaves it at the tenure question if the verification services failed.
+
+    Returns:
+        tuple: (response_message, letter_job_id or None)
+    """
+    letter_job_id = None
+    if underwriting_result['status'] == 'approved_instant':
+        # Queue the letter; the frontend polls /letter_status for the download link
+        loan_details_for_letter = {
+            'approved_amount': underwriting_result['approved_amount'],
+            'interest_rate': '10.99%',
+            'tenure': convo.loan_details['tenure']
+        }
+        with metrics.track("letter_enqueue"):
+            letter_job_id = letter_jobs.submit(convo.customer_details, loan_details_for_letter)
+        response_message += f"\n\n🎉 Congratulations! Your loan of ₹{loan_details_for_letter['approved_amount']:,} has been approved."
+        response_message += " Your sanction letter is being prepared."
+
+    elif underwriting_result['status'] == 'pending_salary_slip':
+        # Simulate the salary slip upload and approval
+        response_message += "\n\nSimulating salary slip upload and verification... Done! Your loan has been approved after document verification."
+        loan_details_for_letter = {
+            'approved_amount': convo.loan_details['final_amount'],
+            'interest_rate': '10.99%',
+            'tenure': convo.loan_details['tenure']
+        }
+        with metrics.track("letter_enqueue"):
+            letter_job_id = letter_jobs.submit(convo.customer_details, loan_details_for_letter, 'document_verified')
+        response_message += f"\n\n🎉 Congratulations! Your loan of ₹{loan_details_for_letter['approved_amount']:,} has been approved."
+        response_message += " Your sanction letter is being prepared."
+
+    elif underwriting_result['status'] == 'error':
+        # The verification services failed (circuit open, deadline or retries exhausted);
+        # keep the application open so the customer can send the tenure again
+        reason = underwriting_result.get('reason') or underwriting_result['message']
+        response_message += f"\n\nWe couldn't complete your verification right now: {reason}"
+        response_message += " Please send your preferred tenure again in a moment to retry."
+        return response_message, None
+
+    else: # Rejected
+        response_message += f"\n\n{underwriting_result['reason']}"
+
+    convo.state = 'CONVERSATION_END'
+    return response_message, letter_job_id
+
+
+@app.route('/letter_status/<job_id>')
+def letter_status(job_id):
+    """
+    Reports whether a queued sanction letter is ready.
+    Once it is, the response carries the ||DOWNLOAD_LINK:...|| marker for the frontend.
+    """
+    status = letter_jobs.status(job_id)
+    if status['status'] == 'unknown':
+        return jsonify({"status": "unknown", "message": "No such letter request."}), 404
+    if status['status'] == 'completed':
+        status['message'] = f"||DOWNLOAD_LINK:{status['filename']}||" # Special marker for the frontend
+    elif status['status'] == 'failed':
+        status['message'] = "There was an issue generating your sanction letter. Please contact support."
+    elif status['status'] == 'expired':
+        status['message'] = "Your sanction letter is no longer available for download. Please contact support to have it reissued."
+    return jsonify(status)
 
 
 @app.route('/download_letter/<filename>')
 def download_letter(filename):
     """Serves the generated sanction letter for download."""
+    # Recently generated letters are streamed straight from memory
+    pdf_bytes = master_agent.sanction_generator.get_letter_bytes(filename)
+    if pdf_bytes is not None:
+        return send_file(io.BytesIO(pdf_bytes), mimetype='application/pdf',
+                         as_attachment=True, download_name=filename)
     try:
         # The directory where letters are stored
         letter_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'generated_letters')
@@ -159,6 +420,19 @@ def download_letter(filename):
         return "File not found.", 404
 
 
+@app.route('/admin/reload-customers', methods=['POST'])
+def reload_customers():
+    """Reloads customer data used by the verification and sales agents without a restart."""
+    if not is_admin_request(request):
+        return jsonify({"error": "Forbidden"}), 403
+    if not customer_db.reload():
+        return jsonify({"status": "error", "message": "Could not reload customer data; keeping the current data."}), 500
+    return jsonify({"status": "reloaded", "customers": len(customer_db)})
+
+# Pick up edits to the customer data file automatically
+customer_db.start_watching()
+
+
 if __name__ == '__main__':
     # IMPORTANT: Make sure your mock API server is running in another terminal!
     app.run(port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,284 @@
+# web_interface/asgi.py
+"""
+ASGI entry point for the web interface.
+
+POST /chat is served natively on the event loop: the tenure turn awaits the
+underwriting lookups (UnderwritingAgent.evaluate_loan_async), so one process keeps
+many conversations in flight while they wait on the Credit Bureau / Offer Mart APIs
+instead of parking a thread per blocked request. Every other route (the page, static
+files, letter status and downloads, /metrics, admin) is handed to the Flask app on a
+worker thread.
+
+Run with any ASGI server, e.g.:
+    uvicorn web_interface.asgi:app --port 5000
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+
+from werkzeug.http import dump_cookie, parse_cookie
+
+# Add the project root to the Python path to import the Flask app and our utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from web_interface.app import (app as flask_app, process_message_async, session_store, letter_jobs,
+                               SESSION_COOKIE_NAME, MAX_TURN_ID_LENGTH, TURN_REPLAYED_HEADER,
+                               TURN_REPLAY_WAIT_SECONDS, turn_replays, valid_turn_id, admission,
+                               chat_priority, busy_payload, claim_turn, TurnNotAdmitted, journal_checkpoint)
+from utils.metrics import metrics
+from utils.session_store import JOURNAL_COMMIT_TIMEOUT_SECONDS
+from utils.session_journal import SessionJournalError
+
+# Largest request body accepted by /chat
+MAX_CHAT_BODY_BYTES = 64 * 1024
+
+_chat_duration = metrics.histogram("http_request_duration_seconds", "HTTP request latency.", ("endpoint", "method"))
+_chat_requests = metrics.counter("http_requests_total", "HTTP requests by status code.", ("endpoint", "method", "status"))
+
+
+async def _read_body(receive, limit=None):
+    """Collects the request body; returns None if it exceeds `limit` bytes."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if limit is not None and size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+async def _send_response(send, status, body, headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode("utf-8")
+    await _send_response(send, status, body, [("content-type", "application/json"),
+                                              ("content-length", str(len(body))), *headers])
+
+
+def _header(scope, name):
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _save_session(convo):
+    """
+    Journals the session after a turn, waiting for the group commit on a worker thread.
+    Raises SessionJournalError if the record could not be written, or not within the commit timeout.
+    """
+    seq = session_store.save(convo, wait=False)
+    if seq is None:
+        return
+    written = await asyncio.get_running_loop().run_in_executor(
+        None, session_store.journal.wait, seq, JOURNAL_COMMIT_TIMEOUT_SECONDS)
+    if not written:
+        raise SessionJournalError(f"Session record {seq} was not written within {JOURNAL_COMMIT_TIMEOUT_SECONDS}s")
+
+
+async def wait_for_turn_async(future):
+    """The async twin of web_interface.app.wait_for_turn; waits without blocking the event loop."""
+    try:
+        # shield: timing out must not cancel the shared future the first attempt will complete
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), TURN_REPLAY_WAIT_SECONDS)
+    except (asyncio.TimeoutError, TurnNotAdmitted, SessionJournalError):
+        return None
+
+
+async def run_turn_async(convo, turn_id, future, user_message):
+    """
+    The async twin of web_interface.app.run_turn. Turns of the same conversation
+    are serialized with the session's asyncio lock instead of its thread lock.
+    """
+    try:
+        async with convo.async_lock():
+            before = journal_checkpoint(convo)
+            result = await process_message_async(convo, user_message)
+            try:
+                await _save_session(convo)
+            except SessionJournalError:
+                convo.restore(before)
+                raise
+        result['session_id'] = convo.session_id
+    except Exception as e:
+        if future is not None:
+            convo.abandon_turn(turn_id, e, future)
+        raise
+    if future is not None:
+        convo.complete_turn(turn_id, result, future)
+    return result
+
+
+async def _send_busy(send):
+    retry_after = admission.retry_after()
+    await _send_json(send, 503, busy_payload(retry_after), [("retry-after", str(retry_after))])
+
+
+async def chat(scope, receive, send):
+    """The async twin of the Flask /chat view."""
+    start = time.perf_counter()
+    status = 200
+    try:
+        body = await _read_body(receive, MAX_CHAT_BODY_BYTES)
+        if body is None:
+            status = 413
+            await _send_json(send, status, {"error": "Request body too large"})
+            return
+        try:
+            payload = json.loads(body or b"{}") or {}
+        except ValueError:
+            status = 400
+            await _send_json(send, status, {"error": "Invalid JSON body"})
+            return
+        if not isinstance(payload, dict):
+            payload = {}
+        user_message = payload.get('message', '')
+        turn_id = payload.get('turn_id')
+        if not valid_turn_id(turn_id):
+            status = 400
+            await _send_json(send, status, {"error": f"'turn_id' must be a string of at most {MAX_TURN_ID_LENGTH} characters"})
+            return
+
+        # Same session handling as the Flask view: cookie, or 'session_id' for API clients
+        cookies = parse_cookie(_header(scope, b"cookie") or "")
+        session_id = payload.get('session_id') or cookies.get(SESSION_COOKIE_NAME)
+        convo = session_store.get(session_id)
+
+        # A repeated turn id is answered from the replay cache without taking an admission slot
+        future, is_owner = claim_turn(convo, turn_id)
+        if not is_owner:
+            turn_replays.inc()
+            result = await wait_for_turn_async(future)
+            if result is None:
+                status = 503
+                await _send_busy(send)
+                return
+        else:
+            admitted = False
+            try:
+                admitted = await admission.acquire_async(chat_priority(convo))
+            finally:
+                if not admitted and future is not None:
+                    # Rejected or cancelled: let repeats of this turn know, and let a retry run it
+                    convo.abandon_turn(turn_id, TurnNotAdmitted(), future)
+            if not admitted:
+                status = 503
+                await _send_busy(send)
+                return
+            turn_start = time.perf_counter()
+            try:
+                if convo is None:
+                    convo = session_store.create()
+                    future, _ = claim_turn(convo, turn_id)
+                result = await run_turn_async(convo, turn_id, future, user_message)
+            except SessionJournalError:
+                # The turn was undone; the client can safely send it again
+                status = 503
+                await _send_busy(send)
+                return
+            finally:
+                admission.release(time.perf_counter() - turn_start)
+
+        headers = [("set-cookie", dump_cookie(SESSION_COOKIE_NAME, convo.session_id, httponly=True, samesite='Lax'))]
+        if not is_owner:
+            headers.append((TURN_REPLAYED_HEADER, "1"))
+        await _send_json(send, status, result, headers)
+    except Exception:
+        status = 500
+        raise
+    finally:
+        _chat_duration.observe(time.perf_counter() - start, endpoint="chat", method="POST")
+        _chat_requests.inc(endpoint="chat", method="POST", status=status)
+
+
+def _wsgi_environ(scope, body):
+    """Builds a WSGI environ for an ASGI HTTP request."""
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", ()):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_TYPE" or name == "CONTENT_LENGTH":
+            environ[name] = value
+        else:
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_flask(scope, receive, send):
+    """Runs the Flask app for one request on a worker thread and relays its response."""
+    body = await _read_body(receive)
+    environ = _wsgi_environ(scope, body or b"")
+    response_start = {}
+
+    def start_response(status, headers, exc_info=None):
+        response_start["status"] = int(status.split(" ", 1)[0])
+        response_start["headers"] = headers
+
+    def run():
+        result = flask_app(environ, start_response)
+        try:
+            return b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+    response_body = await asyncio.get_running_loop().run_in_executor(None, run)
+    await _send_response(send, response_start["status"], response_body, response_start["headers"])
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                letter_jobs.shutdown(wait=False)
+                session_store.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    if scope["path"] == "/chat" and scope["method"] == "POST":
+        await chat(scope, receive, send)
+    else:
+        await call_flask(scope, receive, send)
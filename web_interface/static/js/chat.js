@@ -79,6 +79,142 @@ document.addEventListener('DOMContentLoaded', () => {
         chatBox.scrollTop = chatBox.scrollHeight;
     };
 
+    // Function to add a download button for a generated sanction letter
+    const addDownloadButton = (filename) => {
+        const messageWrapper = document.createElement('div');
+        messageWrapper.classList.add('message-wrapper', 'bot');
+
+        const avatar = document.createElement('div');
+        avatar.classList.add('bot-avatar');
+        avatar.textContent = 'TC';
+        messageWrapper.appendChild(avatar);
+
+        const messageElement = document.createElement('div');
+        messageElement.classList.add('message', 'bot-message');
+        
+        const downloadLink = document.createElement('a');
+        downloadLink.href = `/download_letter/${encodeURIComponent(filename)}`;
+        downloadLink.className = 'download-button'; // Use class for styling
+        downloadLink.textContent = 'Download Your Sanction Letter';
+        downloadLink.setAttribute('download', filename);
+
+        messageElement.appendChild(downloadLink);
+        messageWrapper.appendChild(messageElement);
+
+        // Add timestamp
+        const timestamp = document.createElement('div');
+        timestamp.classList.add('timestamp');
+        const now = new Date();
+        timestamp.textContent = now.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+        messageWrapper.appendChild(timestamp);
+
+        chatBox.appendChild(messageWrapper);
+        chatBox.scrollTop = chatBox.scrollHeight;
+    };
+
+    // Function to show a message that ends with a ||DOWNLOAD_LINK:filename|| marker
+    const showMessageWithDownloadLink = (botMessage) => {
+        const parts = botMessage.split("||DOWNLOAD_LINK:");
+        const messageText = parts[0];
+        const filename = parts[1].replace('||', '');
+
+        // Display the main message
+        if (messageText) {
+            addMessage(messageText, false);
+        }
+        addDownloadButton(filename);
+    };
+
+    // Function to poll the backend until a queued sanction letter is ready
+    const LETTER_POLL_INTERVAL_MS = 1000;
+    const LETTER_POLL_MAX_ATTEMPTS = 60;
+    const pollLetterStatus = (jobId, attempt = 0) => {
+        setTimeout(async () => {
+            try {
+                const response = await fetch(`/letter_status/${encodeURIComponent(jobId)}`);
+                const data = await response.json();
+
+                if (data.status === 'pending' && attempt + 1 < LETTER_POLL_MAX_ATTEMPTS) {
+                    pollLetterStatus(jobId, attempt + 1);
+                } else if (data.status === 'completed') {
+                    showMessageWithDownloadLink(data.message);
+                } else {
+                    addMessage(data.message || 'There was an issue generating your sanction letter. Please contact support.', false);
+                }
+            } catch (error) {
+                console.error('Error:', error);
+                addMessage('Sorry, we could not fetch your sanction letter. Please contact support.', false);
+            }
+        }, LETTER_POLL_INTERVAL_MS);
+    };
+
+    // Every message gets a turn id; retries reuse it so the backend answers a repeat
+    // from its replay cache instead of processing the message twice
+    const CHAT_REQUEST_TIMEOUT_MS = 15000;
+    const CHAT_MAX_ATTEMPTS = 3;
+    const CHAT_RETRY_DELAY_MS = 500;
+    // When the server is overloaded it answers 503 with Retry-After; wait that long, a few times at most
+    const CHAT_MAX_BUSY_RETRIES = 4;
+    const CHAT_MAX_BUSY_WAIT_MS = 30000;
+
+    const newTurnId = () => {
+        if (window.crypto && typeof window.crypto.randomUUID === 'function') {
+            return window.crypto.randomUUID();
+        }
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+    };
+
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+    // Function to post a message to /chat, retrying timeouts, network errors and 5xx responses.
+    // `onBusy(seconds)` is called before waiting out an overload (503) response.
+    const postChatMessage = async (message, onBusy) => {
+        const body = JSON.stringify({ message: message, turn_id: newTurnId() });
+        let lastError = null;
+        let busyRetries = 0;
+
+        for (let attempt = 1; attempt <= CHAT_MAX_ATTEMPTS; attempt++) {
+            const controller = new AbortController();
+            const timer = setTimeout(() => controller.abort(), CHAT_REQUEST_TIMEOUT_MS);
+            try {
+                const response = await fetch('/chat', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: body,
+                    signal: controller.signal
+                });
+                if (response.ok) {
+                    return await response.json();
+                }
+                if (response.status === 503 && busyRetries < CHAT_MAX_BUSY_RETRIES) {
+                    // Rejected before any processing, so waiting and resending is always safe
+                    const seconds = parseInt(response.headers.get('Retry-After'), 10) || 2;
+                    busyRetries++;
+                    attempt--; // Overload waits don't use up the regular attempts
+                    if (onBusy) {
+                        onBusy(seconds);
+                    }
+                    await sleep(Math.min(seconds * 1000, CHAT_MAX_BUSY_WAIT_MS));
+                    continue;
+                }
+                lastError = new Error(`Chat request failed with status ${response.status}`);
+                if (response.status < 500) {
+                    break; // The request itself was rejected; sending it again won't help
+                }
+            } catch (error) {
+                lastError = error; // Timed out (aborted) or the network dropped
+            } finally {
+                clearTimeout(timer);
+            }
+            if (attempt < CHAT_MAX_ATTEMPTS) {
+                await sleep(CHAT_RETRY_DELAY_MS * attempt);
+            }
+        }
+        throw lastError;
+    };
+
     // Function to send a message to the backend
     const sendMessage = async () => {
         const message = messageInput.value.trim();
@@ -93,19 +229,13 @@ document.addEventListener('DOMContentLoaded', () => {
 
         try {
             // Send message to the Flask backend
-            const response = await fetch('/chat', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({ message: message })
+            let busyNoticeShown = false;
+            const data = await postChatMessage(message, (seconds) => {
+                if (!busyNoticeShown) {
+                    busyNoticeShown = true;
+                    addMessage(`We're experiencing very high demand right now. I'll retry in ${seconds} seconds, please stay with me.`, false);
+                }
             });
-
-            if (!response.ok) {
-                throw new Error('Network response was not ok');
-            }
-
-            const data = await response.json();
             
             // Hide the typing indicator before showing the response
             hideTypingIndicator();
@@ -129,50 +259,16 @@ document.addEventListener('DOMContentLoaded', () => {
 
                 // Check if the message contains a download link marker
                 if (typeof botMessage === 'string' && botMessage.includes("||DOWNLOAD_LINK:")) {
-                    const parts = botMessage.split("||DOWNLOAD_LINK:");
-                    const messageText = parts[0];
-                    const filename = parts[1].replace('||', '');
-
-                    // Display the main message
-                    if (messageText) {
-                        addMessage(messageText, false);
-                    }
-
-                    // Create and add the download button inside a new message bubble
-                    const messageWrapper = document.createElement('div');
-                    messageWrapper.classList.add('message-wrapper', 'bot');
-
-                    const avatar = document.createElement('div');
-                    avatar.classList.add('bot-avatar');
-                    avatar.textContent = 'TC';
-                    messageWrapper.appendChild(avatar);
-
-                    const messageElement = document.createElement('div');
-                    messageElement.classList.add('message', 'bot-message');
-                    
-                    const downloadLink = document.createElement('a');
-                    downloadLink.href = `/download_letter/${encodeURIComponent(filename)}`;
-                    downloadLink.className = 'download-button'; // Use class for styling
-                    downloadLink.textContent = 'Download Your Sanction Letter';
-                    downloadLink.setAttribute('download', filename);
-
-                    messageElement.appendChild(downloadLink);
-                    messageWrapper.appendChild(messageElement);
-
-                    // Add timestamp
-                    const timestamp = document.createElement('div');
-                    timestamp.classList.add('timestamp');
-                    const now = new Date();
-                    timestamp.textContent = now.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
-                    messageWrapper.appendChild(timestamp);
-
-                    chatBox.appendChild(messageWrapper);
-                    chatBox.scrollTop = chatBox.scrollHeight;
-
+                    showMessageWithDownloadLink(botMessage);
                 } else {
                     // Display a normal bot response
                     addMessage(botMessage, false);
                 }
+
+                // The sanction letter is rendered in the background; poll until it's ready
+                if (data.letter_job_id) {
+                    pollLetterStatus(data.letter_job_id);
+                }
             }
 
         } catch (error) {